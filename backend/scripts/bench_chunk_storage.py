@@ -0,0 +1,224 @@
+"""Compare chunk text storage layouts: size on disk and top-k search latency.
+
+Usage: python scripts/bench_chunk_storage.py [--pages 2000] [--queries 20] [--top-k 8]
+                                             [--collection NAME]
+
+Builds three copies of the same chunks in a scratch schema of ``NEXUS_DATABASE_URL``
+and drops it afterwards:
+
+- ``inline_pglz``: chunk text in ``chunks.content``, default TOAST compression
+  (the layout before the pages table);
+- ``inline_lz4``: the same with ``COMPRESSION lz4``;
+- ``pages_lz4``: page text stored once with LZ4, chunks as offsets into it.
+
+Each layout is searched two ways: ``eager`` selects the text with the distance, so
+every candidate row is decompressed before the sort; ``lazy`` ranks on the vectors
+and reads text for the top-k rows only, as ``nexus.retrieve.pgvector`` does. The
+scans are sequential, like a filtered search that cannot use the HNSW index; with
+the index the candidate set is ``hnsw.ef_search`` rows instead of the whole table.
+
+Page text comes from ``--collection`` (its stored chunks) or, without one, from
+generated English-like text.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+
+import psycopg
+
+from nexus.config import get_settings
+from nexus.ingest import bulk, chunking
+
+SCHEMA = "nexus_bench"
+WORDS = (
+    "the of and to in a is that for it as was with be by on not he this are or his from at "
+    "which but have an they you were her she there been one all we their has would when if "
+    "report annual revenue policy section figure table results method analysis committee "
+    "shall pursuant agreement liability quarterly statement research patient clinical trial"
+).split()
+
+LAYOUTS = {
+    "inline_pglz": "pglz",
+    "inline_lz4": "lz4",
+    "pages_lz4": "lz4",
+}
+
+
+def _generated_pages(count: int, rng: random.Random) -> list[str]:
+    pages = []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(350, 600))]
+        pages.append(" ".join(words))
+    return pages
+
+
+def _collection_pages(cur: psycopg.Cursor, name: str, count: int) -> list[str]:
+    """Page texts of ``name``: from the pages table, else stitched from stored chunks."""
+    cur.execute(
+        """
+        SELECT p.text FROM pages p
+        JOIN documents d ON d.id = p.document_id
+        JOIN collections c ON c.id = d.collection_id
+        WHERE c.name = %s AND c.active
+        LIMIT %s
+        """,
+        (name, count),
+    )
+    pages = [row[0] for row in cur.fetchall()]
+    if pages:
+        return pages
+    # Older chunks overlap by chunk_overlap characters; drop the repeat when stitching.
+    cur.execute(
+        """
+        SELECT string_agg(
+            CASE WHEN ch.chunk_index = 0 THEN ch.content ELSE substr(ch.content, %s + 1) END,
+            '' ORDER BY ch.chunk_index
+        )
+        FROM chunks ch
+        JOIN documents d ON d.id = ch.document_id
+        JOIN collections c ON c.id = d.collection_id
+        WHERE c.name = %s AND c.active AND ch.content IS NOT NULL
+        GROUP BY ch.document_id, ch.page
+        LIMIT %s
+        """,
+        (get_settings().chunk_overlap, name, count),
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+def _vector(dim: int, rng: random.Random) -> str:
+    return bulk.vector_literal([rng.uniform(-1, 1) for _ in range(dim)])
+
+
+def _load(cur: psycopg.Cursor, pages: list[str], dim: int, rng: random.Random) -> int:
+    settings = get_settings()
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA}")
+    for layout, compression in LAYOUTS.items():
+        if layout.startswith("pages"):
+            cur.execute(
+                f"""
+                CREATE TABLE {SCHEMA}.{layout}_pages (
+                    id INT PRIMARY KEY, text TEXT COMPRESSION {compression} NOT NULL
+                );
+                CREATE TABLE {SCHEMA}.{layout} (
+                    id INT PRIMARY KEY, page_id INT NOT NULL, char_start INT NOT NULL,
+                    char_end INT NOT NULL, embedding VECTOR({dim}) NOT NULL
+                )
+                """
+            )
+        else:
+            cur.execute(
+                f"""
+                CREATE TABLE {SCHEMA}.{layout} (
+                    id INT PRIMARY KEY, content TEXT COMPRESSION {compression} NOT NULL,
+                    embedding VECTOR({dim}) NOT NULL
+                )
+                """
+            )
+    rows = []
+    for page_id, text in enumerate(pages):
+        for _, start, end in chunking.chunk_spans(
+            text, settings.chunk_size, settings.chunk_overlap
+        ):
+            rows.append((page_id, start, end, _vector(dim, rng)))
+    with cur.copy(f"COPY {SCHEMA}.pages_lz4_pages (id, text) FROM STDIN") as copy:
+        for page_id, text in enumerate(pages):
+            copy.write_row((page_id, text))
+    with cur.copy(
+        f"COPY {SCHEMA}.pages_lz4 (id, page_id, char_start, char_end, embedding) FROM STDIN"
+    ) as copy:
+        for chunk_id, (page_id, start, end, vector) in enumerate(rows):
+            copy.write_row((chunk_id, page_id, start, end, vector))
+    for layout in ("inline_pglz", "inline_lz4"):
+        with cur.copy(f"COPY {SCHEMA}.{layout} (id, content, embedding) FROM STDIN") as copy:
+            for chunk_id, (page_id, start, end, vector) in enumerate(rows):
+                copy.write_row((chunk_id, pages[page_id][start:end], vector))
+    cur.execute(f"ANALYZE {SCHEMA}.inline_pglz, {SCHEMA}.inline_lz4, {SCHEMA}.pages_lz4")
+    return len(rows)
+
+
+def _size(cur: psycopg.Cursor, layout: str) -> int:
+    tables = [f"{SCHEMA}.{layout}"]
+    if layout.startswith("pages"):
+        tables.append(f"{SCHEMA}.{layout}_pages")
+    cur.execute(
+        "SELECT SUM(pg_total_relation_size(t::regclass)) FROM unnest(%s::text[]) AS t",
+        (tables,),
+    )
+    return int(cur.fetchone()[0])
+
+
+def _queries(layout: str, top_k: int) -> dict[str, str]:
+    table = f"{SCHEMA}.{layout}"
+    if layout.startswith("pages"):
+        text = "substr(p.text, c.char_start + 1, c.char_end - c.char_start)"
+        join = f"JOIN {table}_pages p ON p.id = c.page_id"
+    else:
+        text, join = "c.content", ""
+    return {
+        "eager": f"""
+            SELECT c.id, {text} AS content, 1 - (c.embedding <=> %s::vector) AS similarity
+            FROM {table} c {join}
+            ORDER BY similarity DESC LIMIT {top_k}
+        """,
+        "lazy": f"""
+            WITH top AS (
+                SELECT c.id, 1 - (c.embedding <=> %s::vector) AS similarity
+                FROM {table} c ORDER BY similarity DESC LIMIT {top_k}
+            )
+            SELECT top.id, {text} AS content, top.similarity
+            FROM top JOIN {table} c ON c.id = top.id {join}
+            ORDER BY top.similarity DESC
+        """,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=2000, help="Pages of text to load")
+    parser.add_argument("--queries", type=int, default=20, help="Searches per measurement")
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--collection", help="Take page text from this collection")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    rng = random.Random(args.seed)
+    with psycopg.connect(settings.database_url, autocommit=True) as conn:
+        with conn.cursor() as cur:
+            if args.collection:
+                pages = _collection_pages(cur, args.collection, args.pages)
+                if not pages:
+                    raise SystemExit(f"No stored text for collection {args.collection}")
+            else:
+                pages = _generated_pages(args.pages, rng)
+            try:
+                chunk_count = _load(cur, pages, settings.embed_dim, rng)
+                print(f"{len(pages)} pages, {chunk_count} chunks, dim {settings.embed_dim}")
+                print(f"{'layout':<12} {'MiB':>8} {'eager ms':>9} {'lazy ms':>8}")
+                vectors = [_vector(settings.embed_dim, rng) for _ in range(args.queries)]
+                for layout in LAYOUTS:
+                    timings = {}
+                    for mode, sql in _queries(layout, args.top_k).items():
+                        cur.execute(sql, (vectors[0],))  # warm the cache
+                        samples = []
+                        for vector in vectors:
+                            started = time.perf_counter()
+                            cur.execute(sql, (vector,))
+                            cur.fetchall()
+                            samples.append((time.perf_counter() - started) * 1000)
+                        timings[mode] = statistics.median(samples)
+                    size = _size(cur, layout) / 1024**2
+                    print(
+                        f"{layout:<12} {size:>8.1f} {timings['eager']:>9.1f} "
+                        f"{timings['lazy']:>8.1f}"
+                    )
+            finally:
+                cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+
+
+if __name__ == "__main__":
+    main()
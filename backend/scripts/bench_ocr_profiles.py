@@ -0,0 +1,49 @@
+"""Report OCR throughput (pages/min) per OCR profile.
+
+Usage: python scripts/bench_ocr_profiles.py [corpus_dir] [--profiles fast,balanced]
+
+Every PDF under ``corpus_dir`` (default: ../corpora/test) is OCR'd with each
+profile into a temporary directory; source files are never modified. Pages are
+OCR'd even if they already have text (``--force-ocr``), so a born-digital corpus
+measures OCR too instead of being skipped.
+"""
+from __future__ import annotations
+
+import argparse
+import pathlib
+import tempfile
+import time
+
+from nexus.config import get_settings
+from nexus.ingest import ocr, pdf_extract_pypdf
+
+DEFAULT_CORPUS = pathlib.Path(__file__).resolve().parents[2] / "corpora" / "test"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", nargs="?", type=pathlib.Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--profiles", help="Comma-separated profile names (default: all)")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    profiles = args.profiles.split(",") if args.profiles else list(settings.ocr_profiles)
+    pdfs = sorted(args.corpus.rglob("*.pdf"))
+    if not pdfs:
+        raise SystemExit(f"No PDFs under {args.corpus}")
+    total_pages = sum(pdf_extract_pypdf.page_count(str(pdf)) for pdf in pdfs)
+    print(f"{len(pdfs)} files, {total_pages} pages")
+    print(f"{'profile':<10} {'seconds':>9} {'pages/min':>10}")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name in profiles:
+            started = time.perf_counter()
+            for pdf in pdfs:
+                dest = pathlib.Path(tmpdir) / name / pdf.name
+                ocr.run_ocr(pdf, "bench", dest=dest, profile=name, force=True)
+            elapsed = time.perf_counter() - started
+            print(f"{name:<10} {elapsed:>9.1f} {total_pages / elapsed * 60:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+
 from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -8,9 +11,21 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 
-from nexus.api import routes_chat, routes_docs, routes_eval, routes_ingest, routes_models
+from nexus.api import (
+    routes_chat,
+    routes_docs,
+    routes_eval,
+    routes_ingest,
+    routes_models,
+    routes_system,
+)
 from nexus.config import get_settings
 from nexus.db import ensure_schema
+from nexus.ingest import purge
+from nexus.resources import get_budget
+from nexus.worker import IngestWorker, default_worker_id
+
+logger = logging.getLogger(__name__)
 
 limiter = Limiter(key_func=get_remote_address, default_limits=["100/hour", "10/minute"])
 
@@ -40,6 +55,21 @@ app.add_middleware(
 @app.on_event("startup")
 async def _startup():
     await ensure_schema()
+    logger.info("Resource budget: %s", get_budget())
+    purge.get_purger().start()
+    if get_settings().api_worker:
+        # Uploads are queued; without this, only nexus-worker processes would ingest them.
+        app.state.worker = IngestWorker(worker_id=f"{default_worker_id()}:api")
+        app.state.worker_task = asyncio.create_task(app.state.worker.serve())
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await purge.get_purger().stop()
+    worker = getattr(app.state, "worker", None)
+    if worker is not None:
+        worker.stop()
+        await app.state.worker_task
 
 
 @app.get("/health")
@@ -52,3 +82,4 @@ app.include_router(routes_chat.router)
 app.include_router(routes_docs.router)
 app.include_router(routes_eval.router)
 app.include_router(routes_models.router)
+app.include_router(routes_system.router)
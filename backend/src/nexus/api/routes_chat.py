@@ -5,7 +5,7 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from slowapi.util import get_remote_address
 
 from nexus.api import deps
@@ -49,16 +49,22 @@ class ChatRequest(BaseModel):
 
 
 async def _retrieve(req: ChatRequest):
-    embedder = OllamaEmbedder()
-    q_embed = await embedder.embed_query(req.query)
-    chunks = await pgvector.search_chunks(
-        query_embedding=q_embed,
-        collections=req.collections,
-        tags=req.tags,
-        top_k=req.top_k,
-        min_score=req.min_score,
-    )
-    return chunks
+    # Queries must be embedded with the model each active version was built with,
+    # which a re-index may have changed from NEXUS_EMBED_MODEL.
+    chunks = []
+    for model, names in (await pgvector.collection_models(req.collections)).items():
+        q_embed = await OllamaEmbedder(model=model).embed_query(req.query)
+        chunks.extend(
+            await pgvector.search_chunks(
+                query_embedding=q_embed,
+                collections=names,
+                tags=req.tags,
+                top_k=req.top_k,
+                min_score=req.min_score,
+            )
+        )
+    chunks.sort(key=lambda c: c.score, reverse=True)
+    return chunks[: req.top_k]
 
 
 async def _get_chat_provider(provider_name: str):
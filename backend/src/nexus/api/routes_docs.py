@@ -1,16 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 from typing import List, Optional
+from urllib.parse import quote
 import pathlib
 
 import psycopg
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse, StreamingResponse
 from psycopg import rows
+from pydantic import BaseModel, Field, model_validator
 
 from nexus.api import deps
 from nexus.config import get_settings
 from nexus.db import db_connection
+from nexus.ingest import archives, purge
 
 router = APIRouter(
     prefix="/documents",
@@ -25,12 +29,22 @@ def _ensure_allowed_path(path: pathlib.Path, settings) -> None:
     """
     resolved = path.resolve()
     allowed_roots = [settings.processed_dir.resolve()]
+    if settings.upload_dir:
+        allowed_roots.append(settings.upload_dir.resolve())
     for coll in settings.corpora().collections.values():
         allowed_roots.extend([pathlib.Path(root).resolve() for root in coll.roots])
     if not any(resolved.is_relative_to(root) for root in allowed_roots):
         raise HTTPException(status_code=400, detail="Requested file outside allowed roots")
 
 
+def _attachment(filename: str) -> str:
+    """``Content-Disposition`` for ``filename``, encoded the way ``FileResponse`` does it."""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
 @router.get("")
 async def list_documents(
     collection: Optional[str] = None,
@@ -45,7 +59,7 @@ async def list_documents(
         raise HTTPException(status_code=400, detail="Tag too long")
 
     settings = get_settings()
-    clauses = []
+    clauses = ["c.active = TRUE", "d.deleted_at IS NULL"]
     params: list = []
     if collection:
         clauses.append("c.name = %s")
@@ -56,7 +70,7 @@ async def list_documents(
     if tag:
         clauses.append("%s = ANY(d.tags)")
         params.append(tag)
-    where = "WHERE " + " AND ".join(clauses) if clauses else ""
+    where = "WHERE " + " AND ".join(clauses)
     sql = f"""
     SELECT d.id, d.path, d.tags, d.status, d.ocr_applied, d.processed_path, d.extracted_chars, d.empty_page_ratio, d.quality, c.name AS collection
     FROM documents d
@@ -87,19 +101,72 @@ async def update_tags(doc_id: int, tags: List[str]):
     async with db_connection(row_factory=rows.dict_row) as conn:
         async with conn.cursor() as cur:
             await cur.execute(
-                "UPDATE documents SET tags = %s WHERE id = %s RETURNING id", (tags, doc_id)
+                "UPDATE documents SET tags = %s WHERE id = %s AND deleted_at IS NULL RETURNING id",
+                (tags, doc_id),
             )
             row = await cur.fetchone()
             if not row:
                 raise HTTPException(status_code=404, detail="Document not found")
+        await conn.commit()
     return {"id": doc_id, "tags": tags}
 
 
+class BulkDeleteRequest(BaseModel):
+    collection: Optional[str] = Field(default=None, max_length=100)
+    tag: Optional[str] = Field(default=None, max_length=100)
+    path_prefix: Optional[str] = Field(default=None, min_length=1, max_length=1000)
+
+    @model_validator(mode="after")
+    def require_filter(self) -> "BulkDeleteRequest":
+        if not (self.collection or self.tag or self.path_prefix):
+            raise ValueError("At least one of collection, tag or path_prefix is required")
+        return self
+
+
+@router.post("/bulk-delete", status_code=status.HTTP_202_ACCEPTED)
+async def bulk_delete_documents(req: BulkDeleteRequest):
+    """Hide every document of the active collections matching all given filters.
+
+    Search excludes them immediately; their chunks are removed in the background.
+    """
+    clauses = ["c.active = TRUE", "d.deleted_at IS NULL"]
+    params: list = []
+    if req.collection:
+        clauses.append("c.name = %s")
+        params.append(req.collection)
+    if req.tag:
+        clauses.append("%s = ANY(d.tags)")
+        params.append(req.tag)
+    if req.path_prefix:
+        clauses.append("starts_with(d.path, %s)")
+        params.append(req.path_prefix)
+    async with db_connection(row_factory=rows.dict_row) as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                f"""
+                UPDATE documents d SET deleted_at = NOW()
+                FROM collections c
+                WHERE c.id = d.collection_id AND {" AND ".join(clauses)}
+                """,
+                params,
+            )
+            deleted = cur.rowcount
+        await conn.commit()
+    purge.get_purger().wake()
+    return {"status": "deleting", "documents": deleted}
+
+
 @router.delete("/{doc_id}")
 async def delete_document(doc_id: int):
+    """Hide the document at once; its chunks are removed in the background."""
     async with db_connection() as conn:
         async with conn.cursor() as cur:
-            await cur.execute("DELETE FROM documents WHERE id = %s", (doc_id,))
+            await cur.execute(
+                "UPDATE documents SET deleted_at = NOW() WHERE id = %s AND deleted_at IS NULL",
+                (doc_id,),
+            )
+        await conn.commit()
+    purge.get_purger().wake()
     return {"status": "deleted"}
 
 
@@ -109,13 +176,26 @@ async def fetch_document_file(doc_id: int, processed: bool = False):
     async with db_connection(row_factory=rows.dict_row) as conn:
         async with conn.cursor() as cur:
             await cur.execute(
-                "SELECT path, processed_path FROM documents WHERE id = %s",
+                "SELECT path, processed_path FROM documents WHERE id = %s AND deleted_at IS NULL",
                 (doc_id,),
             )
             row = await cur.fetchone()
             if not row:
                 raise HTTPException(status_code=404, detail="Document not found")
     target = row["processed_path"] if processed and row.get("processed_path") else row["path"]
+    member = archives.split(target)
+    if member is not None:
+        # Document inside an archive: stream the member without unpacking it.
+        archive, name = member
+        _ensure_allowed_path(archive, settings)
+        resolved = archives.member_path(archive.resolve(), name)
+        if not await asyncio.to_thread(archives.exists, resolved):
+            raise HTTPException(status_code=404, detail="File not found on disk")
+        return StreamingResponse(
+            archives.iter_bytes(resolved),
+            media_type="application/pdf",
+            headers={"Content-Disposition": _attachment(pathlib.PurePath(name).name)},
+        )
     file_path = pathlib.Path(target)
     _ensure_allowed_path(file_path, settings)
     resolved = file_path.resolve()
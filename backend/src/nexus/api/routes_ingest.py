@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-import asyncio
-from typing import Literal
+from dataclasses import asdict
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
+from psycopg import rows
+from pydantic import BaseModel
 
 from nexus.api import deps
-from nexus.ingest.pipeline import ingest_collection
+from nexus.config import get_settings
+from nexus.db import db_connection
+from nexus.ingest import queue, upload
+from nexus.ingest.pipeline import IngestInProgressError, ingest_collection
+from nexus.ingest.reindex import reindex_collection
 
 router = APIRouter(
     prefix="/ingest",
@@ -15,10 +21,88 @@ router = APIRouter(
 )
 
 
+class ReindexRequest(BaseModel):
+    embed_model: Optional[str] = None
+    chunk_size: Optional[int] = None
+    chunk_overlap: Optional[int] = None
+    keep_old: bool = False
+
+
 @router.post("/{collection}")
 async def trigger_ingest(collection: Literal["library", "dev", "test"]):
     try:
         summary = await ingest_collection(collection)
         return summary.__dict__
+    except IngestInProgressError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.get("/queue")
+async def get_queue():
+    """Ingest queue item counts per status."""
+    async with db_connection(row_factory=rows.dict_row) as conn:
+        async with conn.cursor() as cur:
+            return await queue.queue_depth(cur)
+
+
+@router.post("/{collection}/enqueue", status_code=status.HTTP_202_ACCEPTED)
+async def trigger_enqueue(collection: Literal["library", "dev", "test"]):
+    """Queue the files of ``collection`` for the nexus-worker processes."""
+    try:
+        enqueued = await queue.enqueue_collection(collection)
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"collection": collection, "enqueued": enqueued}
+
+
+@router.post("/{collection}/upload", status_code=status.HTTP_202_ACCEPTED)
+async def upload_document(
+    collection: Literal["library", "dev", "test"],
+    request: Request,
+    response: Response,
+    filename: Optional[str] = None,
+):
+    """Store an uploaded PDF and queue it for the ingest workers.
+
+    Accepts ``multipart/form-data`` with a ``file`` part, or the PDF itself as the
+    (optionally chunked) body with ``?filename=``. Content already in the collection
+    is not stored again; the response then names the existing document.
+    """
+    length = request.headers.get("content-length")
+    if length and int(length) > get_settings().max_file_size_mb * 1024 * 1024:
+        raise HTTPException(status_code=413, detail="Upload too large")
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        source = upload.MultipartUpload(content_type, request.stream())
+    else:
+        source = upload.RawUpload(filename, request.stream())
+    try:
+        result = await upload.store_upload(collection, source)
+    except upload.UploadTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    except upload.UploadError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if result.status == "duplicate":
+        response.status_code = status.HTTP_200_OK
+    return {"collection": collection, **asdict(result)}
+
+
+@router.post("/{collection}/reindex", status_code=status.HTTP_202_ACCEPTED)
+async def trigger_reindex(
+    collection: Literal["library", "dev", "test"],
+    background_tasks: BackgroundTasks,
+    req: ReindexRequest | None = None,
+):
+    """Build a new collection version in the background; the current one keeps serving."""
+    req = req or ReindexRequest()
+    background_tasks.add_task(
+        reindex_collection,
+        collection,
+        embed_model=req.embed_model,
+        chunk_size=req.chunk_size,
+        chunk_overlap=req.chunk_overlap,
+        gc=not req.keep_old,
+    )
+    return {"status": "started", "collection": collection}
@@ -1,11 +1,9 @@
 from __future__ import annotations
 
-import httpx
-
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 
 from nexus.api import deps
-from nexus.config import get_settings
+from nexus.ollama_pool import NoEndpointAvailableError, get_pool
 
 router = APIRouter(
     prefix="/models",
@@ -16,22 +14,9 @@ router = APIRouter(
 
 @router.get("/ollama")
 async def list_ollama_models():
-    """List available models from local Ollama instance."""
-    settings = get_settings()
-    async with httpx.AsyncClient(timeout=30) as client:
-        response = await client.get(f"{settings.ollama_url}/api/tags")
-        response.raise_for_status()
-        data = response.json()
-
-        models = [
-            {
-                "name": model["name"],
-                "size": model.get("size", 0),
-                "modified_at": model.get("modified_at"),
-            }
-            for model in data.get("models", [])
-        ]
-
-        models.sort(key=lambda m: m["name"])
-
-        return {"models": models}
+    """List available models across the configured Ollama endpoints."""
+    try:
+        models = await get_pool().list_models()
+    except NoEndpointAvailableError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    return {"models": models}
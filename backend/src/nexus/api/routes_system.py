@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from nexus import metrics, resources
+from nexus.api import deps
+
+router = APIRouter(
+    prefix="/system",
+    tags=["system"],
+    dependencies=[Depends(deps.require_api_key)],
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Process metrics in Prometheus text exposition format."""
+    return metrics.render()
+
+
+@router.get("/resources")
+async def get_resources():
+    """Detected container limits and the effective pool and batch sizes."""
+    return resources.get_budget().as_dict()
@@ -11,6 +11,9 @@ class RetrievedChunk:
     page: int
     score: float
     content: str
+    # Offsets of ``content`` in the page's text, for highlighting and merging spans.
+    char_start: int | None = None
+    char_end: int | None = None
 
 
 class Embedder(Protocol):
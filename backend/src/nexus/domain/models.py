@@ -42,9 +42,12 @@ class Chunk:
     document_id: int
     page: int
     chunk_index: int
-    content: str
+    content: str | None  # None when the text lives in pages (see page_id)
     content_hash: str
     embedding: list[float] | None
+    page_id: int | None = None
+    char_start: int | None = None
+    char_end: int | None = None
 
 
 @dataclass
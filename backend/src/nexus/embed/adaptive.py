@@ -0,0 +1,166 @@
+"""AIMD-controlled batching and concurrency for bulk embedding.
+
+The controller grows the number of in-flight ``/api/embed`` requests and the batch
+size additively while Ollama answers within the target latency, and cuts them
+multiplicatively on timeouts, 429/5xx responses or slow answers.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+import httpx
+
+from nexus import metrics
+from nexus.config import get_settings
+from nexus.embed.ollama_embed import EmbeddedSegment, OllamaEmbedder, pool_segments
+from nexus.resources import get_budget
+
+logger = logging.getLogger(__name__)
+
+OVERLOAD_STATUS = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class AIMDController:
+    concurrency: float
+    batch_size: float
+    max_concurrency: int
+    max_batch_size: int
+    target_latency: float
+    min_concurrency: int = 1
+    min_batch_size: int = 1
+    decrease_factor: float = 0.5
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_concurrency, int(self.concurrency))
+
+    @property
+    def batch(self) -> int:
+        return max(self.min_batch_size, int(self.batch_size))
+
+    def on_success(self, latency: float) -> None:
+        if latency > self.target_latency:
+            # Slow answers are the first sign of a saturated host: back off early.
+            self.concurrency = max(self.min_concurrency, self.concurrency * self.decrease_factor)
+            self.batch_size = max(self.min_batch_size, self.batch_size * self.decrease_factor)
+        else:
+            # +1 in-flight request per fully acknowledged window.
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.limit)
+            if latency < self.target_latency / 2:
+                self.batch_size = min(self.max_batch_size, self.batch_size + 1)
+        self._publish()
+
+    def on_overload(self, timeout: bool = False) -> None:
+        self.concurrency = max(self.min_concurrency, self.concurrency * self.decrease_factor)
+        if timeout:
+            self.batch_size = max(self.min_batch_size, self.batch_size * self.decrease_factor)
+        self._publish()
+
+    def _publish(self) -> None:
+        metrics.set_gauge("nexus_embed_concurrency", self.limit)
+        metrics.set_gauge("nexus_embed_batch_size", self.batch)
+
+
+def default_controller() -> AIMDController:
+    settings = get_settings()
+    batch_size = get_budget().embed_batch_size
+    endpoints = max(1, len(settings.ollama_urls))
+    controller = AIMDController(
+        concurrency=1,
+        batch_size=batch_size,
+        # Per Ollama endpoint: least-outstanding routing spreads batches over the pool.
+        max_concurrency=max(1, settings.embed_max_concurrency) * endpoints,
+        max_batch_size=max(batch_size, settings.embed_max_batch_size),
+        target_latency=settings.embed_target_latency_seconds,
+    )
+    controller._publish()
+    return controller
+
+
+class AdaptiveEmbedder:
+    """Bulk embedder that batches and parallelises requests under an AIMD controller."""
+
+    def __init__(
+        self,
+        inner: OllamaEmbedder | None = None,
+        controller: AIMDController | None = None,
+        model: str | None = None,
+    ):
+        self.inner = inner or OllamaEmbedder(model=model)
+        self.controller = controller or default_controller()
+        self.max_retries = get_settings().embed_max_retries
+        self._inflight = 0
+        self._cond = asyncio.Condition()
+
+    async def _acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._inflight < self.controller.limit)
+            self._inflight += 1
+
+    async def _release(self) -> None:
+        async with self._cond:
+            self._inflight -= 1
+            self._cond.notify_all()
+
+    async def _run_batch(self, texts: list[str]) -> list[list[EmbeddedSegment]]:
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                result = await self.inner.embed_segments(texts)
+            except httpx.TimeoutException:
+                reason, timeout = "timeout", True
+            except httpx.HTTPStatusError as exc:
+                if exc.response.status_code not in OVERLOAD_STATUS:
+                    raise
+                reason, timeout = str(exc.response.status_code), False
+            else:
+                self.controller.on_success(time.monotonic() - started)
+                return result
+            metrics.inc("nexus_embed_overload_total", reason=reason)
+            self.controller.on_overload(timeout=timeout)
+            attempt += 1
+            if attempt > self.max_retries:
+                raise RuntimeError(f"Embedding failed after {attempt} overloaded attempts")
+            logger.warning(
+                "Ollama overloaded (%s), retrying with concurrency=%d batch=%d",
+                reason,
+                self.controller.limit,
+                self.controller.batch,
+            )
+            await asyncio.sleep(min(30.0, 0.5 * 2**attempt))
+
+    async def embed_segments(self, texts: list[str]) -> list[list[EmbeddedSegment]]:
+        results: list[list[EmbeddedSegment]] = [[] for _ in texts]
+
+        async def run(start: int, end: int) -> None:
+            try:
+                for offset, segments in enumerate(await self._run_batch(texts[start:end])):
+                    results[start + offset] = segments
+            finally:
+                await self._release()
+
+        tasks: list[asyncio.Task] = []
+        pos = 0
+        try:
+            while pos < len(texts):
+                await self._acquire()
+                end = min(len(texts), pos + self.controller.batch)
+                tasks.append(asyncio.create_task(run(pos, end)))
+                pos = end
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return results
+
+    async def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [pool_segments(segments) for segments in await self.embed_segments(texts)]
+
+    async def embed_query(self, text: str) -> list[float]:
+        return await self.inner.embed_query(text)
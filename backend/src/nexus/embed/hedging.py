@@ -0,0 +1,117 @@
+"""Hedged requests for query embeddings.
+
+When a query embedding has not returned within the ``embed_hedge_percentile`` of
+recent query latencies, a second request is sent (to another Ollama endpoint when
+the pool has one) and whichever answers first wins; the other is cancelled. A
+token bucket refilled by ``embed_hedge_budget`` per request caps the extra load.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Awaitable, Callable, TypeVar
+
+from nexus import metrics
+from nexus.config import get_settings
+
+T = TypeVar("T")
+
+WINDOW = 200
+# Below this many samples the percentile is noise; hedge after COLD_DELAY instead.
+MIN_SAMPLES = 20
+COLD_DELAY = 1.0
+BURST = 5.0
+
+
+class LatencyTracker:
+    def __init__(self, window: int = WINDOW):
+        self.samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> float | None:
+        if len(self.samples) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+    def delay(self, pct: float, min_delay: float) -> float:
+        value = self.percentile(pct)
+        return COLD_DELAY if value is None else max(min_delay, value)
+
+
+class HedgeBudget:
+    """Token bucket: each request earns ``ratio`` tokens, each hedge spends one."""
+
+    def __init__(self, ratio: float, burst: float = BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = min(1.0, burst)
+
+    def earn(self) -> None:
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+_trackers: dict[str, LatencyTracker] = {}
+
+
+def tracker(key: str) -> LatencyTracker:
+    """Process-wide latency window for ``key`` (e.g. the embedding model)."""
+    if key not in _trackers:
+        _trackers[key] = LatencyTracker()
+    return _trackers[key]
+
+
+@lru_cache(maxsize=1)
+def hedge_budget() -> HedgeBudget:
+    """Process-wide hedge budget shared by all query embeddings."""
+    return HedgeBudget(get_settings().embed_hedge_budget)
+
+
+async def hedged(
+    request: Callable[[int], Awaitable[T]],
+    delay: float,
+    budget: HedgeBudget,
+    latency: LatencyTracker | None = None,
+) -> T:
+    """Run ``request(0)``; if it is still running after ``delay``, race it with ``request(1)``."""
+    budget.earn()
+    started = time.monotonic()
+    tasks = [asyncio.ensure_future(request(0))]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            if budget.try_spend():
+                metrics.inc("nexus_embed_hedges_total")
+                tasks.append(asyncio.ensure_future(request(1)))
+            else:
+                metrics.inc("nexus_embed_hedges_skipped_total")
+        pending = set(tasks)
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = next((t for t in done if t.exception() is None), None)
+            if winner is not None:
+                break
+            if not pending:
+                # Every attempt failed: surface the primary's error.
+                return tasks[0].result()
+        if latency is not None:
+            latency.record(time.monotonic() - started)
+        if len(tasks) > 1:
+            won = "hedge" if winner is tasks[1] else "primary"
+            metrics.inc("nexus_embed_hedge_wins_total", winner=won)
+        return winner.result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
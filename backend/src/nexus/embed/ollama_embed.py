@@ -1,46 +1,173 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
 import httpx
 
+from nexus import metrics
 from nexus.config import get_settings
 from nexus.domain.interfaces import Embedder
+from nexus.embed import hedging
+from nexus.embed.scheduler import BULK, INTERACTIVE, get_scheduler
+from nexus.ollama_pool import Endpoint, OllamaPool, get_pool
+
+
+class ContextLengthExceededError(Exception):
+    pass
+
+
+@dataclass
+class EmbeddedSegment:
+    """Embedding of ``text[start:end]`` of one input text."""
+
+    start: int
+    end: int
+    embedding: list[float]
+
+
+def pool_segments(segments: list[EmbeddedSegment]) -> list[float]:
+    """Length-weighted mean of segment embeddings (the embedding itself for one segment)."""
+    if len(segments) == 1:
+        return segments[0].embedding
+    total = sum(max(1, seg.end - seg.start) for seg in segments)
+    mean = [0.0] * len(segments[0].embedding)
+    for seg in segments:
+        weight = max(1, seg.end - seg.start) / total
+        for i, value in enumerate(seg.embedding):
+            mean[i] += weight * value
+    return mean
+
+
+def _split_point(text: str, start: int, end: int) -> int:
+    """Split near the middle of ``text[start:end]``, preferring a whitespace boundary."""
+    mid = (start + end) // 2
+    window = (end - start) // 4
+    for offset in range(window):
+        for pos in (mid - offset, mid + offset):
+            if start < pos < end and text[pos].isspace():
+                return pos
+    return mid
+
+
+def _error_message(resp: httpx.Response) -> str:
+    try:
+        return str(resp.json().get("error", ""))
+    except ValueError:
+        return resp.text
 
 
 class OllamaEmbedder(Embedder):
-    def __init__(self, client: httpx.AsyncClient | None = None):
+    def __init__(
+        self,
+        client: httpx.AsyncClient | None = None,
+        model: str | None = None,
+        pool: OllamaPool | None = None,
+    ):
+        """Requests go to ``client`` when given, else to the endpoint pool."""
         self.settings = get_settings()
-        self.client = client or httpx.AsyncClient(
-            base_url=self.settings.ollama_url, timeout=self.settings.timeout_seconds
-        )
+        self.model = model or self.settings.embed_model
+        self.client = client
+        self.pool = pool
+
+    @asynccontextmanager
+    async def _client(
+        self, used: set[Endpoint] | None = None
+    ) -> AsyncIterator[httpx.AsyncClient]:
+        """Client for one request; pool endpoints already in ``used`` are avoided."""
+        if self.client is not None:
+            yield self.client
+            return
+        async with (self.pool or get_pool()).endpoint(self.model, used) as endpoint:
+            if used is not None:
+                used.add(endpoint)
+            yield endpoint.client
+
+    async def _post_embed(self, texts: list[str]) -> list[list[float]]:
+        async with get_scheduler().slot(BULK), self._client() as client:
+            resp = await client.post(
+                "/api/embed",
+                json={"model": self.model, "input": texts, "truncate": False},
+            )
+            if resp.status_code == 400:
+                error = _error_message(resp)
+                if "context length" in error:
+                    raise ContextLengthExceededError(error)
+            resp.raise_for_status()
+        return resp.json()["embeddings"]
+
+    async def _embed_items(
+        self, texts: list[str], items: list[tuple[int, int, int]]
+    ) -> list[tuple[int, EmbeddedSegment]]:
+        try:
+            vectors = await self._post_embed([texts[i][s:e] for i, s, e in items])
+        except ContextLengthExceededError:
+            if len(items) == 1:
+                idx, start, end = items[0]
+                if end - start <= 1:
+                    raise
+                # This input overflows on its own: embed its halves.
+                cut = _split_point(texts[idx], start, end)
+                metrics.inc("nexus_embed_overflow_splits_total")
+                return await self._embed_items(texts, [(idx, start, cut), (idx, cut, end)])
+            # Bisect the batch to identify the overflowing inputs individually.
+            mid = len(items) // 2
+            left, right = await asyncio.gather(
+                self._embed_items(texts, items[:mid]), self._embed_items(texts, items[mid:])
+            )
+            return left + right
+        return [
+            (i, EmbeddedSegment(start=s, end=e, embedding=v))
+            for (i, s, e), v in zip(items, vectors, strict=True)
+        ]
+
+    async def embed_segments(self, texts: list[str]) -> list[list[EmbeddedSegment]]:
+        """Embed ``texts``, splitting inputs that exceed the model context into segments.
+
+        Returns one list of segments per input, ordered by offset. Inputs that fit are
+        returned as a single segment covering the whole text.
+        """
+        if not texts:
+            return []
+        items = [(idx, 0, len(text)) for idx, text in enumerate(texts)]
+        segments: list[list[EmbeddedSegment]] = [[] for _ in texts]
+        for idx, segment in await self._embed_items(list(texts), items):
+            segments[idx].append(segment)
+        for per_text in segments:
+            per_text.sort(key=lambda seg: seg.start)
+        return segments
 
     async def embed_documents(self, texts: list[str]) -> list[list[float]]:
-        """Embed multiple documents. Ollama /api/embed accepts 'input' as string or list."""
-        resp = await self.client.post(
-            "/api/embed",
-            json={"model": self.settings.embed_model, "input": texts},
-        )
-        if resp.status_code == 400:
-            # Context length exceeded - truncate and retry
-            error_data = resp.json()
-            if "context length" in error_data.get("error", ""):
-                # Truncate to ~400 chars (conservative estimate)
-                truncated = [t[:400] for t in texts]
-                resp = await self.client.post(
-                    "/api/embed",
-                    json={"model": self.settings.embed_model, "input": truncated},
-                )
-        resp.raise_for_status()
-        data = resp.json()
-        return data["embeddings"]
+        """Embed multiple documents, one vector per input.
 
-    async def embed_query(self, text: str) -> list[float]:
-        """Embed a single query string."""
-        resp = await self.client.post(
-            "/api/embed",
-            json={"model": self.settings.embed_model, "input": text},
-        )
-        resp.raise_for_status()
+        Inputs that had to be split are represented by the length-weighted mean of
+        their segment embeddings; use ``embed_segments`` to keep segments separate.
+        """
+        return [pool_segments(segments) for segments in await self.embed_segments(texts)]
+
+    async def _query(self, text: str, used: set[Endpoint] | None = None) -> list[float]:
+        async with get_scheduler().slot(INTERACTIVE), self._client(used) as client:
+            resp = await client.post(
+                "/api/embed",
+                json={"model": self.model, "input": text},
+            )
+            resp.raise_for_status()
         data = resp.json()
         # Single input returns embeddings as list with one item
         embeddings = data["embeddings"]
         return embeddings[0] if isinstance(embeddings, list) else embeddings
+
+    async def embed_query(self, text: str) -> list[float]:
+        """Embed a single query string, hedged when ``embed_hedge`` is enabled."""
+        if not self.settings.embed_hedge:
+            return await self._query(text)
+        latency = hedging.tracker(self.model)
+        delay = latency.delay(
+            self.settings.embed_hedge_percentile, self.settings.embed_hedge_min_delay_seconds
+        )
+        used: set[Endpoint] = set()
+        return await hedging.hedged(
+            lambda attempt: self._query(text, used), delay, hedging.hedge_budget(), latency
+        )
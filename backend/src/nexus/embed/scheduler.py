@@ -0,0 +1,89 @@
+"""Process-wide priority lanes for ``/api/embed`` requests.
+
+Query embeddings (the interactive lane) are sent straight away. Document batches
+(the bulk lane) are admitted up to ``embed_bulk_max_inflight`` at a time, and to
+only ``embed_bulk_inflight_contended`` while an interactive request is waiting for
+its answer, so Ollama's queue stays short enough for a query to get through
+during a large ingest. Queue time and request counts are recorded per lane.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Literal
+
+from nexus import metrics
+from nexus.config import get_settings
+
+Lane = Literal["interactive", "bulk"]
+INTERACTIVE: Lane = "interactive"
+BULK: Lane = "bulk"
+
+
+class EmbedScheduler:
+    def __init__(
+        self, bulk_max_inflight: int | None = None, bulk_inflight_contended: int | None = None
+    ):
+        settings = get_settings()
+        self.bulk_max_inflight = bulk_max_inflight or settings.embed_bulk_max_inflight
+        self.bulk_inflight_contended = (
+            bulk_inflight_contended
+            if bulk_inflight_contended is not None
+            else settings.embed_bulk_inflight_contended
+        )
+        self.inflight: dict[str, int] = {INTERACTIVE: 0, BULK: 0}
+        self.waiting: dict[str, int] = {INTERACTIVE: 0, BULK: 0}
+        self._cond = asyncio.Condition()
+
+    @property
+    def contended(self) -> bool:
+        return bool(self.inflight[INTERACTIVE] or self.waiting[INTERACTIVE])
+
+    def _bulk_admissible(self) -> bool:
+        limit = self.bulk_inflight_contended if self.contended else self.bulk_max_inflight
+        return limit is None or self.inflight[BULK] < limit
+
+    def _publish(self) -> None:
+        for lane in (INTERACTIVE, BULK):
+            metrics.set_gauge("nexus_embed_lane_inflight", self.inflight[lane], lane=lane)
+            metrics.set_gauge("nexus_embed_lane_waiting", self.waiting[lane], lane=lane)
+
+    @asynccontextmanager
+    async def slot(self, lane: Lane) -> AsyncIterator[None]:
+        """Hold one in-flight embedding request in ``lane`` for the duration of the block."""
+        started = time.monotonic()
+        async with self._cond:
+            self.waiting[lane] += 1
+            self._publish()
+            try:
+                if lane == BULK:
+                    await self._cond.wait_for(self._bulk_admissible)
+            finally:
+                self.waiting[lane] -= 1
+            self.inflight[lane] += 1
+            self._publish()
+        metrics.inc("nexus_embed_lane_requests_total", lane=lane)
+        metrics.inc("nexus_embed_lane_queue_seconds_total", time.monotonic() - started, lane=lane)
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self.inflight[lane] -= 1
+                self._publish()
+                self._cond.notify_all()
+
+
+_schedulers: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, EmbedScheduler] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_scheduler() -> EmbedScheduler:
+    """The scheduler shared by every embedder running on the current event loop."""
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = _schedulers[loop] = EmbedScheduler()
+    return scheduler
@@ -3,10 +3,9 @@ from __future__ import annotations
 import asyncio
 from typing import AsyncIterator, List
 
-import httpx
-
 from nexus.config import get_settings
 from nexus.generate import prompts
+from nexus.ollama_pool import get_pool
 
 
 async def chat(
@@ -27,10 +26,8 @@ async def chat(
         options["top_p"] = top_p
     if max_tokens is not None:
         options["num_predict"] = max_tokens
-    async with httpx.AsyncClient(
-        base_url=settings.ollama_url, timeout=settings.timeout_seconds
-    ) as client:
-        resp = await client.post(
+    async with get_pool().endpoint(model) as endpoint:
+        resp = await endpoint.client.post(
             "/api/chat",
             json={
                 "model": model,
@@ -61,10 +58,8 @@ async def stream_chat(
         options["top_p"] = top_p
     if max_tokens is not None:
         options["num_predict"] = max_tokens
-    async with httpx.AsyncClient(
-        base_url=settings.ollama_url, timeout=settings.timeout_seconds
-    ) as client:
-        async with client.stream(
+    async with get_pool().endpoint(model) as endpoint:
+        async with endpoint.client.stream(
             "POST",
             "/api/chat",
             json={
@@ -0,0 +1,216 @@
+"""ZIP and TAR archives as virtual directories of a collection root.
+
+A PDF inside an archive is addressed as ``<archive path>!/<member name>``, e.g.
+``/corpora/library/drop-2024.zip!/reports/q1.pdf``. Discovery hashes members while
+streaming them out of the archive and pypdf reads them straight from the member
+stream, so archives never need to be unpacked under the corpora. Only OCR, which
+runs ``ocrmypdf`` on a file, copies a member out (to the processed directory), and
+so does ingest for members of compressed tars (see ``is_compressed_tar_member``).
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import io
+import logging
+import pathlib
+import tarfile
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import BinaryIO, Iterator
+
+logger = logging.getLogger(__name__)
+
+SEPARATOR = "!/"
+ZIP_SUFFIXES = (".zip",)
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+
+@dataclass
+class Member:
+    path: str  # <archive>!/<member>
+    name: str
+    sha256: str
+    mtime: int
+    size: int
+
+
+def is_archive(name: str) -> bool:
+    return name.lower().endswith(ZIP_SUFFIXES + TAR_SUFFIXES)
+
+
+def member_path(archive: pathlib.Path | str, name: str) -> str:
+    return f"{archive}{SEPARATOR}{name}"
+
+
+def split(path: pathlib.Path | str) -> tuple[pathlib.Path, str] | None:
+    """``(archive, member name)`` for a member path, ``None`` for a plain file."""
+    archive, sep, name = str(path).partition(SEPARATOR)
+    if not sep or not is_archive(archive):
+        return None
+    return pathlib.Path(archive), name
+
+
+def is_member(path: pathlib.Path | str) -> bool:
+    return split(path) is not None
+
+
+def _normalize(name: str) -> str | None:
+    """Member name without a leading "./", or ``None`` if it points outside the archive."""
+    # Names become paths under the processed directory (OCR output), so "../" or an
+    # absolute name would write outside it (zip slip).
+    parts = pathlib.PurePosixPath(name.replace("\\", "/")).parts
+    if name.startswith(("/", "\\")) or ".." in parts or (parts and ":" in parts[0]):
+        logger.warning("Skipping archive member with unsafe name %r", name)
+        return None
+    return name.removeprefix("./")
+
+
+def _hash(handle: BinaryIO, buffer_size: int) -> str:
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: handle.read(buffer_size), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_members(
+    archive: pathlib.Path, max_size: int, buffer_size: int = 1024 * 1024, hash_members: bool = True
+) -> Iterator[Member]:
+    """Hash the PDF members of ``archive`` (up to ``max_size`` bytes each) in one pass.
+
+    Without ``hash_members`` only the archive index is read and ``sha256`` is empty.
+    """
+    if archive.name.lower().endswith(ZIP_SUFFIXES):
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or not info.filename.lower().endswith(".pdf"):
+                    continue
+                name = _normalize(info.filename)
+                if name is None:
+                    continue
+                if info.file_size > max_size:
+                    continue
+                sha256 = ""
+                if hash_members:
+                    with zf.open(info) as handle:
+                        sha256 = _hash(handle, buffer_size)
+                mtime = int(datetime(*info.date_time).timestamp())
+                yield Member(member_path(archive, name), name, sha256, mtime, info.file_size)
+        return
+    # Streaming mode reads compressed tars front to back exactly once.
+    with tarfile.open(archive, mode="r|*") as tf:
+        for info in tf:
+            if not info.isfile() or not info.name.lower().endswith(".pdf"):
+                continue
+            name = _normalize(info.name)
+            if name is None:
+                continue
+            if info.size > max_size:
+                continue
+            sha256 = _hash(tf.extractfile(info), buffer_size) if hash_members else ""
+            yield Member(member_path(archive, name), name, sha256, int(info.mtime), info.size)
+
+
+# Member paths drop a leading "./" of the stored name; lookups try both.
+def _zip_info(zf: zipfile.ZipFile, name: str) -> zipfile.ZipInfo:
+    try:
+        return zf.getinfo(name)
+    except KeyError:
+        return zf.getinfo(f"./{name}")
+
+
+def _tar_member(tf: tarfile.TarFile, name: str) -> BinaryIO:
+    try:
+        info = tf.getmember(name)
+    except KeyError:
+        info = tf.getmember(f"./{name}")
+    return tf.extractfile(info)
+
+
+@contextlib.contextmanager
+def open_member(path: pathlib.Path | str) -> Iterator[BinaryIO]:
+    """Seekable binary stream of an archive member.
+
+    Stored ZIP members and members of uncompressed tars are read in place;
+    compressed members are inflated into memory because pypdf seeks backwards
+    (the cross-reference table sits at the end of the file).
+    """
+    archive, name = split(path)
+    if archive.name.lower().endswith(ZIP_SUFFIXES):
+        with zipfile.ZipFile(archive) as zf:
+            info = _zip_info(zf, name)
+            with zf.open(info) as handle:
+                if info.compress_type == zipfile.ZIP_STORED:
+                    yield handle
+                else:
+                    yield io.BytesIO(handle.read())
+        return
+    with tarfile.open(archive, mode="r:*") as tf:
+        handle = _tar_member(tf, name)
+        if archive.name.lower().endswith(".tar"):
+            yield handle
+        else:
+            yield io.BytesIO(handle.read())
+
+
+def exists(path: pathlib.Path | str) -> bool:
+    """Whether ``path`` names a member of an existing, readable archive."""
+    parts = split(path)
+    if parts is None or not parts[0].is_file():
+        return False
+    archive, name = parts
+    try:
+        if archive.name.lower().endswith(ZIP_SUFFIXES):
+            with zipfile.ZipFile(archive) as zf:
+                _zip_info(zf, name)
+        else:
+            with tarfile.open(archive, mode="r:*") as tf:
+                _tar_member(tf, name)
+    except (KeyError, OSError, tarfile.TarError, zipfile.BadZipFile):
+        return False
+    return True
+
+
+@contextlib.contextmanager
+def open_source(path: pathlib.Path | str) -> Iterator[str | BinaryIO]:
+    """What pypdf should read for ``path``: the path itself or the member stream."""
+    if not is_member(path):
+        yield str(path)
+        return
+    with open_member(path) as handle:
+        yield handle
+
+
+def is_compressed_tar_member(path: pathlib.Path | str) -> bool:
+    """Whether each read of member ``path`` decompresses its archive from the start.
+
+    A compressed tar has no index, so every ``open_member`` inflates everything up to
+    the member; callers that read it several times should ``copy_member`` it once.
+    """
+    parts = split(path)
+    if parts is None:
+        return False
+    name = parts[0].name.lower()
+    return name.endswith(TAR_SUFFIXES) and not name.endswith(".tar")
+
+
+def copy_member(
+    path: pathlib.Path | str, dest: BinaryIO, buffer_size: int = 1024 * 1024
+) -> None:
+    """Write the bytes of member ``path`` to ``dest``."""
+    for chunk in iter_bytes(path, buffer_size):
+        dest.write(chunk)
+    dest.flush()
+
+
+def iter_bytes(path: pathlib.Path | str, buffer_size: int = 1024 * 1024) -> Iterator[bytes]:
+    """Stream the bytes of an archive member, e.g. for an HTTP response."""
+    archive, name = split(path)
+    if archive.name.lower().endswith(ZIP_SUFFIXES):
+        with zipfile.ZipFile(archive) as zf, zf.open(_zip_info(zf, name)) as handle:
+            yield from iter(lambda: handle.read(buffer_size), b"")
+        return
+    with tarfile.open(archive, mode="r:*") as tf:
+        handle = _tar_member(tf, name)
+        yield from iter(lambda: handle.read(buffer_size), b"")
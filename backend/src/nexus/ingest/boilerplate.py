@@ -0,0 +1,118 @@
+"""Detection and removal of running headers, footers and page numbers.
+
+Lines near the top or bottom of a page whose signature (digits folded to ``#``,
+case-insensitive) recurs on a large share of a document's pages are treated as
+boilerplate and removed before chunking. Bare lowercase roman numerals fold to ``#``
+only when they count up with the pages, so words such as "mix" or "di" and headings
+such as "I." are kept.
+"""
+from __future__ import annotations
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+from nexus.config import get_settings
+from nexus.ingest.pdf_extract_pypdf import PageText
+
+_DIGITS = re.compile(r"\d+")
+_ROMAN_NUMERAL = re.compile(r"(?=[ivxlcdm])m{0,3}(cm|cd|d?c{0,3})(xc|xl|l?x{0,3})(ix|iv|v?i{0,3})")
+_ROMAN_VALUES = {"i": 1, "v": 5, "x": 10, "l": 50, "c": 100, "d": 500, "m": 1000}
+# Front-matter page numbers are short ("xviii"); longer numerals are taken for words.
+MAX_ROMAN_CHARS = 5
+_PAGE_MARKERS = re.compile(r"\b(?:page|p\.)\s*#(?:\s*(?:of|/)\s*#)?")
+# Running headers and footers are short; longer lines are always kept.
+MAX_LINE_CHARS = 120
+
+
+@dataclass
+class BoilerplateReport:
+    patterns: list[dict] = field(default_factory=list)
+    lines_removed: int = 0
+    chars_removed: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "patterns": self.patterns,
+            "lines_removed": self.lines_removed,
+            "chars_removed": self.chars_removed,
+        }
+
+
+def line_signature(line: str) -> str:
+    """Fold the parts of a line that vary between pages (page numbers) to ``#``."""
+    signature = _DIGITS.sub("#", line.strip().lower())
+    return _PAGE_MARKERS.sub("page #", signature)
+
+
+def roman_page_number(line: str) -> int | None:
+    """Value of a line that is a bare lowercase roman numeral ("xii", "- iv -")."""
+    token = line.strip(" -.|\t")
+    if len(token) > MAX_ROMAN_CHARS or not _ROMAN_NUMERAL.fullmatch(token):
+        return None
+    values = [_ROMAN_VALUES[c] for c in token]
+    return sum(-v if v < after else v for v, after in zip(values, values[1:] + [0], strict=True))
+
+
+def _edge_indexes(lines: list[str], edge: int) -> list[int]:
+    """Indexes of the first and last ``edge`` non-empty lines of a page."""
+    filled = [i for i, line in enumerate(lines) if line.strip() and len(line) <= MAX_LINE_CHARS]
+    return sorted(set(filled[:edge] + filled[-edge:])) if edge else []
+
+
+def _signatures(split: list[list[str]], edges: list[list[int]]) -> list[dict[int, str]]:
+    """Signature of each edge line, per page.
+
+    A roman numeral is a page number (``#``) only if another page's numeral has the
+    same offset from its page position, i.e. they count up with the pages.
+    """
+    signatures = [
+        {i: line_signature(lines[i]) for i in indexes}
+        for lines, indexes in zip(split, edges, strict=True)
+    ]
+    numerals: list[dict[int, int]] = []
+    offsets: Counter[int] = Counter()
+    for position, (lines, indexes) in enumerate(zip(split, edges, strict=True)):
+        found = {}
+        for i in indexes:
+            value = roman_page_number(lines[i])
+            if value is not None:
+                found[i] = value - position
+        numerals.append(found)
+        offsets.update(set(found.values()))
+    for found, page_signatures in zip(numerals, signatures, strict=True):
+        for i, offset in found.items():
+            if offsets[offset] >= 2:
+                page_signatures[i] = "#"
+    return signatures
+
+
+def strip_repeated_lines(pages: list[PageText]) -> tuple[list[PageText], BoilerplateReport]:
+    settings = get_settings()
+    report = BoilerplateReport()
+    if len(pages) < settings.boilerplate_min_pages:
+        return pages, report
+
+    split = [page.text.split("\n") for page in pages]
+    edges = [_edge_indexes(lines, settings.boilerplate_edge_lines) for lines in split]
+    signatures = _signatures(split, edges)
+    counts: Counter[str] = Counter()
+    for page_signatures in signatures:
+        counts.update(set(page_signatures.values()))
+    threshold = max(2, settings.boilerplate_min_ratio * len(pages))
+    repeated = {sig for sig, n in counts.items() if sig and n >= threshold}
+    if not repeated:
+        return pages, report
+
+    removed: Counter[str] = Counter()
+    result: list[PageText] = []
+    for page, lines, page_signatures in zip(pages, split, signatures, strict=True):
+        drop = {i for i, sig in page_signatures.items() if sig in repeated}
+        for i in drop:
+            removed[page_signatures[i]] += 1
+            report.chars_removed += len(lines[i])
+        report.lines_removed += len(drop)
+        kept = [line for i, line in enumerate(lines) if i not in drop]
+        result.append(PageText(page=page.page, text="\n".join(kept).strip()))
+    report.patterns = [{"pattern": sig, "pages": n} for sig, n in removed.most_common()]
+    return result, report
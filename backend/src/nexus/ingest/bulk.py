@@ -0,0 +1,122 @@
+"""Bulk-load mode: defer HNSW maintenance while loading many chunks.
+
+Inserting into ``chunks`` with ``idx_chunks_embedding`` in place pays an HNSW graph
+insertion per row. For initial loads and full rebuilds the index is dropped, chunks
+are written with COPY, and the index is rebuilt once at the end with
+``CREATE INDEX CONCURRENTLY`` using parallel maintenance workers. The rebuild logs
+``pg_stat_progress_create_index`` while it runs.
+
+The index is shared by all collections, so vector search over every collection falls
+back to sequential scans until the rebuild finishes.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import psycopg
+from psycopg import rows, sql
+
+from nexus import metrics
+from nexus.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "idx_chunks_embedding"
+INDEX_DDL = (
+    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} "
+    "ON chunks USING hnsw (embedding vector_cosine_ops)"
+)
+
+
+def vector_literal(embedding: list[float]) -> str:
+    """Text form of a pgvector value, as accepted by COPY."""
+    return "[" + ",".join(repr(float(x)) for x in embedding) + "]"
+
+
+async def _connect() -> psycopg.AsyncConnection:
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block.
+    return await psycopg.AsyncConnection.connect(
+        get_settings().database_url, autocommit=True, row_factory=rows.dict_row
+    )
+
+
+async def drop_vector_index() -> None:
+    conn = await _connect()
+    try:
+        logger.info("Bulk load: dropping %s", INDEX_NAME)
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+    finally:
+        await conn.close()
+
+
+async def _index_state(conn: psycopg.AsyncConnection) -> bool | None:
+    """``True`` if the index is valid, ``False`` if a failed build left it invalid."""
+    cur = await conn.execute(
+        """
+        SELECT i.indisvalid FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = %s
+        """,
+        (INDEX_NAME,),
+    )
+    row = await cur.fetchone()
+    return None if row is None else row["indisvalid"]
+
+
+async def _report_progress(interval: float) -> None:
+    conn = await _connect()
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            cur = await conn.execute(
+                """
+                SELECT phase, blocks_done, blocks_total, tuples_done, tuples_total
+                FROM pg_stat_progress_create_index
+                WHERE relid = 'chunks'::regclass
+                """
+            )
+            row = await cur.fetchone()
+            if row is None:
+                continue
+            done, total = row["tuples_done"], row["tuples_total"]
+            if not total:
+                done, total = row["blocks_done"], row["blocks_total"]
+            fraction = done / total if total else 0.0
+            metrics.set_gauge("nexus_index_build_progress", fraction)
+            logger.info("Index build: %s (%.1f%%)", row["phase"], fraction * 100)
+    finally:
+        await conn.close()
+
+
+async def rebuild_vector_index() -> None:
+    """Build ``idx_chunks_embedding`` concurrently with raised memory and parallel workers."""
+    settings = get_settings()
+    conn = await _connect()
+    reporter = asyncio.create_task(_report_progress(settings.bulk_progress_seconds))
+    try:
+        if await _index_state(conn) is False:
+            await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+        await conn.execute(
+            sql.SQL("SET maintenance_work_mem = {}").format(
+                sql.Literal(settings.bulk_maintenance_work_mem)
+            )
+        )
+        await conn.execute(
+            sql.SQL("SET max_parallel_maintenance_workers = {}").format(
+                sql.Literal(settings.bulk_index_workers)
+            )
+        )
+        logger.info(
+            "Bulk load: building %s (maintenance_work_mem=%s, workers=%d)",
+            INDEX_NAME,
+            settings.bulk_maintenance_work_mem,
+            settings.bulk_index_workers,
+        )
+        await conn.execute(INDEX_DDL)
+        metrics.set_gauge("nexus_index_build_progress", 1.0)
+        logger.info("Bulk load: %s rebuilt", INDEX_NAME)
+    finally:
+        reporter.cancel()
+        await conn.close()
+
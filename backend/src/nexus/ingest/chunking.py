@@ -6,22 +6,25 @@ from typing import Iterable, List
 from nexus.config import get_settings
 
 
-def chunk_text(text: str, page: int) -> list[tuple[int, str, str]]:
-    """Return list of (chunk_index, content, content_hash)."""
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def chunk_spans(
+    text: str, chunk_size: int | None = None, overlap: int | None = None
+) -> list[tuple[int, int, int]]:
+    """Return list of (chunk_index, start, end) character offsets into ``text``."""
     settings = get_settings()
-    chunk_size = settings.chunk_size
-    overlap = settings.chunk_overlap
+    chunk_size = chunk_size if chunk_size is not None else settings.chunk_size
+    overlap = overlap if overlap is not None else settings.chunk_overlap
     if len(text) <= chunk_size:
-        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
-        return [(0, text, content_hash)]
-    chunks: list[tuple[int, str, str]] = []
+        return [(0, 0, len(text))]
+    spans: list[tuple[int, int, int]] = []
     start = 0
     idx = 0
     while start < len(text):
         end = min(len(text), start + chunk_size)
-        chunk = text[start:end]
-        content_hash = hashlib.sha256(chunk.encode("utf-8")).hexdigest()
-        chunks.append((idx, chunk, content_hash))
+        spans.append((idx, start, end))
         idx += 1
         # If we've reached the end of text, we're done
         if end >= len(text):
@@ -32,4 +35,19 @@ def chunk_text(text: str, page: int) -> list[tuple[int, str, str]]:
         if start <= prev_start:
             # If overlap >= chunk, we'd get stuck - ensure forward progress
             start = prev_start + 1
+    return spans
+
+
+def chunk_text(
+    text: str, page: int, chunk_size: int | None = None, overlap: int | None = None
+) -> list[tuple[int, str, str]]:
+    """Return list of (chunk_index, content, content_hash).
+
+    ``chunk_size`` and ``overlap`` default to the configured settings; collection
+    versions built with different parameters pass their own.
+    """
+    chunks: list[tuple[int, str, str]] = []
+    for idx, start, end in chunk_spans(text, chunk_size, overlap):
+        chunk = text[start:end]
+        chunks.append((idx, chunk, content_hash(chunk)))
     return chunks
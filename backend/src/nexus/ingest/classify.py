@@ -0,0 +1,151 @@
+"""Cheap structural PDF classification used to route documents to OCR.
+
+Looks at fonts, text-showing operators and image XObject coverage of a sample of
+pages, without extracting any text, and decides whether a document is
+text-based, image-only (scanned) or mixed.
+"""
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass, field
+
+from pypdf import PdfReader
+from pypdf.generic import ContentStream
+
+from nexus.config import get_settings
+from nexus.ingest.pdf_extract_pypdf import open_reader
+
+logger = logging.getLogger(__name__)
+
+# Text-showing operators: Tj, TJ, ' (next line, show) and " (spacing, next line, show).
+TEXT_OPERATORS = re.compile(rb"(?:^|[\s\]\)>])(?:T[jJ]|['\"])(?:\s|$)")
+IMAGE_COVERAGE = 0.5
+
+
+@dataclass
+class PageProfile:
+    page: int
+    has_text: bool
+    image_coverage: float
+
+    @property
+    def image_only(self) -> bool:
+        return not self.has_text and self.image_coverage >= IMAGE_COVERAGE
+
+    @property
+    def empty(self) -> bool:
+        return not self.has_text and self.image_coverage == 0
+
+
+@dataclass
+class PdfClassification:
+    kind: str  # "text", "image", "mixed" or "unknown"
+    page_count: int
+    sampled: list[PageProfile] = field(default_factory=list)
+    # Pages (1-based) that need OCR; only filled in for mixed documents.
+    image_pages: list[int] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "sampled_pages": [p.page for p in self.sampled],
+            "image_pages": self.image_pages,
+        }
+
+
+def _image_names(page) -> set[str]:
+    resources = page.get("/Resources") or {}
+    xobjects = resources.get("/XObject") or {}
+    names = set()
+    for name, ref in xobjects.items():
+        obj = ref.get_object()
+        if obj.get("/Subtype") == "/Image":
+            names.add(name)
+    return names
+
+
+def _has_fonts(page) -> bool:
+    resources = page.get("/Resources") or {}
+    return bool(resources.get("/Font"))
+
+
+def _image_coverage(page, reader: PdfReader, image_names: set[str]) -> float:
+    """Fraction of the page area covered by painted image XObjects (capped at 1)."""
+    box = page.mediabox
+    page_area = abs(float(box.width) * float(box.height)) or 1.0
+    ctm = [1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
+    stack: list[list[float]] = []
+    covered = 0.0
+    for operands, operator in ContentStream(page.get_contents(), reader).operations:
+        if operator == b"q":
+            stack.append(list(ctm))
+        elif operator == b"Q" and stack:
+            ctm = stack.pop()
+        elif operator == b"cm" and len(operands) == 6:
+            a, b, c, d, e, f = (float(x) for x in operands)
+            ctm = [
+                a * ctm[0] + b * ctm[2],
+                a * ctm[1] + b * ctm[3],
+                c * ctm[0] + d * ctm[2],
+                c * ctm[1] + d * ctm[3],
+                e * ctm[0] + f * ctm[2] + ctm[4],
+                e * ctm[1] + f * ctm[3] + ctm[5],
+            ]
+        elif operator == b"Do" and operands and operands[0] in image_names:
+            # Images are painted into the unit square mapped through the CTM.
+            covered += abs(ctm[0] * ctm[3] - ctm[1] * ctm[2])
+    return min(1.0, covered / page_area)
+
+
+def profile_page(reader: PdfReader, index: int, measure_coverage: bool = True) -> PageProfile:
+    page = reader.pages[index]
+    contents = page.get_contents()
+    data = contents.get_data() if contents is not None else b""
+    has_text = _has_fonts(page) and bool(TEXT_OPERATORS.search(data))
+    images = _image_names(page)
+    coverage = 0.0
+    if images and not has_text:
+        coverage = _image_coverage(page, reader, images) if measure_coverage else 1.0
+    return PageProfile(page=index + 1, has_text=has_text, image_coverage=coverage)
+
+
+def _sample(page_count: int, size: int) -> list[int]:
+    if page_count <= size:
+        return list(range(page_count))
+    step = page_count / size
+    return sorted({int(i * step) for i in range(size)})
+
+
+def classify_pdf(path: str) -> PdfClassification:
+    """Classify ``path``; ``"unknown"`` when pypdf cannot analyse its page structure.
+
+    Unknown documents are extracted and sent to OCR based on the extracted text, as
+    before classification existed.
+    """
+    with open_reader(path) as reader:
+        page_count = len(reader.pages)
+        try:
+            return _classify(reader)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not classify %s, checking extracted text instead: %s", path, exc)
+            return PdfClassification("unknown", page_count)
+
+
+def _classify(reader: PdfReader) -> PdfClassification:
+    count = len(reader.pages)
+    sample = _sample(count, get_settings().classify_sample_pages)
+    sampled = [profile_page(reader, i) for i in sample]
+    relevant = [p for p in sampled if not p.empty]
+    image = [p for p in relevant if p.image_only]
+    if not relevant or not image:
+        return PdfClassification("text", count, sampled)
+    if len(image) == len(relevant):
+        return PdfClassification("image", count, sampled)
+    # Mixed: find the image-only pages across the whole document with the cheap checks.
+    image_pages = [
+        p.page
+        for p in (profile_page(reader, i, measure_coverage=False) for i in range(count))
+        if p.image_only
+    ]
+    return PdfClassification("mixed", count, sampled, image_pages)
@@ -0,0 +1,155 @@
+"""Group commit of document writes across files.
+
+Ingest runs submit each document's writes as a callable; the committer collects
+them until ``group_commit_max_documents`` documents or ``group_commit_max_rows``
+rows are pending, ``group_commit_max_latency_seconds`` passed since the first
+one, or every document in flight (see ``document``) is waiting for it, and runs
+the batch in a single transaction on one connection in psycopg pipeline mode.
+Each document runs in its own savepoint, so a failing document is rolled back and
+reported to its caller without affecting the rest of the batch.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterator
+
+import psycopg
+from psycopg import rows
+
+from nexus import metrics
+from nexus.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+Write = Callable[[psycopg.AsyncCursor], Awaitable[Any]]
+
+
+@dataclass
+class _Pending:
+    write: Write
+    rows: int
+    future: asyncio.Future = field(repr=False)
+
+
+class GroupCommitter:
+    def __init__(
+        self,
+        max_documents: int | None = None,
+        max_rows: int | None = None,
+        max_latency: float | None = None,
+        pipeline: bool = True,
+    ):
+        settings = get_settings()
+        self.max_documents = max_documents or settings.group_commit_max_documents
+        self.max_rows = max_rows or settings.group_commit_max_rows
+        self.max_latency = (
+            max_latency if max_latency is not None else settings.group_commit_max_latency_seconds
+        )
+        # COPY (bulk-load mode) cannot run in pipeline mode.
+        self.pipeline = pipeline
+        self.commits = 0
+        self._pending: list[_Pending] = []
+        self._conn: psycopg.AsyncConnection | None = None
+        self._flush_lock = asyncio.Lock()
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._inflight = 0
+
+    async def __aenter__(self) -> GroupCommitter:
+        self._conn = await psycopg.AsyncConnection.connect(
+            get_settings().database_url, autocommit=True, row_factory=rows.dict_row
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        try:
+            await self.flush()
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            await self._conn.close()
+
+    async def submit(self, write: Write, rows: int = 1) -> Any:
+        """Run ``write`` in the next group transaction and return its result."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(_Pending(write, rows, future))
+        if (
+            len(self._pending) >= self.max_documents
+            or sum(p.rows for p in self._pending) >= self.max_rows
+            or self._all_waiting()
+        ):
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_latency, self._schedule_flush
+            )
+        return await future
+
+    @contextlib.contextmanager
+    def document(self) -> Iterator[None]:
+        """Mark one document as in flight while the caller processes it.
+
+        Once every document in flight has submitted its writes, no more can join the
+        batch, so it is committed without waiting for ``max_latency``.
+        """
+        self._inflight += 1
+        try:
+            yield
+        finally:
+            self._inflight -= 1
+            if self._all_waiting():
+                self._schedule_flush()
+
+    def _all_waiting(self) -> bool:
+        return bool(self._inflight and self._pending) and len(self._pending) >= self._inflight
+
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        task = asyncio.create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            batch, self._pending = self._pending, []
+            if batch:
+                await self._commit(batch)
+
+    async def _commit(self, batch: list[_Pending]) -> None:
+        results: dict[int, Any] = {}
+        errors: dict[int, BaseException] = {}
+        pipeline = self._conn.pipeline() if self.pipeline else contextlib.nullcontext()
+        try:
+            async with self._conn.transaction():
+                async with pipeline:
+                    for i, item in enumerate(batch):
+                        try:
+                            async with self._conn.transaction():  # savepoint
+                                async with self._conn.cursor() as cur:
+                                    results[i] = await item.write(cur)
+                        except Exception as exc:  # noqa: BLE001
+                            errors[i] = exc
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Group commit of %d documents failed", len(batch))
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(exc)
+            return
+        self.commits += 1
+        metrics.inc("nexus_ingest_commits_total")
+        metrics.inc("nexus_ingest_committed_documents_total", len(batch) - len(errors))
+        for i, item in enumerate(batch):
+            if item.future.done():
+                continue
+            if i in errors:
+                item.future.set_exception(errors[i])
+            else:
+                item.future.set_result(results.get(i))
@@ -1,21 +1,34 @@
 from __future__ import annotations
 
 import hashlib
+import logging
 import os
 import pathlib
-from dataclasses import dataclass
+import tarfile
+import zipfile
+from dataclasses import dataclass, field
 from typing import Iterable, List
 
 import yaml
 from pydantic import BaseModel
 
 from nexus.config import CollectionConfig, get_settings
+from nexus.ingest import archives
+from nexus.resources import get_budget
+
+logger = logging.getLogger(__name__)
 
 
 def _max_file_size_bytes() -> int:
     return get_settings().max_file_size_mb * 1024 * 1024
 
 
+def upload_root(collection: str) -> pathlib.Path:
+    """Directory holding the documents uploaded to ``collection`` through the API."""
+    settings = get_settings()
+    return (settings.upload_dir or settings.processed_dir / "uploads") / collection
+
+
 @dataclass
 class DiscoveredFile:
     path: pathlib.Path
@@ -26,7 +39,45 @@ class DiscoveredFile:
     size: int
 
 
-def walk_collection(cfg: CollectionConfig) -> List[DiscoveredFile]:
+@dataclass
+class FileFilter:
+    """Restricts a walk to files modified since a cutoff and/or to explicit paths.
+
+    An entry of ``paths`` selects that file, every file below it when it is a
+    directory, and every member when it is an archive.
+    """
+
+    since: float | None = None  # mtime cutoff, seconds since the epoch
+    paths: list[pathlib.Path] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.paths = [pathlib.Path(os.path.abspath(p)) for p in self.paths]
+
+    def _selects(self, path: pathlib.Path) -> bool:
+        parts = archives.split(path)
+        candidates = [path, parts[0]] if parts else [path]
+        return any(c == p or p in c.parents for c in candidates for p in self.paths)
+
+    def accepts(self, path: pathlib.Path, mtime: float) -> bool:
+        if self.since is not None and mtime < self.since:
+            return False
+        return not self.paths or self._selects(path)
+
+    def opens(self, archive: pathlib.Path) -> bool:
+        """Whether some member of ``archive`` can be selected."""
+        if not self.paths or self._selects(archive):
+            return True
+        return any((archives.split(p) or (None,))[0] == archive for p in self.paths)
+
+
+def walk_collection(
+    cfg: CollectionConfig, select: FileFilter | None = None, hash_files: bool = True
+) -> List[DiscoveredFile]:
+    """PDFs under the roots of ``cfg`` matching its include/exclude patterns.
+
+    ``select`` is applied before anything is hashed. Without ``hash_files`` the walk
+    only stats files (and reads archive indexes) and ``sha256`` is left empty.
+    """
     files: list[DiscoveredFile] = []
     include = set(cfg.include)
     exclude = set(cfg.exclude)
@@ -34,6 +85,13 @@ def walk_collection(cfg: CollectionConfig) -> List[DiscoveredFile]:
         for dirpath, _, filenames in os.walk(root):
             dir_path = pathlib.Path(dirpath)
             for filename in filenames:
+                if archives.is_archive(filename) and get_settings().ingest_archives:
+                    files.extend(
+                        _walk_archive(
+                            dir_path.joinpath(filename), root, include, exclude, select, hash_files
+                        )
+                    )
+                    continue
                 if not filename.lower().endswith(".pdf"):
                     continue
                 abs_path = dir_path.joinpath(filename)
@@ -41,8 +99,10 @@ def walk_collection(cfg: CollectionConfig) -> List[DiscoveredFile]:
                     continue
                 if not _check_file_size(abs_path):
                     continue
-                sha256 = _hash_file(abs_path)
                 stat = abs_path.stat()
+                if select is not None and not select.accepts(abs_path, stat.st_mtime):
+                    continue
+                sha256 = _hash_file(abs_path) if hash_files else ""
                 relative_path = abs_path.relative_to(root)
                 files.append(
                     DiscoveredFile(
@@ -57,6 +117,44 @@ def walk_collection(cfg: CollectionConfig) -> List[DiscoveredFile]:
     return files
 
 
+def _walk_archive(
+    archive: pathlib.Path,
+    root: pathlib.Path,
+    include: set[str],
+    exclude: set[str],
+    select: FileFilter | None = None,
+    hash_files: bool = True,
+) -> list[DiscoveredFile]:
+    """PDF members of ``archive`` as files at ``archive!/member``."""
+    if _skip(archive, set(), exclude):
+        return []
+    if select is not None and not select.opens(archive):
+        return []
+    files: list[DiscoveredFile] = []
+    try:
+        for member in archives.iter_members(
+            archive, _max_file_size_bytes(), get_budget().io_buffer_bytes, hash_files
+        ):
+            path = pathlib.Path(member.path)
+            if _skip(path, include, exclude):
+                continue
+            if select is not None and not select.accepts(path, member.mtime):
+                continue
+            files.append(
+                DiscoveredFile(
+                    path=path,
+                    root=root,
+                    relative_path=path.relative_to(root),
+                    sha256=member.sha256,
+                    mtime=member.mtime,
+                    size=member.size,
+                )
+            )
+    except (OSError, tarfile.TarError, zipfile.BadZipFile) as exc:
+        logger.warning("Skipping unreadable archive %s: %s", archive, exc)
+    return files
+
+
 def _check_file_size(path: pathlib.Path) -> bool:
     try:
         stat = path.stat()
@@ -79,7 +177,8 @@ def _skip(path: pathlib.Path, include: set[str], exclude: set[str]) -> bool:
 
 def _hash_file(path: pathlib.Path) -> str:
     h = hashlib.sha256()
+    buffer_size = get_budget().io_buffer_bytes
     with path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(8192), b""):
+        for chunk in iter(lambda: handle.read(buffer_size), b""):
             h.update(chunk)
     return h.hexdigest()
@@ -0,0 +1,58 @@
+"""Cheap scoring of chunks that carry too little information to be worth embedding.
+
+Tables of contents, dot leaders, page-number columns and OCR garbage produce chunks
+that are mostly punctuation, digits or stray glyphs. They are scored on three
+signals and kept out of embedding and indexing when any falls below the
+collection's thresholds (``CollectionConfig.junk``):
+
+* alphabetic ratio: letters among non-space characters,
+* character entropy in bits: near zero for runs of dots or dashes,
+* word ratio: tokens that look like words (letters only, with a vowel when ASCII).
+"""
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from nexus.config import JunkThresholds
+
+_TOKEN_EDGES = "\"'()[]{}<>.,;:!?*"
+_WORD = re.compile(r"[^\W\d_]{2,}")
+_VOWELS = set("aeiouyAEIOUY")
+
+
+@dataclass
+class ChunkScore:
+    alpha_ratio: float
+    entropy: float
+    word_ratio: float
+
+
+def _word_like(token: str) -> bool:
+    token = token.strip(_TOKEN_EDGES)
+    if not _WORD.fullmatch(token):
+        return False
+    # ASCII words without vowels are usually OCR garbage ("xkcdq", "lllll").
+    return not token.isascii() or any(ch in _VOWELS for ch in token)
+
+
+def score_chunk(text: str) -> ChunkScore:
+    chars = [ch for ch in text if not ch.isspace()]
+    if not chars:
+        return ChunkScore(alpha_ratio=0.0, entropy=0.0, word_ratio=0.0)
+    alpha = sum(ch.isalpha() for ch in chars) / len(chars)
+    counts = Counter(chars)
+    entropy = -sum(n / len(chars) * math.log2(n / len(chars)) for n in counts.values())
+    tokens = text.split()
+    words = sum(_word_like(token) for token in tokens) / len(tokens)
+    return ChunkScore(alpha_ratio=alpha, entropy=entropy, word_ratio=words)
+
+
+def is_junk(score: ChunkScore, thresholds: JunkThresholds) -> bool:
+    return (
+        score.alpha_ratio < thresholds.min_alpha_ratio
+        or score.entropy < thresholds.min_entropy
+        or score.word_ratio < thresholds.min_word_ratio
+    )
@@ -0,0 +1,64 @@
+"""Postgres advisory locks that keep concurrent ingests from doing the same work.
+
+Locks are session-level and held on one dedicated autocommit connection per
+ingest run, so they are released when the run finishes or its process dies.
+Keys are hashed with ``hashtextextended`` (64 bit) so unrelated documents do not
+collide.
+"""
+from __future__ import annotations
+
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import psycopg
+
+from nexus.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def collection_key(name: str, collection_id: int) -> str:
+    return f"ingest:{name}:{collection_id}"
+
+
+def document_key(collection_id: int, path: str) -> str:
+    return f"document:{collection_id}:{path}"
+
+
+class AdvisoryLocks:
+    """Non-blocking session advisory locks on one connection."""
+
+    def __init__(self, conn: psycopg.AsyncConnection):
+        self.conn = conn
+
+    async def try_acquire(self, key: str) -> bool:
+        cur = await self.conn.execute(
+            "SELECT pg_try_advisory_lock(hashtextextended(%s, 0))", (key,)
+        )
+        row = await cur.fetchone()
+        return bool(row[0])
+
+    async def release(self, key: str) -> None:
+        await self.conn.execute("SELECT pg_advisory_unlock(hashtextextended(%s, 0))", (key,))
+
+    @asynccontextmanager
+    async def hold(self, key: str) -> AsyncIterator[bool]:
+        """Try to take ``key`` for the duration of the block; yields whether it was taken."""
+        acquired = await self.try_acquire(key)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await self.release(key)
+
+
+@asynccontextmanager
+async def lock_session() -> AsyncIterator[AdvisoryLocks]:
+    settings = get_settings()
+    conn = await psycopg.AsyncConnection.connect(settings.database_url, autocommit=True)
+    try:
+        yield AdvisoryLocks(conn)
+    finally:
+        # Closing the session releases any lock still held.
+        await conn.close()
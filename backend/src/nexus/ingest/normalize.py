@@ -0,0 +1,80 @@
+"""Text normalization between extraction and chunking.
+
+pypdf output carries hyphenated line breaks, ligature codepoints, invisible and
+control characters and runs of whitespace. They inflate chunk counts and embed
+characters that carry no meaning. The whole document is normalized in one pass:
+pages are joined with a sentinel, a single ``str.translate`` table and a handful of
+compiled regular expressions run over the joined text, and the result is split
+back into pages. Line breaks are kept; later stages work on lines.
+"""
+from __future__ import annotations
+
+import re
+
+from nexus.ingest.pdf_extract_pypdf import PageText
+
+# Private-use codepoint separating pages while a document is processed as one string.
+PAGE_SENTINEL = "\ue000"
+
+_LIGATURES = {
+    "\ufb00": "ff",
+    "\ufb01": "fi",
+    "\ufb02": "fl",
+    "\ufb03": "ffi",
+    "\ufb04": "ffl",
+    "\ufb05": "st",
+    "\ufb06": "st",
+    "\u0132": "IJ",
+    "\u0133": "ij",
+}
+# No-break, thin, en/em and ideographic spaces.
+_SPACES = "\xa0\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u202f\u205f\u3000"
+# Soft hyphen, zero-width characters and BOM.
+_INVISIBLE = "\xad\u200b\u200c\u200d\u2060\ufeff"
+_CONTROL = "".join(chr(c) for c in [*range(0x00, 0x09), *range(0x0E, 0x20), *range(0x7F, 0xA0)])
+
+TRANSLATION = str.maketrans(
+    {
+        **_LIGATURES,
+        **{ch: " " for ch in _SPACES},
+        **{ch: None for ch in _INVISIBLE + _CONTROL + PAGE_SENTINEL},
+        "\u2010": "-",
+        "\u2011": "-",
+        "\t": " ",
+        "\x0b": "\n",
+        "\x0c": "\n",
+    }
+)
+
+_CARRIAGE_RETURNS = re.compile(r"\r\n?")
+# "exam-\nple" -> "example"; only when a lowercase letter continues the word.
+_HYPHENATED_BREAK = re.compile(r"(\w)-\n *(?=[a-z])")
+_SPACE_RUNS = re.compile(r" {2,}")
+_SPACE_AROUND_NEWLINE = re.compile(r" ?\n ?")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def _normalize(text: str) -> str:
+    text = _HYPHENATED_BREAK.sub(r"\1", text)
+    text = _SPACE_RUNS.sub(" ", text)
+    text = _SPACE_AROUND_NEWLINE.sub("\n", text)
+    return _BLANK_LINES.sub("\n\n", text)
+
+
+def normalize_text(text: str) -> str:
+    return _normalize(_CARRIAGE_RETURNS.sub("\n", text).translate(TRANSLATION)).strip()
+
+
+def normalize_pages(pages: list[PageText]) -> list[PageText]:
+    """Normalize every page of a document in a single pass over the joined text."""
+    if not pages:
+        return []
+    # The translation table strips any sentinel already present in page text.
+    joined = PAGE_SENTINEL.join(
+        _CARRIAGE_RETURNS.sub("\n", page.text).translate(TRANSLATION) for page in pages
+    )
+    texts = _normalize(joined).split(PAGE_SENTINEL)
+    return [
+        PageText(page=page.page, text=text.strip())
+        for page, text in zip(pages, texts, strict=True)
+    ]
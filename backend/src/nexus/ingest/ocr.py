@@ -6,42 +6,89 @@ from typing import Optional
 
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
-from nexus.config import get_settings
+from nexus.config import OcrProfile, get_settings
+from nexus.ingest import archives
+from nexus.resources import get_budget
 
 
 class OCRError(Exception):
     pass
 
 
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=2, max=60),
-    retry=retry_if_exception_type(subprocess.CalledProcessError),
-    reraise=True,
-)
-def run_ocr(
+def get_profile(name: Optional[str] = None) -> OcrProfile:
+    settings = get_settings()
+    name = name or settings.ocr_profile
+    if name not in settings.ocr_profiles:
+        raise OCRError(f"Unknown OCR profile {name}")
+    return settings.ocr_profiles[name]
+
+
+def ocr_command(
+    source: pathlib.Path,
+    dest: pathlib.Path,
+    profile: OcrProfile,
+    pages: Optional[list[int]] = None,
+    force: bool = False,
+) -> list[str]:
+    # --force-ocr rasterizes pages that already have text too (benchmarks only).
+    cmd = ["ocrmypdf", "--force-ocr" if force else "--skip-text"]
+    if pages:
+        cmd.extend(["--pages", ",".join(str(p) for p in pages)])
+    if profile.rotate_pages:
+        cmd.append("--rotate-pages")
+    if profile.deskew:
+        cmd.append("--deskew")
+    cmd.extend(["--optimize", str(profile.optimize)])
+    if profile.downsample_above:
+        cmd.extend(
+            [
+                "--tesseract-downsample-large-images",
+                "--tesseract-downsample-above",
+                str(profile.downsample_above),
+            ]
+        )
+    if profile.output_type:
+        cmd.extend(["--output-type", profile.output_type])
+    cmd.extend(["-j", str(get_budget().ocr_jobs), str(source), str(dest)])
+    return cmd
+
+
+def processed_path_for(
     source: pathlib.Path, collection: str, relative_root: Optional[pathlib.Path] = None
 ) -> pathlib.Path:
+    """Location of the OCR output for ``source`` under the processed directory."""
     settings = get_settings()
     processed_root = settings.processed_dir / collection
-    processed_root.mkdir(parents=True, exist_ok=True)
     rel_path: pathlib.Path
     if relative_root and source.is_absolute() and source.is_relative_to(relative_root):
         rel_path = source.relative_to(relative_root)
     else:
         rel_path = pathlib.Path(source.name)
-    dest = processed_root / rel_path
+    # Archive members ("drop.zip!/a.pdf") land in a directory named after the archive.
+    dest = processed_root / str(rel_path).replace(archives.SEPARATOR, "/")
+    if not dest.resolve().is_relative_to(processed_root.resolve()):
+        raise OCRError(f"OCR output for {source} would be written outside {processed_root}")
+    return dest
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=2, max=60),
+    retry=retry_if_exception_type(subprocess.CalledProcessError),
+    reraise=True,
+)
+def run_ocr(
+    source: pathlib.Path,
+    collection: str,
+    relative_root: Optional[pathlib.Path] = None,
+    dest: Optional[pathlib.Path] = None,
+    profile: Optional[str] = None,
+    pages: Optional[list[int]] = None,
+    force: bool = False,
+) -> pathlib.Path:
+    dest = dest or processed_path_for(source, collection, relative_root)
     dest.parent.mkdir(parents=True, exist_ok=True)
-    cmd = [
-        "ocrmypdf",
-        "--skip-text",
-        "--rotate-pages",
-        "--deskew",
-        "-j",
-        "4",
-        str(source),
-        str(dest),
-    ]
+    cmd = ocr_command(source, dest, get_profile(profile), pages, force)
     try:
         subprocess.run(cmd, check=True, capture_output=True, timeout=300)
     except subprocess.TimeoutExpired:
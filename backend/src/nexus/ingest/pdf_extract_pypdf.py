@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import pathlib
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import List
+from typing import Iterator, List
 
-from pypdf import PdfReader
+from pypdf import PdfReader, PdfWriter
+
+from nexus.ingest import archives
 
 
 @dataclass
@@ -12,10 +16,58 @@ class PageText:
     text: str
 
 
-def extract_text(path: str) -> List[PageText]:
-    reader = PdfReader(path)
-    pages: list[PageText] = []
-    for idx, page in enumerate(reader.pages):
-        text = page.extract_text() or ""
-        pages.append(PageText(page=idx + 1, text=text))
+@contextmanager
+def open_reader(path: str) -> Iterator[PdfReader]:
+    """PdfReader for a file or an archive member (``archive.zip!/member.pdf``)."""
+    with archives.open_source(path) as source:
+        yield PdfReader(source)
+
+
+def page_count(path: str) -> int:
+    with open_reader(path) as reader:
+        return len(reader.pages)
+
+
+def extract_text(path: str, first_page: int = 1, last_page: int | None = None) -> List[PageText]:
+    """Extract pages ``first_page``..``last_page`` (1-based, inclusive) of ``path``.
+
+    Page numbers stay absolute so page ranges extracted by
+    separate workers can be concatenated.
+    """
+    with open_reader(path) as reader:
+        last = len(reader.pages) if last_page is None else min(last_page, len(reader.pages))
+        pages: list[PageText] = []
+        for idx in range(first_page - 1, last):
+            text = reader.pages[idx].extract_text() or ""
+            pages.append(PageText(page=idx + 1, text=text))
     return pages
+
+
+def extract_pages(path: str, numbers: list[int]) -> List[PageText]:
+    """Extract the given 1-based pages of ``path``."""
+    with open_reader(path) as reader:
+        return [
+            PageText(page=number, text=reader.pages[number - 1].extract_text() or "")
+            for number in numbers
+            if 0 < number <= len(reader.pages)
+        ]
+
+
+def write_page_range(source: str, first_page: int, last_page: int, dest: pathlib.Path) -> None:
+    """Write pages ``first_page``..``last_page`` of ``source`` to a new PDF at ``dest``."""
+    with open_reader(source) as reader:
+        writer = PdfWriter()
+        for idx in range(first_page - 1, min(last_page, len(reader.pages))):
+            writer.add_page(reader.pages[idx])
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        with dest.open("wb") as handle:
+            writer.write(handle)
+
+
+def merge_pdfs(parts: list[pathlib.Path], dest: pathlib.Path) -> None:
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(str(part))
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    with dest.open("wb") as handle:
+        writer.write(handle)
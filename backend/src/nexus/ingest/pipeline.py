@@ -1,24 +1,55 @@
 from __future__ import annotations
 
+import argparse
 import asyncio
-import dataclasses
+import contextlib
 import json
 import logging
+import os
 import pathlib
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
 from typing import List
 
 import psycopg
 from psycopg import rows
 
-from nexus.config import get_settings
+from nexus import metrics
+from nexus.config import CollectionConfig, JunkThresholds, get_settings
 from nexus.db import db_connection
-from nexus.embed.ollama_embed import OllamaEmbedder
-from nexus.ingest import chunking, discover, ocr, pdf_extract_pypdf, quality
-from nexus.ingest.mounts import MountValidator, MountValidationError
+from nexus.domain import models
+from nexus.embed.adaptive import AdaptiveEmbedder
+from nexus.ingest import (
+    archives,
+    boilerplate,
+    bulk,
+    chunking,
+    classify,
+    discover,
+    junk,
+    locks,
+    normalize,
+    ocr,
+    pdf_extract_pypdf,
+    profiling,
+    quality,
+)
+from nexus.ingest.committer import GroupCommitter, Write
+from nexus.ingest.mounts import MountValidationError, MountValidator
+from nexus.resources import get_budget
 
 logger = logging.getLogger(__name__)
 
+# Version of the text preparation between extraction and chunking (_prepare_pages).
+# Documents ingested with another version are reprocessed on the next ingest.
+TEXT_VERSION = 3
+
 
 @dataclass
 class IngestSummary:
@@ -27,31 +58,83 @@ class IngestSummary:
     skipped: int
     failed: int
     duplicates: int = 0
+    # Files skipped because another run was ingesting them at the same time.
+    in_progress: int = 0
+    # Memory profile summary when the run was profiled.
+    profile: dict | None = None
 
 
-async def ensure_collection(cur: psycopg.AsyncCursor, name: str):
-    settings = get_settings()
+@dataclass
+class ChunkRecord:
+    page: int
+    chunk_index: int
+    content: str
+    content_hash: str
+    embedding: list[float]
+    char_start: int
+    char_end: int
+
+
+async def _active_collection(cur: psycopg.AsyncCursor, name: str):
     await cur.execute(
         """
-        INSERT INTO collections(name, version, embed_model, embed_dim, chunk_size, overlap, active)
-        VALUES (%s, 1, %s, %s, %s, %s, TRUE)
-        ON CONFLICT (name, version) DO UPDATE SET embed_model = EXCLUDED.embed_model
-        RETURNING id, embed_dim;
+        SELECT id, embed_dim FROM collections
+        WHERE name = %s AND active = TRUE
+        ORDER BY version DESC
+        LIMIT 1;
         """,
-        (
-            name,
-            settings.embed_model,
-            settings.embed_dim,
-            settings.chunk_size,
-            settings.chunk_overlap,
-        ),
+        (name,),
     )
-    row = await cur.fetchone()
+    return await cur.fetchone()
+
+
+async def ensure_collection(cur: psycopg.AsyncCursor, name: str):
+    """Return the id of the active version of ``name``, creating version 1 if needed."""
+    settings = get_settings()
+    row = await _active_collection(cur, name)
+    if row is None:
+        await cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"collection:{name}",))
+        # A concurrent first ingest may have created the version while we waited.
+        row = await _active_collection(cur, name)
+    if row is None:
+        await cur.execute(
+            """
+            INSERT INTO collections(
+                name, version, embed_model, embed_dim, chunk_size, overlap, active
+            )
+            SELECT %s, COALESCE(MAX(version), 0) + 1, %s, %s, %s, %s, TRUE
+            FROM collections WHERE name = %s
+            RETURNING id, embed_dim;
+            """,
+            (
+                name,
+                settings.embed_model,
+                settings.embed_dim,
+                settings.chunk_size,
+                settings.chunk_overlap,
+                name,
+            ),
+        )
+        row = await cur.fetchone()
     if row["embed_dim"] != settings.embed_dim:
         raise ValueError("Embedding dimension mismatch for collection contract")
     return row["id"]
 
 
+async def load_collection(cur: psycopg.AsyncCursor, collection_id: int) -> models.Collection:
+    await cur.execute(
+        """
+        SELECT id, name, version, embed_model, embed_dim, chunk_size, overlap, active, created_at
+        FROM collections WHERE id = %s
+        """,
+        (collection_id,),
+    )
+    row = await cur.fetchone()
+    if row is None:
+        raise ValueError(f"Unknown collection id {collection_id}")
+    return models.Collection(**row)
+
+
 async def _doc_exists(
     cur: psycopg.AsyncCursor, collection_id: int, path: str, sha: str, mtime: int
 ):
@@ -59,23 +142,41 @@ async def _doc_exists(
         """
         SELECT id FROM documents
         WHERE collection_id = %s AND path = %s AND source_sha256 = %s AND mtime = %s
+          AND text_version = %s AND deleted_at IS NULL
         """,
-        (collection_id, path, sha, mtime),
+        (collection_id, path, sha, mtime, TEXT_VERSION),
     )
     row = await cur.fetchone()
     return row["id"] if row else None
 
 
+async def _load_known(cur: psycopg.AsyncCursor, collection_id: int) -> set[tuple[str, str, int]]:
+    """(path, sha256, mtime) of every document that ``_doc_exists`` would report unchanged."""
+    await cur.execute(
+        """
+        SELECT path, source_sha256, mtime FROM documents
+        WHERE collection_id = %s AND text_version = %s AND deleted_at IS NULL
+        """,
+        (collection_id, TEXT_VERSION),
+    )
+    return {(row["path"], row["source_sha256"], row["mtime"]) for row in await cur.fetchall()}
+
+
 async def _has_duplicate(cur: psycopg.AsyncCursor, collection_id: int, sha: str, path: str) -> bool:
     await cur.execute(
         """
-        SELECT path FROM documents WHERE collection_id = %s AND source_sha256 = %s AND path <> %s
+        SELECT path FROM documents
+        WHERE collection_id = %s AND source_sha256 = %s AND path <> %s AND deleted_at IS NULL
         """,
         (collection_id, sha, path),
     )
     return bool(await cur.fetchone())
 
 
+# documents.status of a document whose chunks were written (duplicates have none).
+STATUS_INGESTED = "ingested"
+
+
 async def _upsert_document(
     cur: psycopg.AsyncCursor,
     collection_id: int,
@@ -87,12 +188,15 @@ async def _upsert_document(
     ocr_applied: bool,
     processed_path: str | None,
     quality_report: quality.QualityReport,
-    status: str = "ingested",
+    status: str = STATUS_INGESTED,
 ):
     await cur.execute(
         """
-        INSERT INTO documents(collection_id, path, source_sha256, mtime, size, tags, status, ocr_applied, processed_path, extracted_chars, empty_page_ratio, quality, updated_at)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+        INSERT INTO documents(
+            collection_id, path, source_sha256, mtime, size, tags, status, ocr_applied,
+            processed_path, extracted_chars, empty_page_ratio, quality, text_version, updated_at
+        )
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
         ON CONFLICT (collection_id, path) DO UPDATE
         SET source_sha256 = EXCLUDED.source_sha256,
             mtime = EXCLUDED.mtime,
@@ -104,6 +208,8 @@ async def _upsert_document(
             extracted_chars = EXCLUDED.extracted_chars,
             empty_page_ratio = EXCLUDED.empty_page_ratio,
             quality = EXCLUDED.quality,
+            text_version = EXCLUDED.text_version,
+            deleted_at = NULL,
             updated_at = NOW()
         RETURNING id;
         """,
@@ -126,30 +232,163 @@ async def _upsert_document(
                         "empty_page_ratio": quality_report.empty_page_ratio,
                     },
                     "pages": quality_report.pages,
+                    **quality_report.details,
                 }
             ),
+            TEXT_VERSION,
         ),
     )
     row = await cur.fetchone()
     return row["id"]
 
 
+async def _insert_pages(
+    cur: psycopg.AsyncCursor, document_id: int, pages: list[pdf_extract_pypdf.PageText]
+) -> dict[int, int]:
+    """Store each page's prepared text once; returns page number -> ``pages.id``."""
+    stored = [page for page in pages if page.text]
+    if not stored:
+        return {}
+    await cur.execute(
+        """
+        INSERT INTO pages(document_id, page, text)
+        SELECT %s, number, text FROM unnest(%s::int[], %s::text[]) AS p(number, text)
+        RETURNING id, page
+        """,
+        (document_id, [page.page for page in stored], [page.text for page in stored]),
+    )
+    return {row["page"]: row["id"] for row in await cur.fetchall()}
+
+
 async def _insert_chunks(
     cur: psycopg.AsyncCursor,
     document_id: int,
-    page_chunks: list[tuple[int, int, str, str, list[float]]],
+    pages: list[pdf_extract_pypdf.PageText],
+    page_chunks: list[ChunkRecord],
+    copy: bool = False,
 ):
+    """Replace the document's pages and chunks; chunk text is kept as page offsets."""
     await cur.execute("DELETE FROM chunks WHERE document_id = %s", (document_id,))
-    for page, idx, content, content_hash, embedding in page_chunks:
+    await cur.execute("DELETE FROM pages WHERE document_id = %s", (document_id,))
+    page_ids = await _insert_pages(cur, document_id, pages)
+    if copy:
+        async with cur.copy(
+            "COPY chunks (document_id, page, chunk_index, page_id, content_hash, embedding,"
+            " char_start, char_end) FROM STDIN"
+        ) as writer:
+            for chunk in page_chunks:
+                await writer.write_row(
+                    (
+                        document_id,
+                        chunk.page,
+                        chunk.chunk_index,
+                        page_ids[chunk.page],
+                        chunk.content_hash,
+                        bulk.vector_literal(chunk.embedding),
+                        chunk.char_start,
+                        chunk.char_end,
+                    )
+                )
+        return
+    for chunk in page_chunks:
         await cur.execute(
             """
-            INSERT INTO chunks(document_id, page, chunk_index, content, content_hash, embedding)
-            VALUES (%s, %s, %s, %s, %s, %s)
+            INSERT INTO chunks(
+                document_id, page, chunk_index, page_id, content_hash, embedding,
+                char_start, char_end
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
             """,
-            (document_id, page, idx, content, content_hash, embedding),
+            (
+                document_id,
+                chunk.page,
+                chunk.chunk_index,
+                page_ids[chunk.page],
+                chunk.content_hash,
+                chunk.embedding,
+                chunk.char_start,
+                chunk.char_end,
+            ),
         )
 
 
+Span = tuple[pdf_extract_pypdf.PageText, int, int]
+
+
+def _chunk_spans(
+    pages: list[pdf_extract_pypdf.PageText], contract: models.Collection
+) -> list[Span]:
+    # Blank pages have nothing to embed (and no ``pages`` row if empty).
+    return [
+        (page, start, end)
+        for page in pages
+        if page.text.strip()
+        for _, start, end in chunking.chunk_spans(page.text, contract.chunk_size, contract.overlap)
+    ]
+
+
+def _drop_junk(
+    spans: list[Span], thresholds: JunkThresholds, report: quality.QualityReport
+) -> list[Span]:
+    """Keep low-information chunks out of embedding; counts them in ``report.details``."""
+    if not thresholds.enabled:
+        return spans
+    kept: list[Span] = []
+    skipped = 0
+    skipped_chars = 0
+    for page, start, end in spans:
+        if junk.is_junk(junk.score_chunk(page.text[start:end]), thresholds):
+            skipped += 1
+            skipped_chars += end - start
+        else:
+            kept.append((page, start, end))
+    report.details["junk"] = {
+        "chunks_skipped": skipped,
+        "chars_skipped": skipped_chars,
+        "chunks_kept": len(kept),
+    }
+    metrics.inc("nexus_ingest_junk_chunks_skipped_total", skipped)
+    return kept
+
+
+async def _embed_spans(
+    embedder: AdaptiveEmbedder,
+    spans: list[Span],
+    contract: models.Collection,
+    label: str,
+) -> list[ChunkRecord]:
+    """Embed chunk ``spans``; batching and concurrency are up to the embedder.
+
+    Chunks that overflow the embedding model's context come back from the embedder as
+    several segments; each segment is stored as its own chunk with its page offsets.
+    """
+    logger.info("Will embed %d chunks from %s", len(spans), label)
+    segments = await embedder.embed_segments([page.text[s:e] for page, s, e in spans])
+    records: list[ChunkRecord] = []
+    next_index: dict[int, int] = {}
+    for (page, start, _), page_segments in zip(spans, segments, strict=True):
+        for segment in page_segments:
+            if len(segment.embedding) != contract.embed_dim:
+                raise ValueError("Embedding dimension mismatch")
+            char_start = start + segment.start
+            char_end = start + segment.end
+            content = page.text[char_start:char_end]
+            idx = next_index.get(page.page, 0)
+            next_index[page.page] = idx + 1
+            records.append(
+                ChunkRecord(
+                    page=page.page,
+                    chunk_index=idx,
+                    content=content,
+                    content_hash=chunking.content_hash(content),
+                    embedding=segment.embedding,
+                    char_start=char_start,
+                    char_end=char_end,
+                )
+            )
+    return records
+
+
 def _quality_from_pages(pages: list[pdf_extract_pypdf.PageText]) -> quality.QualityReport:
     metrics: list[dict] = []
     for page in pages:
@@ -163,9 +402,392 @@ def _quality_from_pages(pages: list[pdf_extract_pypdf.PageText]) -> quality.Qual
     )
 
 
-async def ingest_collection(name: str) -> IngestSummary:
+def _count_chunks(pages: list[pdf_extract_pypdf.PageText], contract: models.Collection) -> int:
+    return sum(
+        len(chunking.chunk_spans(page.text, contract.chunk_size, contract.overlap))
+        for page in pages
+    )
+
+
+def _prepare_pages(
+    pages: list[pdf_extract_pypdf.PageText],
+    contract: models.Collection,
+    report: quality.QualityReport,
+) -> list[pdf_extract_pypdf.PageText]:
+    """Clean extracted text before chunking; bump ``TEXT_VERSION`` when this changes.
+
+    Records what each step removed in ``report.details``.
+    """
+    chars_before = sum(len(page.text) for page in pages)
+    chunks_before = _count_chunks(pages, contract)
+    pages = normalize.normalize_pages(pages)
+    chars_normalized = sum(len(page.text) for page in pages)
+    chunks_normalized = _count_chunks(pages, contract)
+    report.details["normalization"] = {
+        "chars_before": chars_before,
+        "chars_removed": chars_before - chars_normalized,
+        "chunks_before": chunks_before,
+        "chunks_removed": chunks_before - chunks_normalized,
+    }
+    metrics.inc("nexus_ingest_normalized_chars_removed_total", chars_before - chars_normalized)
+
+    pages, boilerplate_report = boilerplate.strip_repeated_lines(pages)
+    report.details["boilerplate"] = {
+        **boilerplate_report.as_dict(),
+        "chunks_removed": chunks_normalized - _count_chunks(pages, contract),
+    }
+    metrics.inc("nexus_ingest_boilerplate_lines_removed_total", boilerplate_report.lines_removed)
+    return pages
+
+
+def _page_ranges(page_count: int) -> list[tuple[int, int]]:
+    """Split ``page_count`` pages into (first, last) ranges for parallel processing."""
+    settings = get_settings()
+    if page_count < settings.page_range_min_pages:
+        return [(1, max(1, page_count))]
+    size = max(1, settings.page_range_size)
+    return [(first, min(page_count, first + size - 1)) for first in range(1, page_count + 1, size)]
+
+
+@lru_cache(maxsize=1)
+def _get_extract_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=get_budget().extract_workers)
+
+
+async def _extract_range(path: str, first: int, last: int) -> list[pdf_extract_pypdf.PageText]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_extract_pool(), pdf_extract_pypdf.extract_text, path, first, last
+    )
+
+
+@dataclass
+class RangeResult:
+    first_page: int
+    last_page: int
+    pages: list[pdf_extract_pypdf.PageText]
+    ocr_path: pathlib.Path | None
+
+
+async def _extract_pages(path: str, numbers: list[int]) -> list[pdf_extract_pypdf.PageText]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_extract_pool(), pdf_extract_pypdf.extract_pages, path, numbers
+    )
+
+
+async def _ocr_range(
+    file: discover.DiscoveredFile,
+    source: str,
+    collection: str,
+    first: int,
+    last: int,
+    whole_document: bool,
+    pages: list[int] | None,
+    ocr_profile: str | None,
+) -> tuple[pathlib.Path, int]:
+    """OCR pages ``first``..``last`` (optionally only ``pages``) of ``file``.
+
+    Returns the OCR output and the offset of its page numbers relative to ``file``.
+    """
+    if whole_document and not archives.is_member(file.path):
+        path = await asyncio.to_thread(
+            ocr.run_ocr,
+            file.path,
+            collection,
+            relative_root=file.root,
+            profile=ocr_profile,
+            pages=pages,
+        )
+        return path, 0
+    # ocrmypdf needs a file: archive members are copied out like a page range first.
+    offset = first - 1
+    parts_dir = get_settings().processed_dir / collection / ".ranges" / file.sha256
+    range_pdf = parts_dir / f"{first:06d}-{last:06d}.pdf"
+    await asyncio.to_thread(pdf_extract_pypdf.write_page_range, source, first, last, range_pdf)
+    dest = (
+        ocr.processed_path_for(file.path, collection, file.root)
+        if whole_document
+        else parts_dir / f"{first:06d}-{last:06d}.ocr.pdf"
+    )
+    path = await asyncio.to_thread(
+        ocr.run_ocr,
+        range_pdf,
+        collection,
+        dest=dest,
+        profile=ocr_profile,
+        pages=[p - offset for p in pages] if pages else None,
+    )
+    range_pdf.unlink(missing_ok=True)
+    if whole_document:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+    return path, offset
+
+
+async def _process_range(
+    file: discover.DiscoveredFile,
+    source: str,
+    collection: str,
+    first: int,
+    last: int,
+    whole_document: bool,
+    classification: classify.PdfClassification,
+    ocr_profile: str | None = None,
+) -> RangeResult:
+    """Extract and, if needed, OCR one page range of ``file`` (read from ``source``)."""
+    label = f"{file.path} [pages {first}-{last}]"
+    pages: list[pdf_extract_pypdf.PageText] | None = None
+    ocr_pages: list[int] | None = None
+    if classification.kind == "image":
+        # Scanned document: a pypdf pass would find nothing, go straight to OCR.
+        needs_ocr = True
+    else:
+        logger.info("Extracting text from %s", label)
+        with profiling.stage("extract"):
+            pages = await _extract_range(source, first, last)
+        logger.info("Extracted %d pages from %s", len(pages), label)
+        ocr_pages = [p for p in classification.image_pages if first <= p <= last] or None
+        needs_ocr = ocr_pages is not None or _quality_from_pages(pages).needs_ocr
+
+    ocr_path: pathlib.Path | None = None
+    if needs_ocr:
+        logger.info("Running OCR on %s%s", label, f" (pages {ocr_pages})" if ocr_pages else "")
+        with profiling.stage("ocr"):
+            ocr_path, offset = await _ocr_range(
+                file, source, collection, first, last, whole_document, ocr_pages, ocr_profile
+            )
+        if pages is not None and ocr_pages:
+            # Page-selective OCR: only re-extract the pages that were OCR'd.
+            with profiling.stage("extract"):
+                redone = await _extract_pages(str(ocr_path), [p - offset for p in ocr_pages])
+            by_page = {p.page + offset: p.text for p in redone}
+            pages = [
+                pdf_extract_pypdf.PageText(page=p.page, text=by_page.get(p.page, p.text))
+                for p in pages
+            ]
+        else:
+            # Renumber to absolute pages when the OCR output only holds this range.
+            with profiling.stage("extract"):
+                ocr_pages_text = await _extract_range(
+                    str(ocr_path), first - offset, last - offset
+                )
+            pages = [
+                pdf_extract_pypdf.PageText(page=p.page + offset, text=p.text)
+                for p in ocr_pages_text
+            ]
+    return RangeResult(first, last, pages, ocr_path)
+
+
+async def _process_document(
+    file: discover.DiscoveredFile,
+    collection: str,
+    contract: models.Collection,
+    embedder: AdaptiveEmbedder,
+    cfg: CollectionConfig,
+):
+    """Extract and OCR ``file`` (large documents as page ranges), then prepare and embed it.
+
+    Text preparation needs the whole document (e.g. to spot repeated lines), so ranges
+    are merged in page order before chunking. Returns
+    ``(pages, report, ocr_applied, processed_path, chunks)``.
+    """
+    if not archives.is_compressed_tar_member(file.path):
+        return await _process_source(file, str(file.path), collection, contract, embedder, cfg)
+    # Every stage would decompress the tar up to the member again: inflate it once.
+    members = get_settings().processed_dir / collection / ".members"
+    members.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=members, suffix=".pdf") as copy:
+        await asyncio.to_thread(archives.copy_member, file.path, copy)
+        return await _process_source(file, copy.name, collection, contract, embedder, cfg)
+
+
+async def _process_source(
+    file: discover.DiscoveredFile,
+    source: str,
+    collection: str,
+    contract: models.Collection,
+    embedder: AdaptiveEmbedder,
+    cfg: CollectionConfig,
+):
+    """``_process_document`` reading the PDF bytes of ``file`` from ``source``."""
     settings = get_settings()
-    corpora = settings.corpora()
+    loop = asyncio.get_running_loop()
+    with profiling.stage("classify"):
+        classification = await loop.run_in_executor(
+            _get_extract_pool(), classify.classify_pdf, source
+        )
+    metrics.inc("nexus_ingest_classified_total", kind=classification.kind)
+    logger.info("Classified %s as %s", file.path, classification.kind)
+    ranges = _page_ranges(classification.page_count)
+    if len(ranges) > 1:
+        logger.info("Processing %s as %d page ranges", file.path, len(ranges))
+    # tracemalloc peaks and snapshots are process-wide: profile one range at a time.
+    semaphore = asyncio.Semaphore(1 if profiling.active() else get_budget().page_range_workers)
+
+    async def run(first: int, last: int) -> RangeResult:
+        async with semaphore:
+            return await _process_range(
+                file,
+                source,
+                collection,
+                first,
+                last,
+                len(ranges) == 1,
+                classification,
+                cfg.ocr_profile,
+            )
+
+    results = await asyncio.gather(*(run(first, last) for first, last in ranges))
+    pages = [page for result in results for page in result.pages]
+    report = _quality_from_pages(pages)
+    report.details["classification"] = classification.as_dict()
+    pages = _prepare_pages(pages, contract, report)
+    spans = _drop_junk(_chunk_spans(pages, contract), cfg.junk, report)
+    with profiling.stage("embed"):
+        chunks = await _embed_spans(embedder, spans, contract, str(file.path))
+
+    ocr_results = [result for result in results if result.ocr_path is not None]
+    if not ocr_results:
+        return pages, report, False, None, chunks
+    if len(ranges) == 1:
+        return pages, report, True, str(results[0].ocr_path), chunks
+
+    # Stitch OCR'd ranges and untouched original ranges back into one processed PDF.
+    dest = ocr.processed_path_for(file.path, collection, file.root)
+    parts_dir = settings.processed_dir / collection / ".ranges" / file.sha256
+    parts: list[pathlib.Path] = []
+    for result in results:
+        if result.ocr_path is not None:
+            parts.append(result.ocr_path)
+            continue
+        part = parts_dir / f"{result.first_page:06d}-{result.last_page:06d}.pdf"
+        await asyncio.to_thread(
+            pdf_extract_pypdf.write_page_range,
+            source,
+            result.first_page,
+            result.last_page,
+            part,
+        )
+        parts.append(part)
+    await asyncio.to_thread(pdf_extract_pypdf.merge_pdfs, parts, dest)
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    return pages, report, True, str(dest), chunks
+
+
+async def ingest_file(
+    file: discover.DiscoveredFile,
+    name: str,
+    cfg: CollectionConfig,
+    contract: models.Collection,
+    embedder: AdaptiveEmbedder,
+    advisory: locks.AdvisoryLocks | None = None,
+    bulk_load: bool = False,
+    committer: GroupCommitter | None = None,
+    known: set[tuple[str, str, int]] | None = None,
+) -> str:
+    """Ingest one file into ``contract``.
+
+    Returns "processed", "skipped", "duplicate", or "locked" when another run holds
+    the file's advisory lock and is ingesting it right now. With a ``committer`` the
+    document's writes are committed together with other documents'; ``known`` (see
+    ``_load_known``) lets unchanged files be skipped without a query.
+    """
+    if known is not None and (str(file.path), file.sha256, file.mtime) in known:
+        return "skipped"
+    if advisory is None:
+        async with locks.lock_session() as session:
+            return await ingest_file(
+                file, name, cfg, contract, embedder, session, bulk_load, committer
+            )
+    async with advisory.hold(locks.document_key(contract.id, str(file.path))) as acquired:
+        if not acquired:
+            return "locked"
+        return await _ingest_locked_file(
+            file, name, cfg, contract, embedder, bulk_load, committer
+        )
+
+
+async def _persist(write: Write, committer: GroupCommitter | None, row_count: int = 1):
+    """Run ``write`` in the committer's next group transaction, or in its own."""
+    if committer is not None:
+        return await committer.submit(write, row_count)
+    async with db_connection(row_factory=rows.dict_row) as conn:
+        async with conn.cursor() as cur:
+            result = await write(cur)
+        await conn.commit()
+    return result
+
+
+async def _ingest_locked_file(
+    file: discover.DiscoveredFile,
+    name: str,
+    cfg: CollectionConfig,
+    contract: models.Collection,
+    embedder: AdaptiveEmbedder,
+    bulk_load: bool = False,
+    committer: GroupCommitter | None = None,
+) -> str:
+    collection_id = contract.id
+    async with db_connection(row_factory=rows.dict_row) as conn:
+        async with conn.cursor() as cur:
+            unchanged = await _doc_exists(
+                cur, collection_id, str(file.path), file.sha256, file.mtime
+            )
+            duplicate = not unchanged and await _has_duplicate(
+                cur, collection_id, file.sha256, str(file.path)
+            )
+        await conn.commit()
+    if unchanged:
+        return "skipped"
+
+    if duplicate:
+
+        async def write_duplicate(cur: psycopg.AsyncCursor) -> None:
+            await _upsert_document(
+                cur,
+                collection_id,
+                str(file.path),
+                file.sha256,
+                file.mtime,
+                file.size,
+                cfg.tags,
+                False,
+                None,
+                quality.QualityReport(extracted_chars=0, empty_page_ratio=0, pages=[]),
+                status="duplicate",
+            )
+
+        await _persist(write_duplicate, committer)
+        return "duplicate"
+
+    # Extract text outside SQL transaction
+    pages, report, ocr_applied, processed_path, page_chunks = await _process_document(
+        file, name, contract, embedder, cfg
+    )
+
+    async def write_document(cur: psycopg.AsyncCursor) -> None:
+        doc_id = await _upsert_document(
+            cur,
+            collection_id,
+            str(file.path),
+            file.sha256,
+            file.mtime,
+            file.size,
+            cfg.tags,
+            ocr_applied,
+            processed_path,
+            report,
+        )
+        await _insert_chunks(cur, doc_id, pages, page_chunks, copy=bulk_load)
+
+    with profiling.stage("write"):
+        await _persist(write_document, committer, 1 + len(pages) + len(page_chunks))
+    return "processed"
+
+
+def collection_config(name: str) -> CollectionConfig:
+    """Manifest entry for ``name`` restricted to the roots that are mounted here."""
+    corpora = get_settings().corpora()
     if name not in corpora.collections:
         raise ValueError(f"Unknown collection {name}")
     cfg = corpora.collections[name]
@@ -173,117 +795,275 @@ async def ingest_collection(name: str) -> IngestSummary:
     # Validate collection paths before ingest
     validator = MountValidator()
     valid_roots = validator.validate_collection_path([pathlib.Path(r) for r in cfg.roots])
+    # Uploads live outside the mounted corpora, in a directory the deployment configures.
+    uploads = discover.upload_root(name)
+    if uploads.is_dir():
+        valid_roots.append(uploads)
     if not valid_roots:
         raise MountValidationError(f"No valid roots found for collection {name}")
-    cfg = dataclasses.replace(cfg, roots=[str(r) for r in valid_roots])
+    return cfg.model_copy(update={"roots": [str(r) for r in valid_roots]})
+
+
+class IngestInProgressError(RuntimeError):
+    """An ingest of the same collection version is running with different options."""
+
+
+_running: dict[tuple[str, int | None], tuple[tuple, asyncio.Task]] = {}
+
+
+async def ingest_collection(
+    name: str,
+    collection_id: int | None = None,
+    bulk_load: bool = False,
+    profile: bool | None = None,
+    select: discover.FileFilter | None = None,
+    max_files: int | None = None,
+) -> IngestSummary:
+    """Ingest the files of ``name`` into a collection version.
+
+    Without ``collection_id`` the active version is used (and created on first run);
+    re-indexing passes the id of the inactive version it is building. A call made while
+    the same ingest is already running in this process waits for that run and returns
+    its summary instead of starting another one; if that run was started with different
+    options, ``IngestInProgressError`` is raised.
+
+    ``bulk_load`` drops the HNSW index for the duration of the run, writes chunks with
+    COPY and rebuilds the index at the end (see ``nexus.ingest.bulk``). ``profile``
+    (default: ``ingest_profile`` setting) processes one document at a time and records
+    memory per document and stage (see ``nexus.ingest.profiling``).
 
+    ``select`` restricts the run to files modified since a cutoff or to given paths;
+    ``max_files`` caps the number of new or changed files ingested, so a large
+    backfill can be staged over several runs.
+    """
+    key = (name, collection_id)
+    options = (bulk_load, profile, select, max_files)
+    running = _running.get(key)
+    if running is None:
+        task = asyncio.create_task(_ingest_collection(name, collection_id, *options))
+        _running[key] = (options, task)
+        task.add_done_callback(lambda _: _running.pop(key, None))
+    elif running[0] != options:
+        raise IngestInProgressError(
+            f"Ingest of collection {name} is already running with different options"
+        )
+    else:
+        task = running[1]
+        logger.info("Ingest of collection %s is already running; waiting for it", name)
+    # Shielded so a cancelled caller (e.g. a dropped HTTP request) does not abort the run.
+    return await asyncio.shield(task)
+
+
+async def _ingest_collection(
+    name: str,
+    collection_id: int | None,
+    bulk_load: bool = False,
+    profile: bool | None = None,
+    select: discover.FileFilter | None = None,
+    max_files: int | None = None,
+) -> IngestSummary:
+    cfg = collection_config(name)
     logger.info("Starting ingest for collection %s", name)
-    discovered = discover.walk_collection(cfg)
+    discovered = discover.walk_collection(cfg, select)
     logger.info("Discovered %d files in collection %s", len(discovered), name)
-    embedder = OllamaEmbedder()
     summary = IngestSummary(scanned=len(discovered), processed=0, skipped=0, failed=0, duplicates=0)
 
     async with db_connection(row_factory=rows.dict_row) as conn:
         async with conn.cursor() as cur:
-            collection_id = await ensure_collection(cur, name)
+            if collection_id is None:
+                collection_id = await ensure_collection(cur, name)
+            contract = await load_collection(cur, collection_id)
+            known = await _load_known(cur, collection_id)
         await conn.commit()
+    if max_files is not None:
+        pending = [f for f in discovered if (str(f.path), f.sha256, f.mtime) not in known]
+        summary.skipped += len(discovered) - len(pending)
+        discovered = pending[:max_files]
+        logger.info("Ingesting %d of %d new or changed files", len(discovered), len(pending))
+    embedder = AdaptiveEmbedder(model=contract.embed_model)
 
-    for file in discovered:
-        try:
-            async with db_connection(row_factory=rows.dict_row) as conn:
-                async with conn.cursor() as cur:
-                    unchanged = await _doc_exists(
-                        cur, collection_id, str(file.path), file.sha256, file.mtime
-                    )
-                    if unchanged:
-                        summary.skipped += 1
-                        await conn.commit()
-                        continue
-
-                    if await _has_duplicate(cur, collection_id, file.sha256, str(file.path)):
-                        await _upsert_document(
-                            cur,
-                            collection_id,
-                            str(file.path),
-                            file.sha256,
-                            file.mtime,
-                            file.size,
-                            cfg.tags,
-                            False,
-                            None,
-                            quality.QualityReport(extracted_chars=0, empty_page_ratio=0, pages=[]),
-                            status="duplicate",
-                        )
-                        summary.duplicates += 1
-                        await conn.commit()
-                        continue
-
-                # Extract text outside SQL transaction
-            logger.info("Extracting text from %s", file.path)
-            pages = pdf_extract_pypdf.extract_text(str(file.path))
-            logger.info("Extracted %d pages from %s", len(pages), file.path)
-            report = _quality_from_pages(pages)
-
-            source_path = file.path
-            processed_path: str | None = None
-            ocr_applied = False
-            if report.needs_ocr:
-                logger.info("Running OCR on %s", file.path)
-                source_path = ocr.run_ocr(file.path, name, relative_root=file.root)
-                processed_path = str(source_path)
-                pages = pdf_extract_pypdf.extract_text(str(source_path))
-                report = _quality_from_pages(pages)
-                ocr_applied = True
-
-            page_chunks: list[tuple[int, int, str, str, list[float]]] = []
-            total_chunks = 0
-            for page in pages:
-                for idx, content, content_hash in chunking.chunk_text(page.text, page.page):
-                    total_chunks += 1
-            logger.info("Will embed %d chunks from %s", total_chunks, file.path)
-
-            chunk_num = 0
-            for page in pages:
-                for idx, content, content_hash in chunking.chunk_text(page.text, page.page):
-                    chunk_num += 1
-                    if chunk_num % 10 == 0:
-                        logger.info("Embedding chunk %d/%d", chunk_num, total_chunks)
-                    embeddings = await embedder.embed_documents([content])
-                    embedding = embeddings[0]
-                    if len(embedding) != settings.embed_dim:
-                        raise ValueError("Embedding dimension mismatch")
-                    page_chunks.append((page.page, idx, content, content_hash, embedding))
-
-            async with db_connection(row_factory=rows.dict_row) as conn:
-                async with conn.cursor() as cur:
-                    doc_id = await _upsert_document(
-                        cur,
-                        collection_id,
-                        str(file.path),
-                        file.sha256,
-                        file.mtime,
-                        file.size,
-                        cfg.tags,
-                        ocr_applied,
-                        processed_path,
-                        report,
-                    )
-                    await _insert_chunks(cur, doc_id, page_chunks)
-                await conn.commit()
-            summary.processed += 1
-        except Exception as exc:  # noqa: BLE001
-            logger.exception("Failed to ingest %s: %s", file.path, exc)
-            summary.failed += 1
+    profiler = None
+    if profile if profile is not None else get_settings().ingest_profile:
+        profiler = profiling.IngestProfiler(profiling.report_path_for(name))
+        profiler.start()
+    if bulk_load:
+        await bulk.drop_vector_index()
+    try:
+        await _run_files(
+            name, cfg, contract, embedder, discovered, summary, bulk_load, profiler, known
+        )
+    finally:
+        if bulk_load:
+            await bulk.rebuild_vector_index()
+        if profiler is not None:
+            profiler.stop()
+            summary.profile = profiler.summary()
     return summary
 
 
-async def main():
-    import argparse
+async def _run_files(
+    name: str,
+    cfg: CollectionConfig,
+    contract: models.Collection,
+    embedder: AdaptiveEmbedder,
+    discovered: list[discover.DiscoveredFile],
+    summary: IngestSummary,
+    bulk_load: bool,
+    profiler: profiling.IngestProfiler | None = None,
+    known: set[tuple[str, str, int]] | None = None,
+) -> None:
+    # Profiled runs take one document at a time so memory can be attributed to it.
+    semaphore = asyncio.Semaphore(1 if profiler else get_budget().inflight_documents)
+
+    # COPY (bulk-load mode) is not available in pipeline mode.
+    committer = GroupCommitter(pipeline=not bulk_load)
+    async with locks.lock_session() as advisory, committer:
+        # Runs in other processes split the work through per-document locks; a run that
+        # starts while another holds the collection lock walks the files from the end so
+        # the two meet in the middle instead of contending file by file.
+        async with advisory.hold(locks.collection_key(name, contract.id)) as first:
+            if not first:
+                logger.info("Another process is ingesting %s; sharing its files", name)
+                discovered.reverse()
+
+            async def run(file: discover.DiscoveredFile) -> None:
+                async with semaphore:
+                    scope = (
+                        profiler.document(str(file.path), file.size)
+                        if profiler
+                        else contextlib.nullcontext()
+                    )
+                    with committer.document():
+                        async with scope as document:
+                            try:
+                                outcome = await ingest_file(
+                                    file,
+                                    name,
+                                    cfg,
+                                    contract,
+                                    embedder,
+                                    advisory,
+                                    bulk_load,
+                                    committer,
+                                    known,
+                                )
+                            except Exception as exc:  # noqa: BLE001
+                                logger.exception("Failed to ingest %s: %s", file.path, exc)
+                                summary.failed += 1
+                                outcome = "failed"
+                            if document is not None:
+                                document.outcome = outcome
+                if outcome == "failed":
+                    return
+                if outcome == "skipped":
+                    summary.skipped += 1
+                elif outcome == "duplicate":
+                    summary.duplicates += 1
+                elif outcome == "locked":
+                    summary.in_progress += 1
+                else:
+                    summary.processed += 1
 
+            await asyncio.gather(*(run(file) for file in discovered))
+
+
+def _since(value: str) -> float:
+    """``--since`` value: an ISO date/time or an age such as ``36h`` or ``7d``."""
+    units = {"m": 60, "h": 3600, "d": 86400}
+    if value[-1:] in units and value[:-1].isdigit():
+        return time.time() - int(value[:-1]) * units[value[-1]]
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a date or age: {value}") from None
+
+
+def _read_paths(values: list[str]) -> list[pathlib.Path]:
+    """``--paths`` entries; ``@file`` reads one path per line from a file (``@-``: stdin)."""
+    paths: list[pathlib.Path] = []
+    for value in values:
+        if value == "@-":
+            lines = sys.stdin.read().splitlines()
+        elif value.startswith("@"):
+            lines = pathlib.Path(value[1:]).read_text(encoding="utf-8").splitlines()
+        else:
+            lines = [value]
+        paths.extend(pathlib.Path(line.strip()) for line in lines if line.strip())
+    return paths
+
+
+async def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--collection", required=True, help="Collection name to ingest")
+    parser.add_argument(
+        "--enqueue",
+        action="store_true",
+        help="Only discover files and queue them for nexus-worker processes",
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Initial load: drop the vector index, COPY chunks and rebuild the index at the end",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=None,
+        help="Record peak RSS and top allocations per document and stage",
+    )
+    parser.add_argument(
+        "--workers", type=int, help="Documents processed at once (NEXUS_INFLIGHT_DOCUMENTS)"
+    )
+    parser.add_argument(
+        "--embed-batch-size",
+        type=int,
+        help="Initial chunks per embedding request (NEXUS_EMBED_BATCH_SIZE)",
+    )
+    parser.add_argument(
+        "--since",
+        type=_since,
+        help="Only files modified since this date (2024-05-01) or age (36h, 7d)",
+    )
+    parser.add_argument(
+        "--paths",
+        nargs="+",
+        default=[],
+        help="Only these files, directories or archives; @list reads them from a file",
+    )
+    parser.add_argument(
+        "--max-files", type=int, help="Ingest at most this many new or changed files"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Estimate pages, chunks, OCR and embedding time from file sizes; ingest nothing",
+    )
     args = parser.parse_args()
-    summary = await ingest_collection(args.collection)
+    # Applied before the settings and resource budget are first read.
+    if args.workers is not None:
+        os.environ["NEXUS_INFLIGHT_DOCUMENTS"] = str(args.workers)
+    if args.embed_batch_size is not None:
+        os.environ["NEXUS_EMBED_BATCH_SIZE"] = str(args.embed_batch_size)
+    select = None
+    if args.since is not None or args.paths:
+        select = discover.FileFilter(since=args.since, paths=_read_paths(args.paths))
+    if args.dry_run:
+        from nexus.ingest.plan import plan_ingest
+
+        print((await plan_ingest(args.collection, select, args.max_files)).format())
+        return
+    if args.enqueue:
+        from nexus.ingest.queue import enqueue_collection
+
+        print(f"Queued {await enqueue_collection(args.collection, select=select)} files")
+        return
+    summary = await ingest_collection(
+        args.collection,
+        bulk_load=args.bulk,
+        profile=args.profile,
+        select=select,
+        max_files=args.max_files,
+    )
     print(summary)
 
 
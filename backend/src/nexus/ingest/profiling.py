@@ -0,0 +1,246 @@
+"""Opt-in memory profiling of ingest, per document and per stage.
+
+A background thread samples the RSS of the whole process tree (the API or CLI
+process, the extraction pool and OCR subprocesses, which is what a container
+memory limit counts) and attributes the peak to every stage active at the time.
+``tracemalloc`` snapshots around each stage record the Python allocation sites
+that grew the most.
+
+The JSON report is rewritten whenever a document or stage starts or finishes, so
+it still names the document and stage in flight when the process is OOM-killed.
+"""
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import os
+import pathlib
+import resource
+import threading
+import time
+import tracemalloc
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import AsyncIterator, Iterator
+
+from nexus.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+TOP_ALLOCATIONS = 5
+MIB = 1024 * 1024
+
+_current: contextvars.ContextVar[tuple[IngestProfiler, DocumentProfile] | None] = (
+    contextvars.ContextVar("ingest_profile", default=None)
+)
+
+
+def _pid_rss(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _children(pid: int) -> list[int]:
+    children: list[int] = []
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return children
+    for tid in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{tid}/children", encoding="ascii") as handle:
+                children.extend(int(child) for child in handle.read().split())
+        except OSError:
+            continue
+    return children
+
+
+def tree_rss() -> int:
+    """Resident memory of this process and all its descendants, in bytes."""
+    if not os.path.exists("/proc/self/status"):
+        # No procfs (e.g. macOS): fall back to this process' own peak.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    total = 0
+    pending = [os.getpid()]
+    while pending:
+        pid = pending.pop()
+        total += _pid_rss(pid)
+        pending.extend(_children(pid))
+    return total
+
+
+@dataclass(eq=False)
+class StageProfile:
+    stage: str
+    seconds: float = 0.0
+    rss_start_bytes: int = 0
+    rss_peak_bytes: int = 0
+    python_peak_bytes: int = 0
+    top_allocations: list[dict] = field(default_factory=list)
+
+
+@dataclass(eq=False)
+class DocumentProfile:
+    path: str
+    size: int
+    rss_start_bytes: int = 0
+    rss_peak_bytes: int = 0
+    seconds: float = 0.0
+    outcome: str | None = None
+    stages: list[StageProfile] = field(default_factory=list)
+
+
+class IngestProfiler:
+    """Collects per-document, per-stage memory profiles for one ingest run."""
+
+    def __init__(self, report_path: pathlib.Path, sample_seconds: float | None = None):
+        self.report_path = report_path
+        self.sample_seconds = sample_seconds or get_settings().profile_sample_seconds
+        self.documents: list[DocumentProfile] = []
+        self._active_documents: list[DocumentProfile] = []
+        self._active_stages: list[StageProfile] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+        self._started_tracemalloc = False
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._sampler = threading.Thread(target=self._sample, name="ingest-profiler", daemon=True)
+        self._sampler.start()
+        logger.info("Profiling ingest; report at %s", self.report_path)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        self.write()
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.sample_seconds):
+            rss = tree_rss()
+            with self._lock:
+                for item in (*self._active_documents, *self._active_stages):
+                    item.rss_peak_bytes = max(item.rss_peak_bytes, rss)
+
+    @asynccontextmanager
+    async def document(self, path: str, size: int) -> AsyncIterator[DocumentProfile]:
+        rss = tree_rss()
+        profile = DocumentProfile(path=path, size=size, rss_start_bytes=rss, rss_peak_bytes=rss)
+        logger.info("Profiling %s (%d bytes, RSS %.0f MiB)", path, size, rss / MIB)
+        started = time.perf_counter()
+        with self._lock:
+            self.documents.append(profile)
+            self._active_documents.append(profile)
+        self.write()
+        token = _current.set((self, profile))
+        try:
+            yield profile
+        finally:
+            _current.reset(token)
+            profile.seconds = time.perf_counter() - started
+            with self._lock:
+                self._active_documents.remove(profile)
+            logger.info(
+                "Profiled %s: peak RSS %.0f MiB in %.1fs",
+                path,
+                profile.rss_peak_bytes / MIB,
+                profile.seconds,
+            )
+            self.write()
+
+    @contextmanager
+    def _stage(self, document: DocumentProfile, name: str) -> Iterator[None]:
+        rss = tree_rss()
+        profile = StageProfile(stage=name, rss_start_bytes=rss, rss_peak_bytes=rss)
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        with self._lock:
+            document.stages.append(profile)
+            self._active_stages.append(profile)
+        self.write()
+        try:
+            yield
+        finally:
+            profile.seconds = time.perf_counter() - started
+            profile.python_peak_bytes = tracemalloc.get_traced_memory()[1]
+            after = tracemalloc.take_snapshot()
+            profile.top_allocations = [
+                {
+                    "site": str(stat.traceback),
+                    "size_diff_bytes": stat.size_diff,
+                    "count": stat.count,
+                }
+                for stat in after.compare_to(before, "lineno")[:TOP_ALLOCATIONS]
+            ]
+            with self._lock:
+                self._active_stages.remove(profile)
+            self.write()
+
+    def summary(self) -> dict:
+        """Compact summary for the job output: worst documents and per-stage peaks."""
+        worst = sorted(self.documents, key=lambda d: d.rss_peak_bytes, reverse=True)[:5]
+        stages: dict[str, int] = {}
+        for document in self.documents:
+            for stage in document.stages:
+                stages[stage.stage] = max(stages.get(stage.stage, 0), stage.rss_peak_bytes)
+        return {
+            "report": str(self.report_path),
+            "peak_rss_mib": round(max((d.rss_peak_bytes for d in self.documents), default=0) / MIB),
+            "stage_peak_rss_mib": {name: round(peak / MIB) for name, peak in stages.items()},
+            "top_documents": [
+                {"path": d.path, "peak_rss_mib": round(d.rss_peak_bytes / MIB)} for d in worst
+            ],
+        }
+
+    def write(self) -> None:
+        with self._lock:
+            report = {
+                "documents": [asdict(d) for d in self.documents],
+                "in_progress": [
+                    {
+                        "path": d.path,
+                        "stages": [s.stage for s in d.stages if s in self._active_stages],
+                    }
+                    for d in self._active_documents
+                ],
+            }
+        self.report_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.report_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(report, indent=2))
+        tmp.replace(self.report_path)
+
+
+def active() -> bool:
+    """Whether the current document is being profiled."""
+    return _current.get() is not None
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Profile ``name`` for the current document; a no-op unless profiling is enabled."""
+    current = _current.get()
+    if current is None:
+        yield
+        return
+    profiler, document = current
+    with profiler._stage(document, name):
+        yield
+
+
+def report_path_for(collection: str) -> pathlib.Path:
+    settings = get_settings()
+    directory = settings.profile_dir or settings.processed_dir / "profiles"
+    return directory / f"{collection}-{time.strftime('%Y%m%d-%H%M%S')}.json"
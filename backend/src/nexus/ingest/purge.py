@@ -0,0 +1,173 @@
+"""Throttled background removal of deleted documents and collection versions.
+
+Deleting a document only sets ``documents.deleted_at``: search and listings skip it
+from that moment on. The purger then removes its chunks and pages
+``purge_batch_size`` rows per transaction, pausing ``purge_pause_seconds`` between
+batches, and the document row last, so HNSW and heap maintenance never holds one
+long transaction next to search. Collection versions marked deleted (see
+``nexus.ingest.reindex.drop_inactive_versions``) are removed once they are empty.
+Several processes can purge at once; rows are claimed with ``SKIP LOCKED``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import weakref
+
+import psycopg
+from psycopg import rows
+
+from nexus import metrics
+from nexus.config import get_settings
+from nexus.db import db_connection
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_batch(cur: psycopg.AsyncCursor, batch_size: int) -> int:
+    """Remove one batch of rows belonging to deleted documents; returns rows removed."""
+    await cur.execute(
+        """
+        SELECT id FROM documents WHERE deleted_at IS NOT NULL
+        ORDER BY deleted_at LIMIT 1
+        FOR UPDATE SKIP LOCKED
+        """
+    )
+    row = await cur.fetchone()
+    if row is None:
+        return await _purge_collections(cur)
+    document_id = row["id"]
+    # Chunks first: they reference pages.
+    for table in ("chunks", "pages"):
+        await cur.execute(
+            f"""
+            DELETE FROM {table} WHERE id IN (
+                SELECT id FROM {table} WHERE document_id = %s LIMIT %s
+            )
+            """,
+            (document_id, batch_size),
+        )
+        if cur.rowcount:
+            metrics.inc("nexus_purge_rows_total", cur.rowcount, table=table)
+            return cur.rowcount
+    await cur.execute("DELETE FROM documents WHERE id = %s", (document_id,))
+    metrics.inc("nexus_purge_rows_total", table="documents")
+    return 1
+
+
+async def _purge_collections(cur: psycopg.AsyncCursor) -> int:
+    await cur.execute(
+        """
+        DELETE FROM collections c
+        WHERE c.deleted_at IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM documents d WHERE d.collection_id = c.id)
+        """
+    )
+    if cur.rowcount:
+        metrics.inc("nexus_purge_rows_total", cur.rowcount, table="collections")
+    return cur.rowcount
+
+
+async def pending_documents(cur: psycopg.AsyncCursor) -> int:
+    await cur.execute("SELECT COUNT(*) AS n FROM documents WHERE deleted_at IS NOT NULL")
+    return (await cur.fetchone())["n"]
+
+
+class Purger:
+    def __init__(
+        self,
+        batch_size: int | None = None,
+        pause: float | None = None,
+        poll: float | None = None,
+    ):
+        settings = get_settings()
+        self.batch_size = batch_size or settings.purge_batch_size
+        self.pause = pause if pause is not None else settings.purge_pause_seconds
+        self.poll = poll if poll is not None else settings.purge_poll_seconds
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def wake(self) -> None:
+        """Start purging now instead of at the next poll."""
+        self._wake.set()
+
+    async def purge(self, once: bool = False) -> int:
+        """Purge until nothing is left (``once``) or forever; returns rows removed."""
+        removed = 0
+        while True:
+            async with db_connection(row_factory=rows.dict_row) as conn:
+                async with conn.cursor() as cur:
+                    count = await purge_batch(cur, self.batch_size)
+                    if not count:
+                        pending = await pending_documents(cur)
+                        metrics.set_gauge("nexus_purge_pending_documents", pending)
+                await conn.commit()
+            removed += count
+            if count:
+                await asyncio.sleep(self.pause)
+                continue
+            if once:
+                return removed
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.purge()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Purge failed, retrying in %.0fs: %s", self.poll, exc)
+                await asyncio.sleep(self.poll)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_purgers: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Purger] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_purger() -> Purger:
+    """The purger of the current event loop."""
+    loop = asyncio.get_running_loop()
+    purger = _purgers.get(loop)
+    if purger is None:
+        purger = _purgers[loop] = Purger()
+    return purger
+
+
+async def _run(args: argparse.Namespace) -> int:
+    return await Purger(args.batch_size, args.pause).purge(once=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Remove deleted documents in batches")
+    parser.add_argument("--batch-size", type=int, help="Rows per transaction")
+    parser.add_argument("--pause", type=float, help="Seconds between batches")
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s"
+    )
+    removed = asyncio.run(_run(args))
+    print(f"Removed {removed} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,8 @@ class QualityReport:
     extracted_chars: int
     empty_page_ratio: float
     pages: list[dict] = field(default_factory=list)
+    # Extra per-document stage reports stored alongside "doc" and "pages".
+    details: dict = field(default_factory=dict)
 
     @property
     def needs_ocr(self) -> bool:
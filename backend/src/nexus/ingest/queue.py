@@ -0,0 +1,210 @@
+"""Postgres-backed work queue for distributed ingest.
+
+Discovery enqueues one item per file; any number of ``nexus-worker`` processes
+claim items with ``FOR UPDATE SKIP LOCKED``, extend their lease while working and
+delete the item once it is ingested. Items whose lease expired (the worker died)
+are put back in the queue until ``queue_max_attempts`` is reached.
+"""
+from __future__ import annotations
+
+import logging
+import pathlib
+from dataclasses import dataclass
+
+import psycopg
+from psycopg import rows
+
+from nexus.config import get_settings
+from nexus.db import db_connection
+from nexus.ingest import discover
+from nexus.ingest.pipeline import collection_config, ensure_collection
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueueItem:
+    id: int
+    collection: str
+    collection_id: int
+    path: str
+    root: str
+    source_sha256: str
+    mtime: int
+    size: int
+    attempts: int
+
+    def to_file(self) -> discover.DiscoveredFile:
+        path = pathlib.Path(self.path)
+        root = pathlib.Path(self.root)
+        return discover.DiscoveredFile(
+            path=path,
+            root=root,
+            relative_path=path.relative_to(root),
+            sha256=self.source_sha256,
+            mtime=self.mtime,
+            size=self.size,
+        )
+
+
+_ITEM_COLUMNS = "id, collection, collection_id, path, root, source_sha256, mtime, size, attempts"
+
+
+async def enqueue(
+    cur: psycopg.AsyncCursor,
+    collection: str,
+    collection_id: int,
+    files: list[discover.DiscoveredFile],
+) -> int:
+    """Queue ``files`` for ``collection_id``; files already queued or running are left alone.
+
+    Earlier failed items for the same paths are dropped so each file gets a fresh set
+    of attempts.
+    """
+    await cur.execute(
+        """
+        DELETE FROM ingest_queue
+        WHERE collection_id = %s AND status = 'failed' AND path = ANY(%s)
+        """,
+        (collection_id, [str(file.path) for file in files]),
+    )
+    enqueued = 0
+    for file in files:
+        await cur.execute(
+            """
+            INSERT INTO ingest_queue(
+                collection, collection_id, path, root, source_sha256, mtime, size
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (collection_id, path) WHERE status IN ('queued', 'running') DO NOTHING
+            """,
+            (
+                collection,
+                collection_id,
+                str(file.path),
+                str(file.root),
+                file.sha256,
+                file.mtime,
+                file.size,
+            ),
+        )
+        enqueued += cur.rowcount
+    return enqueued
+
+
+async def claim(
+    cur: psycopg.AsyncCursor, worker_id: str, limit: int, lease_seconds: int | None = None
+) -> list[QueueItem]:
+    """Lease up to ``limit`` queued items to ``worker_id``, skipping rows other workers hold."""
+    lease = lease_seconds or get_settings().queue_lease_seconds
+    await cur.execute(
+        f"""
+        UPDATE ingest_queue
+        SET status = 'running',
+            lease_owner = %s,
+            lease_expires_at = NOW() + make_interval(secs => %s),
+            attempts = attempts + 1,
+            updated_at = NOW()
+        WHERE id IN (
+            SELECT id FROM ingest_queue
+            WHERE status = 'queued'
+            ORDER BY id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING {_ITEM_COLUMNS}
+        """,
+        (worker_id, lease, limit),
+    )
+    return [QueueItem(**row) for row in await cur.fetchall()]
+
+
+async def heartbeat(
+    cur: psycopg.AsyncCursor, worker_id: str, item_ids: list[int], lease_seconds: int | None = None
+) -> int:
+    """Extend the leases ``worker_id`` still holds; returns how many were extended."""
+    if not item_ids:
+        return 0
+    lease = lease_seconds or get_settings().queue_lease_seconds
+    await cur.execute(
+        """
+        UPDATE ingest_queue
+        SET lease_expires_at = NOW() + make_interval(secs => %s), updated_at = NOW()
+        WHERE id = ANY(%s) AND lease_owner = %s AND status = 'running'
+        """,
+        (lease, item_ids, worker_id),
+    )
+    return cur.rowcount
+
+
+async def complete(cur: psycopg.AsyncCursor, worker_id: str, item_id: int) -> bool:
+    """Remove a finished item; ``False`` if the lease was lost to another worker."""
+    await cur.execute(
+        "DELETE FROM ingest_queue WHERE id = %s AND lease_owner = %s",
+        (item_id, worker_id),
+    )
+    return cur.rowcount == 1
+
+
+async def fail(
+    cur: psycopg.AsyncCursor,
+    worker_id: str,
+    item_id: int,
+    error: str,
+    max_attempts: int | None = None,
+) -> None:
+    """Put a failed item back in the queue, or park it as failed after too many attempts."""
+    limit = max_attempts or get_settings().queue_max_attempts
+    await cur.execute(
+        """
+        UPDATE ingest_queue
+        SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'queued' END,
+            lease_owner = NULL,
+            lease_expires_at = NULL,
+            error = %s,
+            updated_at = NOW()
+        WHERE id = %s AND lease_owner = %s
+        """,
+        (limit, error, item_id, worker_id),
+    )
+
+
+async def requeue_expired(cur: psycopg.AsyncCursor, max_attempts: int | None = None) -> int:
+    """Return items whose worker stopped heartbeating to the queue."""
+    limit = max_attempts or get_settings().queue_max_attempts
+    await cur.execute(
+        """
+        UPDATE ingest_queue
+        SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'queued' END,
+            error = COALESCE(error, 'lease expired (held by ' || lease_owner || ')'),
+            lease_owner = NULL,
+            lease_expires_at = NULL,
+            updated_at = NOW()
+        WHERE status = 'running' AND lease_expires_at < NOW()
+        """,
+        (limit,),
+    )
+    return cur.rowcount
+
+
+async def queue_depth(cur: psycopg.AsyncCursor) -> dict[str, int]:
+    """Item counts per status."""
+    await cur.execute("SELECT status, COUNT(*) AS n FROM ingest_queue GROUP BY status")
+    return {row["status"]: row["n"] for row in await cur.fetchall()}
+
+
+async def enqueue_collection(
+    name: str, collection_id: int | None = None, select: discover.FileFilter | None = None
+) -> int:
+    """Discover the files of ``name`` and queue them for the workers; returns items added."""
+    cfg = collection_config(name)
+    discovered = discover.walk_collection(cfg, select)
+    logger.info("Discovered %d files in collection %s", len(discovered), name)
+    async with db_connection(row_factory=rows.dict_row) as conn:
+        async with conn.cursor() as cur:
+            if collection_id is None:
+                collection_id = await ensure_collection(cur, name)
+            enqueued = await enqueue(cur, name, collection_id, discovered)
+        await conn.commit()
+    logger.info("Queued %d files for collection %s", enqueued, name)
+    return enqueued
@@ -0,0 +1,195 @@
+"""Blue/green re-indexing of collections.
+
+A re-index builds version N+1 of a collection next to the serving version N,
+flips ``collections.active`` in a single statement once the build succeeded and
+then marks the versions that are no longer active for deletion (removed in the
+background by ``nexus.ingest.purge``).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass
+
+import psycopg
+from psycopg import rows
+
+from nexus.config import get_settings
+from nexus.db import db_connection
+from nexus.domain import models
+from nexus.ingest.pipeline import IngestSummary, ingest_collection, load_collection
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReindexResult:
+    collection: str
+    version: int
+    activated: bool
+    summary: IngestSummary
+    removed_versions: int = 0
+
+
+async def create_version(
+    cur: psycopg.AsyncCursor,
+    name: str,
+    embed_model: str | None = None,
+    chunk_size: int | None = None,
+    chunk_overlap: int | None = None,
+) -> models.Collection:
+    """Insert the next, inactive version of ``name`` with the given build parameters."""
+    settings = get_settings()
+    # Serialise version allocation for this collection name.
+    await cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"collection:{name}",))
+    await cur.execute(
+        """
+        INSERT INTO collections(name, version, embed_model, embed_dim, chunk_size, overlap, active)
+        SELECT %s, COALESCE(MAX(version), 0) + 1, %s, %s, %s, %s, FALSE
+        FROM collections WHERE name = %s
+        RETURNING id;
+        """,
+        (
+            name,
+            embed_model or settings.embed_model,
+            settings.embed_dim,
+            chunk_size if chunk_size is not None else settings.chunk_size,
+            chunk_overlap if chunk_overlap is not None else settings.chunk_overlap,
+            name,
+        ),
+    )
+    row = await cur.fetchone()
+    return await load_collection(cur, row["id"])
+
+
+async def activate_version(cur: psycopg.AsyncCursor, name: str, collection_id: int) -> None:
+    """Make ``collection_id`` the only active version of ``name`` in one statement."""
+    await cur.execute(
+        "UPDATE collections SET active = (id = %s) WHERE name = %s",
+        (collection_id, name),
+    )
+
+
+async def drop_inactive_versions(cur: psycopg.AsyncCursor, name: str) -> int:
+    """Mark the documents of every inactive version of ``name`` deleted.
+
+    The purger removes their chunks in batches and then the version rows, except
+    those referenced by ``eval_runs``, which are kept (empty) so eval history survives.
+    Returns the number of versions dropped by this call; kept versions whose documents
+    are already deleted are not counted again.
+    """
+    await cur.execute(
+        """
+        SELECT id FROM collections c
+        WHERE name = %s AND active = FALSE AND deleted_at IS NULL
+          AND (
+            NOT EXISTS (SELECT 1 FROM eval_runs er WHERE er.collection_id = c.id)
+            OR EXISTS (
+                SELECT 1 FROM documents d WHERE d.collection_id = c.id AND d.deleted_at IS NULL
+            )
+          )
+        """,
+        (name,),
+    )
+    stale = [row["id"] for row in await cur.fetchall()]
+    if not stale:
+        return 0
+    await cur.execute(
+        """
+        UPDATE documents SET deleted_at = NOW()
+        WHERE collection_id = ANY(%s) AND deleted_at IS NULL
+        """,
+        (stale,),
+    )
+    await cur.execute(
+        """
+        UPDATE collections c SET deleted_at = NOW()
+        WHERE c.id = ANY(%s)
+          AND NOT EXISTS (SELECT 1 FROM eval_runs er WHERE er.collection_id = c.id)
+        """,
+        (stale,),
+    )
+    return len(stale)
+
+
+async def reindex_collection(
+    name: str,
+    embed_model: str | None = None,
+    chunk_size: int | None = None,
+    chunk_overlap: int | None = None,
+    gc: bool = True,
+    bulk_load: bool = False,
+) -> ReindexResult:
+    settings = get_settings()
+    if name not in settings.corpora().collections:
+        raise ValueError(f"Unknown collection {name}")
+
+    async with db_connection(row_factory=rows.dict_row) as conn:
+        async with conn.cursor() as cur:
+            version = await create_version(cur, name, embed_model, chunk_size, chunk_overlap)
+        await conn.commit()
+    logger.info(
+        "Building version %d of collection %s (model=%s, chunk_size=%d, overlap=%d)",
+        version.version,
+        name,
+        version.embed_model,
+        version.chunk_size,
+        version.overlap,
+    )
+
+    summary = await ingest_collection(name, collection_id=version.id, bulk_load=bulk_load)
+    if summary.failed:
+        logger.error(
+            "Version %d of %s left inactive: %d files failed", version.version, name, summary.failed
+        )
+        return ReindexResult(name, version.version, activated=False, summary=summary)
+
+    async with db_connection(row_factory=rows.dict_row) as conn:
+        async with conn.cursor() as cur:
+            await activate_version(cur, name, version.id)
+        await conn.commit()
+    logger.info("Activated version %d of collection %s", version.version, name)
+
+    removed = 0
+    if gc:
+        async with db_connection(row_factory=rows.dict_row) as conn:
+            async with conn.cursor() as cur:
+                removed = await drop_inactive_versions(cur, name)
+            await conn.commit()
+        logger.info("Removed %d inactive versions of collection %s", removed, name)
+    return ReindexResult(
+        name, version.version, activated=True, summary=summary, removed_versions=removed
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Build and activate a new collection version")
+    parser.add_argument("--collection", required=True, help="Collection name to re-index")
+    parser.add_argument("--embed-model", help="Embedding model for the new version")
+    parser.add_argument("--chunk-size", type=int, help="Chunk size for the new version")
+    parser.add_argument("--chunk-overlap", type=int, help="Chunk overlap for the new version")
+    parser.add_argument(
+        "--keep-old", action="store_true", help="Do not delete the previous versions"
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Drop the vector index during the build and rebuild it at the end",
+    )
+    args = parser.parse_args()
+    result = await reindex_collection(
+        args.collection,
+        embed_model=args.embed_model,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        gc=not args.keep_old,
+        bulk_load=args.bulk,
+    )
+    print(result)
+    if not result.activated:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,440 @@
+"""Portable snapshots of a collection: documents, page text, chunks and embeddings.
+
+``nexus export <collection>`` writes the active version of a collection to a
+directory::
+
+    manifest.json     format, collection contract (embed model/dim, chunking), counts,
+                      SHA-256 of every other file
+    documents.jsonl   one document per line, ``ref`` is its id on the source node
+    pages.jsonl       prepared page text, by document ``ref`` and page number
+    chunks.jsonl      chunk metadata in the order of the embedding rows
+    embeddings.npy    float32 matrix, one row per chunk
+
+``nexus import <dir>`` checks the files against the manifest and the contract
+against this node's settings, loads everything with binary COPY into a new
+collection version and activates it like a re-index does. Source files and OCR
+output are not part of a snapshot: the replica must mount the corpora (and, to
+serve OCR'd files, the processed directory) at the same paths.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import pathlib
+import struct
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+
+import numpy as np
+import psycopg
+from numpy.lib.format import open_memmap
+from psycopg import rows
+
+from nexus.config import get_settings
+from nexus.db import db_connection
+from nexus.domain import models
+from nexus.ingest import bulk
+from nexus.ingest.pipeline import load_collection
+from nexus.ingest.reindex import activate_version, create_version, drop_inactive_versions
+from nexus.ollama_pool import model_key
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+DOCUMENTS = "documents.jsonl"
+PAGES = "pages.jsonl"
+CHUNKS = "chunks.jsonl"
+EMBEDDINGS = "embeddings.npy"
+DATA_FILES = (DOCUMENTS, PAGES, CHUNKS, EMBEDDINGS)
+
+DOCUMENT_COLUMNS = (
+    ("path", "text"),
+    ("source_sha256", "text"),
+    ("mtime", "int8"),
+    ("size", "int8"),
+    ("tags", "text[]"),
+    ("status", "text"),
+    ("ocr_applied", "bool"),
+    ("processed_path", "text"),
+    ("extracted_chars", "int4"),
+    ("empty_page_ratio", "float8"),
+    ("quality", "jsonb"),
+    ("text_version", "int4"),
+    ("error", "text"),
+)
+CHUNK_COLUMNS = (
+    ("page", "int4"),
+    ("chunk_index", "int4"),
+    ("content", "text"),  # only for chunks stored before the pages table
+    ("content_hash", "text"),
+    ("char_start", "int4"),
+    ("char_end", "int4"),
+    ("score_metadata", "jsonb"),
+)
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+@dataclass
+class Manifest:
+    collection: str
+    version: int
+    embed_model: str
+    embed_dim: int
+    chunk_size: int
+    overlap: int
+    documents: int = 0
+    pages: int = 0
+    chunks: int = 0
+    format: int = FORMAT_VERSION
+    created_at: str = ""
+    checksums: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def read(cls, directory: pathlib.Path) -> Manifest:
+        try:
+            data = json.loads((directory / MANIFEST).read_text(encoding="utf-8"))
+            return cls(**data)
+        except (OSError, ValueError, TypeError) as exc:
+            raise SnapshotError(f"Unreadable snapshot manifest in {directory}: {exc}") from exc
+
+    def write(self, directory: pathlib.Path) -> None:
+        (directory / MANIFEST).write_text(json.dumps(asdict(self), indent=2) + "\n")
+
+
+@dataclass
+class ImportResult:
+    collection: str
+    version: int
+    documents: int
+    pages: int
+    chunks: int
+    activated: bool
+    removed_versions: int = 0
+
+
+def encode_vector(values: np.ndarray) -> bytes:
+    """pgvector's binary wire format: int16 dim, int16 unused, big-endian float32s."""
+    return struct.pack(">hh", len(values), 0) + values.astype(">f4").tobytes()
+
+
+def decode_vector(data: bytes) -> np.ndarray:
+    (dim,) = struct.unpack_from(">h", data)
+    return np.frombuffer(data, dtype=">f4", count=dim, offset=4).astype(np.float32)
+
+
+def _sha256(path: pathlib.Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def check_contract(manifest: Manifest) -> None:
+    """Refuse snapshots whose embeddings this node cannot search."""
+    settings = get_settings()
+    if manifest.format != FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot format {manifest.format}")
+    if manifest.embed_dim != settings.embed_dim:
+        raise SnapshotError(
+            f"Snapshot embeddings have {manifest.embed_dim} dimensions, "
+            f"NEXUS_EMBED_DIM is {settings.embed_dim}"
+        )
+    if model_key(manifest.embed_model) != model_key(settings.embed_model):
+        raise SnapshotError(
+            f"Snapshot was embedded with {manifest.embed_model}, "
+            f"queries here use NEXUS_EMBED_MODEL={settings.embed_model}"
+        )
+
+
+def verify_files(directory: pathlib.Path, manifest: Manifest) -> np.ndarray:
+    """Check checksums and shapes; returns the embeddings, memory-mapped."""
+    for name in DATA_FILES:
+        path = directory / name
+        if not path.is_file():
+            raise SnapshotError(f"Snapshot is missing {name}")
+        if manifest.checksums.get(name) != _sha256(path):
+            raise SnapshotError(f"Checksum mismatch for {name}")
+    embeddings = np.load(directory / EMBEDDINGS, mmap_mode="r")
+    if embeddings.dtype != np.float32 or embeddings.shape != (manifest.chunks, manifest.embed_dim):
+        raise SnapshotError(
+            f"{EMBEDDINGS} holds {embeddings.dtype} {embeddings.shape}, "
+            f"expected float32 ({manifest.chunks}, {manifest.embed_dim})"
+        )
+    return embeddings
+
+
+def _jsonl(path: pathlib.Path):
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+async def _active_collection(cur: psycopg.AsyncCursor, name: str) -> models.Collection:
+    await cur.execute(
+        """
+        SELECT id FROM collections WHERE name = %s AND active = TRUE
+        ORDER BY version DESC LIMIT 1
+        """,
+        (name,),
+    )
+    row = await cur.fetchone()
+    if row is None:
+        raise SnapshotError(f"No active version of collection {name}")
+    return await load_collection(cur, row["id"])
+
+
+async def export_collection(name: str, directory: pathlib.Path) -> Manifest:
+    """Write the active version of ``name`` to ``directory``."""
+    directory.mkdir(parents=True, exist_ok=True)
+    async with db_connection(row_factory=rows.dict_row) as conn:
+        # One snapshot of the database for every file and count.
+        await conn.set_isolation_level(psycopg.IsolationLevel.REPEATABLE_READ)
+        async with conn.cursor() as cur:
+            contract = await _active_collection(cur, name)
+            manifest = Manifest(
+                collection=name,
+                version=contract.version,
+                embed_model=contract.embed_model,
+                embed_dim=contract.embed_dim,
+                chunk_size=contract.chunk_size,
+                overlap=contract.overlap,
+                created_at=datetime.now(timezone.utc).isoformat(),
+            )
+            columns = ", ".join(column for column, _ in DOCUMENT_COLUMNS)
+            with (directory / DOCUMENTS).open("w", encoding="utf-8") as out:
+                async with cur.copy(
+                    f"COPY (SELECT id, {columns} FROM documents WHERE collection_id = {contract.id}"
+                    " AND deleted_at IS NULL ORDER BY id) TO STDOUT (FORMAT BINARY)"
+                ) as copy:
+                    copy.set_types(["int4"] + [kind for _, kind in DOCUMENT_COLUMNS])
+                    async for row in copy.rows():
+                        record = dict(
+                            zip(["ref"] + [c for c, _ in DOCUMENT_COLUMNS], row, strict=True)
+                        )
+                        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                        manifest.documents += 1
+            with (directory / PAGES).open("w", encoding="utf-8") as out:
+                async with cur.copy(
+                    "COPY (SELECT p.document_id, p.page, p.text FROM pages p"
+                    " JOIN documents d ON d.id = p.document_id"
+                    f" WHERE d.collection_id = {contract.id} AND d.deleted_at IS NULL"
+                    " ORDER BY p.id)"
+                    " TO STDOUT (FORMAT BINARY)"
+                ) as copy:
+                    copy.set_types(["int4", "int4", "text"])
+                    async for ref, page, text in copy.rows():
+                        out.write(
+                            json.dumps({"document": ref, "page": page, "text": text}) + "\n"
+                        )
+                        manifest.pages += 1
+            chunk_filter = f"""
+                FROM chunks c JOIN documents d ON d.id = c.document_id
+                WHERE d.collection_id = {contract.id} AND d.deleted_at IS NULL
+                    AND c.embedding IS NOT NULL
+            """
+            await cur.execute(f"SELECT COUNT(*) AS n {chunk_filter}")
+            manifest.chunks = (await cur.fetchone())["n"]
+            embeddings = open_memmap(
+                directory / EMBEDDINGS,
+                mode="w+",
+                dtype=np.float32,
+                shape=(manifest.chunks, contract.embed_dim),
+            )
+            columns = ", ".join(f"c.{column}" for column, _ in CHUNK_COLUMNS)
+            with (directory / CHUNKS).open("w", encoding="utf-8") as out:
+                async with cur.copy(
+                    f"COPY (SELECT c.document_id, {columns}, vector_send(c.embedding)"
+                    f" {chunk_filter} ORDER BY c.id) TO STDOUT (FORMAT BINARY)"
+                ) as copy:
+                    copy.set_types(["int4"] + [kind for _, kind in CHUNK_COLUMNS] + ["bytea"])
+                    index = 0
+                    async for row in copy.rows():
+                        # The embedding (last column) goes to the .npy file instead.
+                        record = dict(
+                            zip(
+                                ["document"] + [c for c, _ in CHUNK_COLUMNS],
+                                row[:-1],
+                                strict=True,
+                            )
+                        )
+                        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                        embeddings[index] = decode_vector(row[-1])
+                        index += 1
+            embeddings.flush()
+            del embeddings
+        await conn.rollback()
+    manifest.checksums = {name: _sha256(directory / name) for name in DATA_FILES}
+    manifest.write(directory)
+    logger.info(
+        "Exported %s v%d: %d documents, %d pages, %d chunks to %s",
+        name,
+        manifest.version,
+        manifest.documents,
+        manifest.pages,
+        manifest.chunks,
+        directory,
+    )
+    return manifest
+
+
+async def _load(
+    cur: psycopg.AsyncCursor,
+    directory: pathlib.Path,
+    contract: models.Collection,
+    embeddings: np.ndarray,
+) -> tuple[int, int, int]:
+    columns = [column for column, _ in DOCUMENT_COLUMNS]
+    paths: dict[int, str] = {}
+    async with cur.copy(
+        f"COPY documents (collection_id, {', '.join(columns)}) FROM STDIN (FORMAT BINARY)"
+    ) as copy:
+        copy.set_types(["int4"] + [kind for _, kind in DOCUMENT_COLUMNS])
+        for record in _jsonl(directory / DOCUMENTS):
+            paths[record["ref"]] = record["path"]
+            await copy.write_row([contract.id] + [record[column] for column in columns])
+    await cur.execute(
+        "SELECT id, path FROM documents WHERE collection_id = %s", (contract.id,)
+    )
+    by_path = {row["path"]: row["id"] for row in await cur.fetchall()}
+    document_ids = {ref: by_path[path] for ref, path in paths.items()}
+
+    page_count = 0
+    async with cur.copy("COPY pages (document_id, page, text) FROM STDIN (FORMAT BINARY)") as copy:
+        copy.set_types(["int4", "int4", "text"])
+        for record in _jsonl(directory / PAGES):
+            await copy.write_row((document_ids[record["document"]], record["page"], record["text"]))
+            page_count += 1
+    await cur.execute(
+        """
+        SELECT p.id, p.document_id, p.page FROM pages p
+        JOIN documents d ON d.id = p.document_id WHERE d.collection_id = %s
+        """,
+        (contract.id,),
+    )
+    page_ids = {(row["document_id"], row["page"]): row["id"] for row in await cur.fetchall()}
+
+    columns = [column for column, _ in CHUNK_COLUMNS]
+    chunk_count = 0
+    async with cur.copy(
+        f"COPY chunks (document_id, page_id, {', '.join(columns)}, embedding)"
+        " FROM STDIN (FORMAT BINARY)"
+    ) as copy:
+        # pgvector reads its binary format as is; bytea passes the bytes through.
+        copy.set_types(["int4", "int8"] + [kind for _, kind in CHUNK_COLUMNS] + ["bytea"])
+        for index, record in enumerate(_jsonl(directory / CHUNKS)):
+            document_id = document_ids[record["document"]]
+            # Chunks that kept their own text do not point into pages.
+            page_id = None
+            if record["content"] is None:
+                page_id = page_ids[(document_id, record["page"])]
+            await copy.write_row(
+                [document_id, page_id]
+                + [record[column] for column in columns]
+                + [encode_vector(embeddings[index])]
+            )
+            chunk_count += 1
+    return len(document_ids), page_count, chunk_count
+
+
+async def import_collection(
+    directory: pathlib.Path,
+    name: str | None = None,
+    gc: bool = True,
+    bulk_load: bool = False,
+) -> ImportResult:
+    """Load a snapshot as a new version of ``name`` (default: the exported name).
+
+    The version is built inactive and activated once everything is loaded, so
+    search keeps serving the previous version meanwhile; ``gc`` then removes the
+    older versions. ``bulk_load`` drops the HNSW index for the load and rebuilds it
+    at the end (see ``nexus.ingest.bulk``).
+    """
+    manifest = Manifest.read(directory)
+    check_contract(manifest)
+    embeddings = verify_files(directory, manifest)
+    name = name or manifest.collection
+
+    if bulk_load:
+        await bulk.drop_vector_index()
+    try:
+        async with db_connection(row_factory=rows.dict_row) as conn:
+            async with conn.cursor() as cur:
+                contract = await create_version(
+                    cur, name, manifest.embed_model, manifest.chunk_size, manifest.overlap
+                )
+                counts = await _load(cur, directory, contract, embeddings)
+                if counts != (manifest.documents, manifest.pages, manifest.chunks):
+                    raise SnapshotError(
+                        f"Loaded {counts} documents/pages/chunks, manifest lists "
+                        f"{(manifest.documents, manifest.pages, manifest.chunks)}"
+                    )
+                await activate_version(cur, name, contract.id)
+                removed = await drop_inactive_versions(cur, name) if gc else 0
+            await conn.commit()
+    finally:
+        if bulk_load:
+            await bulk.rebuild_vector_index()
+    logger.info("Imported %s as version %d of %s", directory, contract.version, name)
+    return ImportResult(
+        collection=name,
+        version=contract.version,
+        documents=counts[0],
+        pages=counts[1],
+        chunks=counts[2],
+        activated=True,
+        removed_versions=removed,
+    )
+
+
+async def _run(args: argparse.Namespace) -> None:
+    if args.command == "export":
+        directory = args.output or pathlib.Path(f"{args.collection}-snapshot")
+        print(await export_collection(args.collection, directory))
+    else:
+        print(
+            await import_collection(
+                args.snapshot, args.collection, gc=not args.keep_old, bulk_load=args.bulk
+            )
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export and import collection snapshots")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Write a collection to a snapshot directory")
+    export.add_argument("collection", help="Collection to export (its active version)")
+    export.add_argument(
+        "-o", "--output", type=pathlib.Path, help="Directory (default: <collection>-snapshot)"
+    )
+    load = commands.add_parser("import", help="Load a snapshot directory as a new version")
+    load.add_argument("snapshot", type=pathlib.Path, help="Snapshot directory")
+    load.add_argument("--collection", help="Import under this name (default: exported name)")
+    load.add_argument(
+        "--keep-old", action="store_true", help="Do not delete the previous versions"
+    )
+    load.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Drop the vector index during the load and rebuild it at the end",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s"
+    )
+    try:
+        asyncio.run(_run(args))
+    except SnapshotError as exc:
+        raise SystemExit(f"error: {exc}") from None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Single-pass storage of uploaded documents.
+
+The request body is streamed to a part file under ``upload_dir/<collection>`` while
+its sha256 is computed, so the document is written once and never read back before
+ingest. The digest is checked against the collection's documents before the part
+file is moved into place (``<sha256>/<filename>``); duplicates are discarded and new
+files are queued for the ``nexus-worker`` processes and the API's own worker
+(``api_worker``). ``upload_dir/<collection>`` is also a root of the collection, so
+rescans and reindexes keep uploaded documents.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import pathlib
+import uuid
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+from psycopg import rows
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from nexus.config import get_settings
+from nexus.db import db_connection
+from nexus.ingest import discover, queue
+from nexus.ingest.pipeline import ensure_collection
+from nexus.resources import get_budget
+
+logger = logging.getLogger(__name__)
+
+PART_SUFFIX = ".part"
+
+
+class UploadError(ValueError):
+    pass
+
+
+class UploadTooLargeError(UploadError):
+    pass
+
+
+@dataclass
+class UploadResult:
+    status: str  # "queued" or "duplicate"
+    path: str
+    sha256: str
+    size: int
+    document_id: int | None = None
+
+
+def _safe_filename(filename: str | None) -> str:
+    name = pathlib.PurePath((filename or "").replace("\\", "/")).name
+    if not name or name.startswith(".") or not name.lower().endswith(".pdf"):
+        raise UploadError("Only .pdf files can be uploaded")
+    return name
+
+
+@dataclass
+class RawUpload:
+    """A request body that is the document itself (``Content-Type: application/pdf``)."""
+
+    filename: str | None
+    stream: AsyncIterator[bytes]
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self.stream.__aiter__()
+
+
+@dataclass
+class MultipartUpload:
+    """The ``file`` part of a ``multipart/form-data`` body, parsed as it streams in."""
+
+    content_type: str
+    stream: AsyncIterator[bytes]
+    field_name: str = "file"
+    filename: str | None = None
+    _data: list[bytes] = field(default_factory=list, repr=False)
+    _headers: dict[bytes, bytes] = field(default_factory=dict, repr=False)
+    _header: bytes = b""
+    _value: bytes = b""
+    _in_file: bool = False
+    _seen_file: bool = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header.lower()] = self._value
+        self._header = self._value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("latin-1")
+        self._in_file = name == self.field_name and not self._seen_file
+        if self._in_file:
+            self._seen_file = True
+            self.filename = options.get(b"filename", b"").decode("utf-8", "replace")
+        self._headers = {}
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self._data.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._in_file = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        _, options = parse_options_header(self.content_type)
+        boundary = options.get(b"boundary")
+        if not boundary:
+            raise UploadError("multipart/form-data body without boundary")
+        parser = MultipartParser(
+            boundary,
+            callbacks={
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+        async for chunk in self.stream:
+            parser.write(chunk)
+            for data in self._data:
+                yield data
+            self._data.clear()
+        parser.finalize()
+        if not self._seen_file:
+            raise UploadError(f"multipart body has no '{self.field_name}' part")
+
+
+async def _receive(
+    upload: RawUpload | MultipartUpload, part: pathlib.Path
+) -> tuple[str, int]:
+    """Write ``upload`` to ``part`` while hashing it; returns (sha256, size)."""
+    limit = get_settings().max_file_size_mb * 1024 * 1024
+    buffer_size = get_budget().io_buffer_bytes
+    digest = hashlib.sha256()
+    size = 0
+    buffer = bytearray()
+    with part.open("wb") as handle:
+        async for data in upload:
+            if not size:
+                # Multipart uploads name the file only once their part starts.
+                _safe_filename(upload.filename)
+            size += len(data)
+            if size > limit:
+                raise UploadTooLargeError(f"Upload exceeds {limit // (1024 * 1024)} MB")
+            digest.update(data)
+            buffer += data
+            if len(buffer) >= buffer_size:
+                await asyncio.to_thread(handle.write, bytes(buffer))
+                buffer.clear()
+        if buffer:
+            await asyncio.to_thread(handle.write, bytes(buffer))
+    return digest.hexdigest(), size
+
+
+async def store_upload(collection: str, upload: RawUpload | MultipartUpload) -> UploadResult:
+    """Store ``upload`` for ``collection`` and queue it unless its content is already there."""
+    root = discover.upload_root(collection)
+    root.mkdir(parents=True, exist_ok=True)
+    # Not a .pdf, so a rescan running meanwhile does not pick up half-written files.
+    part = root / f".{uuid.uuid4().hex}{PART_SUFFIX}"
+    try:
+        sha256, size = await _receive(upload, part)
+        if not size:
+            raise UploadError("Empty upload")
+        filename = _safe_filename(upload.filename)
+        async with db_connection(row_factory=rows.dict_row) as conn:
+            async with conn.cursor() as cur:
+                collection_id = await ensure_collection(cur, collection)
+                await cur.execute(
+                    """
+                    SELECT id, path FROM documents
+                    WHERE collection_id = %s AND source_sha256 = %s AND deleted_at IS NULL
+                    ORDER BY id LIMIT 1
+                    """,
+                    (collection_id, sha256),
+                )
+                existing = await cur.fetchone()
+                if existing:
+                    await conn.commit()
+                    logger.info("Upload to %s duplicates %s", collection, existing["path"])
+                    return UploadResult(
+                        "duplicate", existing["path"], sha256, size, existing["id"]
+                    )
+
+                target = root / sha256 / filename
+                target.parent.mkdir(exist_ok=True)
+                os.replace(part, target)
+                stat = target.stat()
+                file = discover.DiscoveredFile(
+                    path=target,
+                    root=root,
+                    relative_path=target.relative_to(root),
+                    sha256=sha256,
+                    mtime=int(stat.st_mtime),
+                    size=stat.st_size,
+                )
+                await queue.enqueue(cur, collection, collection_id, [file])
+            await conn.commit()
+    finally:
+        part.unlink(missing_ok=True)
+    logger.info("Stored upload %s (%d bytes) for %s", target, size, collection)
+    return UploadResult("queued", str(target), sha256, size)
@@ -0,0 +1,51 @@
+"""In-process metrics registry rendered in Prometheus text format."""
+from __future__ import annotations
+
+import threading
+
+_lock = threading.Lock()
+_counters: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+_gauges: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+
+
+def _key(name: str, labels: dict[str, str]) -> tuple[str, tuple[tuple[str, str], ...]]:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name: str, value: float = 1.0, **labels: str) -> None:
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + value
+
+
+def set_gauge(name: str, value: float, **labels: str) -> None:
+    with _lock:
+        _gauges[_key(name, labels)] = float(value)
+
+
+def get(name: str, **labels: str) -> float:
+    key = _key(name, labels)
+    with _lock:
+        return _counters.get(key, _gauges.get(key, 0.0))
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+
+
+def render() -> str:
+    lines: list[str] = []
+    with _lock:
+        series = [("counter", _counters), ("gauge", _gauges)]
+        for kind, values in series:
+            seen: set[str] = set()
+            for (name, labels), value in sorted(values.items()):
+                if name not in seen:
+                    lines.append(f"# TYPE {name} {kind}")
+                    seen.add(name)
+                label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+                series_name = f"{name}{{{label_str}}}" if label_str else name
+                lines.append(f"{series_name} {value:g}")
+    return "\n".join(lines) + "\n"
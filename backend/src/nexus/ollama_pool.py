@@ -0,0 +1,252 @@
+"""Pool of Ollama endpoints with health-aware, least-outstanding-requests routing.
+
+``ollama_urls`` lists the endpoints (``ollama_url`` alone is a pool of one). Each
+endpoint's models are read from ``/api/tags`` and refreshed every
+``ollama_models_refresh_seconds``; a request goes to the endpoint serving its model
+with the fewest requests in flight. After ``ollama_eject_after_failures``
+consecutive connection errors, timeouts or 5xx answers an endpoint is ejected and
+probed again with ``/api/tags`` every ``ollama_eject_seconds`` until it answers.
+Overload answers (429, 503) only mean the endpoint is busy and do not count. When
+every endpoint is ejected, requests are sent to all of them anyway (panic mode)
+rather than failed.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable
+
+import httpx
+
+from nexus import metrics
+from nexus.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+ClientFactory = Callable[[str], httpx.AsyncClient]
+PROBE_TIMEOUT = 5.0
+OVERLOAD_STATUSES = frozenset({429, 503})
+
+
+class NoEndpointAvailableError(RuntimeError):
+    pass
+
+
+def model_key(name: str) -> str:
+    """``llama3`` and ``llama3:latest`` name the same model."""
+    return name if ":" in name else f"{name}:latest"
+
+
+@dataclass(eq=False)
+class Endpoint:
+    url: str
+    client: httpx.AsyncClient = field(repr=False)
+    outstanding: int = 0
+    healthy: bool = True
+    failures: int = 0
+    ejected_at: float = 0.0
+    models: set[str] | None = None  # None until /api/tags answered
+    models_at: float = 0.0
+    tags: list[dict] = field(default_factory=list, repr=False)  # last /api/tags models
+
+    def serves(self, model: str | None) -> bool:
+        return model is None or self.models is None or model_key(model) in self.models
+
+
+def _default_client(url: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(base_url=url, timeout=get_settings().timeout_seconds)
+
+
+class OllamaPool:
+    def __init__(
+        self,
+        urls: list[str] | None = None,
+        client_factory: ClientFactory | None = None,
+        eject_after: int | None = None,
+        eject_seconds: float | None = None,
+        models_refresh_seconds: float | None = None,
+    ):
+        settings = get_settings()
+        urls = urls or settings.ollama_urls or [settings.ollama_url]
+        factory = client_factory or _default_client
+        self.endpoints = [Endpoint(url=url.rstrip("/"), client=factory(url)) for url in urls]
+        self.eject_after = eject_after or settings.ollama_eject_after_failures
+        self.eject_seconds = (
+            eject_seconds if eject_seconds is not None else settings.ollama_eject_seconds
+        )
+        self.models_refresh_seconds = (
+            models_refresh_seconds
+            if models_refresh_seconds is not None
+            else settings.ollama_models_refresh_seconds
+        )
+        self._probes: dict[Endpoint, asyncio.Task] = {}
+        for endpoint in self.endpoints:
+            self._publish(endpoint)
+
+    def _publish(self, endpoint: Endpoint) -> None:
+        metrics.set_gauge(
+            "nexus_ollama_endpoint_healthy", int(endpoint.healthy), endpoint=endpoint.url
+        )
+        metrics.set_gauge(
+            "nexus_ollama_endpoint_outstanding", endpoint.outstanding, endpoint=endpoint.url
+        )
+
+    async def probe(self, endpoint: Endpoint) -> bool:
+        """Read the endpoint's models; readmits an ejected endpoint that answers."""
+        try:
+            resp = await endpoint.client.get("/api/tags", timeout=PROBE_TIMEOUT)
+            resp.raise_for_status()
+            tags = resp.json().get("models", [])
+            names = [m["name"] for m in tags]
+        except (httpx.HTTPError, ValueError, KeyError) as exc:
+            logger.debug("Probe of Ollama endpoint %s failed: %s", endpoint.url, exc)
+            if endpoint.healthy:
+                endpoint.models_at = time.monotonic()
+                self._failed(endpoint, exc)
+            else:
+                endpoint.ejected_at = time.monotonic()
+            return False
+        endpoint.models = {model_key(name) for name in names}
+        endpoint.models_at = time.monotonic()
+        endpoint.tags = tags
+        self._readmit(endpoint)
+        return True
+
+    def _readmit(self, endpoint: Endpoint) -> None:
+        if not endpoint.healthy:
+            logger.info("Ollama endpoint %s is back", endpoint.url)
+            endpoint.healthy = True
+            endpoint.failures = 0
+            self._publish(endpoint)
+
+    def _schedule_probe(self, endpoint: Endpoint) -> None:
+        task = self._probes.get(endpoint)
+        if task is None or task.done():
+            self._probes[endpoint] = asyncio.create_task(self.probe(endpoint))
+
+    async def _candidates(self, model: str | None, avoid: set[Endpoint]) -> list[Endpoint]:
+        now = time.monotonic()
+        for endpoint in self.endpoints:
+            if not endpoint.healthy and now - endpoint.ejected_at >= self.eject_seconds:
+                self._schedule_probe(endpoint)
+            elif endpoint.healthy and now - endpoint.models_at >= self.models_refresh_seconds:
+                self._schedule_probe(endpoint)
+        # Model lists are needed for routing; wait for the first probe of each endpoint.
+        pending = [
+            task
+            for endpoint, task in self._probes.items()
+            if not endpoint.models_at and endpoint.healthy and not task.done()
+        ]
+        if pending:
+            await asyncio.wait(pending)
+        healthy = [e for e in self.endpoints if e.healthy]
+        if not healthy:
+            # Panic mode: a pool that ejected everything would otherwise fail every request.
+            metrics.inc("nexus_ollama_panic_total")
+            healthy = list(self.endpoints)
+        # No endpoint lists the model: let one of them answer (e.g. with "model not found").
+        serving = [e for e in healthy if e.serves(model)] or healthy
+        return [e for e in serving if e not in avoid] or serving
+
+    async def acquire(
+        self, model: str | None = None, avoid: set[Endpoint] | None = None
+    ) -> Endpoint:
+        """Least busy healthy endpoint serving ``model``, other than ``avoid`` if possible."""
+        candidates = await self._candidates(model, avoid or set())
+        if not candidates:
+            raise NoEndpointAvailableError(f"No Ollama endpoint for {model or 'request'}")
+        endpoint = min(candidates, key=lambda e: e.outstanding)
+        endpoint.outstanding += 1
+        self._publish(endpoint)
+        return endpoint
+
+    def release(self, endpoint: Endpoint, error: BaseException | None = None) -> None:
+        endpoint.outstanding -= 1
+        metrics.inc("nexus_ollama_requests_total", endpoint=endpoint.url)
+        if _is_endpoint_failure(error):
+            self._failed(endpoint, error)
+        elif error is None:
+            endpoint.failures = 0
+            # An ejected endpoint that answered a request in panic mode is back.
+            self._readmit(endpoint)
+        self._publish(endpoint)
+
+    def _failed(self, endpoint: Endpoint, error: BaseException) -> None:
+        endpoint.failures += 1
+        metrics.inc("nexus_ollama_request_failures_total", endpoint=endpoint.url)
+        if endpoint.healthy and endpoint.failures >= self.eject_after:
+            logger.warning(
+                "Ejecting Ollama endpoint %s after %d failures: %s",
+                endpoint.url,
+                endpoint.failures,
+                error,
+            )
+            endpoint.healthy = False
+            endpoint.ejected_at = time.monotonic()
+            metrics.inc("nexus_ollama_endpoint_ejections_total", endpoint=endpoint.url)
+            self._publish(endpoint)
+
+    @asynccontextmanager
+    async def endpoint(
+        self, model: str | None = None, avoid: set[Endpoint] | None = None
+    ) -> AsyncIterator[Endpoint]:
+        """Hold the least busy healthy endpoint serving ``model`` for one request."""
+        endpoint = await self.acquire(model, avoid)
+        try:
+            yield endpoint
+        except BaseException as exc:
+            self.release(endpoint, exc)
+            raise
+        self.release(endpoint)
+
+    async def list_models(self) -> list[dict]:
+        """Models of the endpoints answering ``/api/tags``, by name, with their URLs.
+
+        Raises ``NoEndpointAvailableError`` when no endpoint answers.
+        """
+        answered = await asyncio.gather(*(self.probe(e) for e in self.endpoints))
+        if not any(answered):
+            raise NoEndpointAvailableError("No Ollama endpoint answered /api/tags")
+        models: dict[str, dict] = {}
+        for endpoint, ok in zip(self.endpoints, answered, strict=True):
+            if not ok:
+                continue
+            for tag in endpoint.tags:
+                entry = models.setdefault(
+                    tag["name"],
+                    {
+                        "name": tag["name"],
+                        "size": tag.get("size", 0),
+                        "modified_at": tag.get("modified_at"),
+                        "endpoints": [],
+                    },
+                )
+                entry["endpoints"].append(endpoint.url)
+        return sorted(models.values(), key=lambda m: m["name"])
+
+
+def _is_endpoint_failure(error: BaseException | None) -> bool:
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 and status not in OVERLOAD_STATUSES
+    return False
+
+
+_pools: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, OllamaPool] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_pool() -> OllamaPool:
+    """The pool shared by every Ollama client on the current event loop."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = _pools[loop] = OllamaPool()
+    return pool
@@ -0,0 +1,158 @@
+"""Container-aware sizing of worker pools and batch sizes.
+
+Reads the cgroup CPU quota and memory limit (v2, falling back to v1) and derives
+defaults for settings left unset, so the same image sizes itself for a 4-core
+laptop and a 64-core server.
+"""
+from __future__ import annotations
+
+import os
+import pathlib
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+
+from nexus.config import get_settings
+
+CGROUP_ROOT = pathlib.Path("/sys/fs/cgroup")
+GIB = 1024**3
+
+# Rough peak memory per unit of work, used to keep pools inside the memory limit.
+EXTRACT_WORKER_BYTES = GIB // 2
+OCR_JOB_BYTES = 3 * GIB // 4
+INFLIGHT_DOCUMENT_BYTES = GIB
+
+
+@dataclass
+class ResourceLimits:
+    cpus: float
+    memory_bytes: int | None
+    source: str
+
+
+@dataclass
+class ResourceBudget:
+    cpus: float
+    memory_bytes: int | None
+    source: str
+    extract_workers: int
+    ocr_jobs: int
+    embed_batch_size: int
+    inflight_documents: int
+    page_range_workers: int
+    io_buffer_bytes: int
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _read(path: pathlib.Path) -> str | None:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def read_cpu_quota(root: pathlib.Path = CGROUP_ROOT) -> float | None:
+    """CPU quota in cores, or ``None`` when the cgroup is unlimited."""
+    cpu_max = _read(root / "cpu.max")
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+    quota_v1 = _read(root / "cpu" / "cpu.cfs_quota_us") or _read(root / "cpu.cfs_quota_us")
+    period_v1 = _read(root / "cpu" / "cpu.cfs_period_us") or _read(root / "cpu.cfs_period_us")
+    if quota_v1 and period_v1 and int(quota_v1) > 0:
+        return int(quota_v1) / int(period_v1)
+    return None
+
+
+def read_memory_limit(root: pathlib.Path = CGROUP_ROOT) -> int | None:
+    """Memory limit in bytes, or ``None`` when the cgroup is unlimited."""
+    mem_max = _read(root / "memory.max")
+    if mem_max:
+        return None if mem_max == "max" else int(mem_max)
+    limit_v1 = _read(root / "memory" / "memory.limit_in_bytes") or _read(
+        root / "memory.limit_in_bytes"
+    )
+    # cgroup v1 reports "unlimited" as a huge page-aligned number.
+    if limit_v1 and int(limit_v1) < 2**60:
+        return int(limit_v1)
+    return None
+
+
+def _host_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _host_memory() -> int | None:
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def detect_limits(root: pathlib.Path = CGROUP_ROOT) -> ResourceLimits:
+    host_cpus = _host_cpus()
+    quota = read_cpu_quota(root)
+    memory = read_memory_limit(root)
+    source = "cgroup" if quota is not None or memory is not None else "host"
+    host_memory = _host_memory()
+    if memory is None:
+        memory = host_memory
+    elif host_memory is not None:
+        memory = min(memory, host_memory)
+    cpus = min(float(host_cpus), quota) if quota is not None else float(host_cpus)
+    return ResourceLimits(cpus=cpus, memory_bytes=memory, source=source)
+
+
+def _fit(by_cpu: int, memory: int | None, per_unit: int) -> int:
+    if memory is None:
+        return max(1, by_cpu)
+    return max(1, min(by_cpu, memory // per_unit))
+
+
+def derive_budget(limits: ResourceLimits) -> ResourceBudget:
+    """Defaults for the pool and batch settings; explicit settings take precedence."""
+    settings = get_settings()
+    cores = max(1, int(limits.cpus))
+    memory = limits.memory_bytes
+    if memory is None or memory >= 8 * GIB:
+        batch = 32
+    elif memory >= 2 * GIB:
+        batch = 16
+    else:
+        batch = 8
+
+    def pick(explicit: int | None, derived: int) -> int:
+        return explicit if explicit is not None else derived
+
+    # Giant documents fan out over page ranges; each range runs its own ocrmypdf,
+    # so the cores are shared between range workers and per-process OCR jobs.
+    range_workers = pick(
+        settings.page_range_workers, _fit(max(1, cores // 4), memory, OCR_JOB_BYTES)
+    )
+    memory_per_range = memory // range_workers if memory is not None else None
+    return ResourceBudget(
+        cpus=limits.cpus,
+        memory_bytes=memory,
+        source=limits.source,
+        extract_workers=pick(settings.extract_workers, _fit(cores, memory, EXTRACT_WORKER_BYTES)),
+        ocr_jobs=pick(
+            settings.ocr_jobs, _fit(max(1, cores // range_workers), memory_per_range, OCR_JOB_BYTES)
+        ),
+        embed_batch_size=pick(settings.embed_batch_size, batch),
+        inflight_documents=pick(
+            settings.inflight_documents, _fit(max(1, cores // 2), memory, INFLIGHT_DOCUMENT_BYTES)
+        ),
+        page_range_workers=range_workers,
+        io_buffer_bytes=1024 * 1024 if memory is None or memory >= 2 * GIB else 64 * 1024,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_budget() -> ResourceBudget:
+    return derive_budget(detect_limits())
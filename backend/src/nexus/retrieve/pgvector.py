@@ -11,6 +11,23 @@ from nexus.db import db_connection
 from nexus.domain.interfaces import RetrievedChunk
 
 
+async def collection_models(collections: list[str]) -> dict[str, list[str]]:
+    """Names of the active versions of ``collections``, grouped by their embedding model."""
+    if not collections:
+        return {}
+    async with db_connection(row_factory=rows.dict_row) as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT embed_model, array_agg(name ORDER BY name) AS names
+                FROM collections WHERE name = ANY(%s) AND active = TRUE
+                GROUP BY embed_model ORDER BY embed_model
+                """,
+                (collections,),
+            )
+            return {row["embed_model"]: row["names"] for row in await cur.fetchall()}
+
+
 async def search_chunks(
     query_embedding: list[float],
     collections: list[str],
@@ -23,36 +40,55 @@ async def search_chunks(
 
     settings = get_settings()
     placeholders = ", ".join(["%s"] * len(collections))
-    tag_filter = ""
     params: list = list(collections)
-    score_filter = "AND similarity >= %s" if min_score is not None else ""
+    score_filter = "WHERE top.similarity >= %s" if min_score is not None else ""
+    # Rank on the vectors alone, then read the text of the top_k rows only: chunks
+    # written since the pages table point into their page's text by offsets.
     sql = f"""
     WITH collection_ids AS (
         SELECT id, embed_dim FROM collections WHERE name IN ({placeholders}) AND active = TRUE
+    ),
+    top AS (
+        SELECT
+            c.id AS chunk_id,
+            d.id AS document_id,
+            d.path,
+            c.page,
+            c.page_id,
+            c.char_start,
+            c.char_end,
+            1 - (c.embedding <=> %s::vector) AS similarity
+        FROM chunks c
+        JOIN documents d ON d.id = c.document_id
+        JOIN collection_ids col ON col.id = d.collection_id
+        WHERE col.embed_dim = %s AND d.deleted_at IS NULL
+        {"AND d.tags && %s" if tags else ""}
+        ORDER BY similarity DESC
+        LIMIT %s
     )
     SELECT
-        c.id AS chunk_id,
-        d.id AS document_id,
-        d.path,
-        c.page,
-        1 - (c.embedding <=> %s::vector) AS similarity,
-        c.content
-    FROM chunks c
-    JOIN documents d ON d.id = c.document_id
-    JOIN collection_ids col ON col.id = d.collection_id
-    WHERE col.embed_dim = %s
-    {"AND d.tags && %s" if tags else ""}
+        top.chunk_id,
+        top.document_id,
+        top.path,
+        top.page,
+        top.similarity,
+        top.char_start,
+        top.char_end,
+        COALESCE(c.content, substr(p.text, top.char_start + 1, top.char_end - top.char_start))
+            AS content
+    FROM top
+    JOIN chunks c ON c.id = top.chunk_id
+    LEFT JOIN pages p ON p.id = top.page_id
     {score_filter}
-    ORDER BY similarity DESC
-    LIMIT %s;
+    ORDER BY top.similarity DESC;
     """
     params.append(query_embedding)
     params.append(settings.embed_dim)
     if tags:
         params.append(tags)
+    params.append(top_k)
     if min_score is not None:
         params.append(min_score)
-    params.append(top_k)
 
     async with db_connection(row_factory=rows.dict_row) as conn:
         async with conn.cursor() as cur:
@@ -67,6 +103,8 @@ async def search_chunks(
                         page=row["page"],
                         score=float(row["similarity"]),
                         content=row["content"],
+                        char_start=row["char_start"],
+                        char_end=row["char_end"],
                     )
                 )
             return results
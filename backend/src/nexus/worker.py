@@ -0,0 +1,190 @@
+"""Distributed ingest worker (``nexus-worker``).
+
+Claims files from the Postgres ingest queue and runs them through the regular
+ingest pipeline. Run it on any number of nodes that mount the corpora at the
+same paths as the node that enqueued them; items are leased with ``FOR UPDATE
+SKIP LOCKED`` so workers never pick up the same file twice.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+from dataclasses import dataclass
+
+from psycopg import rows
+
+from nexus import metrics
+from nexus.config import CollectionConfig, get_settings
+from nexus.db import db_connection, ensure_schema
+from nexus.domain import models
+from nexus.embed.adaptive import AdaptiveEmbedder
+from nexus.ingest import pipeline, queue
+from nexus.resources import get_budget
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class _CollectionContext:
+    cfg: CollectionConfig
+    contract: models.Collection
+    embedder: AdaptiveEmbedder
+
+
+class IngestWorker:
+    def __init__(self, worker_id: str | None = None, concurrency: int | None = None):
+        settings = get_settings()
+        self.settings = settings
+        self.worker_id = worker_id or default_worker_id()
+        self.concurrency = (
+            concurrency or settings.worker_concurrency or get_budget().inflight_documents
+        )
+        self.active: dict[int, asyncio.Task] = {}
+        self._contexts: dict[int, _CollectionContext] = {}
+        self._embedders: dict[str, AdaptiveEmbedder] = {}
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """Stop claiming new items; items in flight are finished first."""
+        logger.info("Worker %s stopping after %d in-flight items", self.worker_id, len(self.active))
+        self._stopping.set()
+
+    async def _context(self, item: queue.QueueItem) -> _CollectionContext:
+        ctx = self._contexts.get(item.collection_id)
+        if ctx is None:
+            async with db_connection(row_factory=rows.dict_row) as conn:
+                async with conn.cursor() as cur:
+                    contract = await pipeline.load_collection(cur, item.collection_id)
+                await conn.commit()
+            embedder = self._embedders.get(contract.embed_model)
+            if embedder is None:
+                embedder = AdaptiveEmbedder(model=contract.embed_model)
+                self._embedders[contract.embed_model] = embedder
+            ctx = _CollectionContext(
+                cfg=pipeline.collection_config(item.collection),
+                contract=contract,
+                embedder=embedder,
+            )
+            self._contexts[item.collection_id] = ctx
+        return ctx
+
+    async def _process(self, item: queue.QueueItem) -> None:
+        try:
+            ctx = await self._context(item)
+            outcome = await pipeline.ingest_file(
+                item.to_file(), item.collection, ctx.cfg, ctx.contract, ctx.embedder
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Failed to ingest %s: %s", item.path, exc)
+            async with db_connection(row_factory=rows.dict_row) as conn:
+                async with conn.cursor() as cur:
+                    await queue.fail(cur, self.worker_id, item.id, str(exc))
+                await conn.commit()
+            metrics.inc("nexus_worker_items_total", outcome="failed")
+        else:
+            async with db_connection(row_factory=rows.dict_row) as conn:
+                async with conn.cursor() as cur:
+                    if not await queue.complete(cur, self.worker_id, item.id):
+                        logger.warning("Lease on %s was lost before it completed", item.path)
+                await conn.commit()
+            metrics.inc("nexus_worker_items_total", outcome=outcome)
+        finally:
+            self.active.pop(item.id, None)
+
+    async def _heartbeat(self) -> None:
+        interval = max(1.0, self.settings.queue_lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            if not self.active:
+                continue
+            try:
+                async with db_connection(row_factory=rows.dict_row) as conn:
+                    async with conn.cursor() as cur:
+                        await queue.heartbeat(cur, self.worker_id, list(self.active))
+                    await conn.commit()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Heartbeat failed: %s", exc)
+
+    async def poll(self) -> int:
+        """Re-queue expired leases and claim work for the free slots; returns items claimed."""
+        free = self.concurrency - len(self.active)
+        async with db_connection(row_factory=rows.dict_row) as conn:
+            async with conn.cursor() as cur:
+                requeued = await queue.requeue_expired(cur)
+                items = await queue.claim(cur, self.worker_id, free) if free > 0 else []
+                depth = await queue.queue_depth(cur)
+            await conn.commit()
+        if requeued:
+            logger.info("Re-queued %d items with expired leases", requeued)
+        metrics.set_gauge("nexus_worker_queue_depth", depth.get("queued", 0))
+        for item in items:
+            logger.info("Claimed %s (attempt %d)", item.path, item.attempts)
+            self.active[item.id] = asyncio.create_task(self._process(item))
+        return len(items)
+
+    async def serve(self) -> None:
+        """``run`` until stopped, starting over after errors such as a database restart."""
+        while not self._stopping.is_set():
+            try:
+                await self.run()
+            except Exception as exc:  # noqa: BLE001
+                delay = self.settings.queue_poll_seconds
+                logger.warning(
+                    "Worker %s failed, restarting in %.0fs: %s", self.worker_id, delay, exc
+                )
+                await asyncio.sleep(delay)
+
+    async def run(self, once: bool = False) -> None:
+        """Process queue items until stopped; with ``once``, exit when the queue is drained."""
+        logger.info("Worker %s started with concurrency %d", self.worker_id, self.concurrency)
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            while not self._stopping.is_set():
+                claimed = await self.poll()
+                if once and not claimed and not self.active:
+                    break
+                if claimed and len(self.active) < self.concurrency:
+                    continue
+                stopping = asyncio.create_task(self._stopping.wait())
+                await asyncio.wait(
+                    {stopping, *self.active.values()},
+                    timeout=self.settings.queue_poll_seconds,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                stopping.cancel()
+            await asyncio.gather(*self.active.values(), return_exceptions=True)
+        finally:
+            heartbeat.cancel()
+
+
+async def _run(args: argparse.Namespace) -> None:
+    await ensure_schema()
+    worker = IngestWorker(worker_id=args.worker_id, concurrency=args.concurrency)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run(once=args.once)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Claim and ingest files from the ingest queue")
+    parser.add_argument("--worker-id", help="Lease owner name (default: host:pid)")
+    parser.add_argument("--concurrency", type=int, help="Documents processed at once")
+    parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s"
+    )
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
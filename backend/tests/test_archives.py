@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import pathlib
+import tarfile
+import zipfile
+
+import pytest
+from pypdf import PdfWriter
+
+from nexus.config import CollectionConfig, Settings
+from nexus.ingest import archives, discover, ocr, pdf_extract_pypdf, pipeline
+
+
+def _pdf(pages: int) -> bytes:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=72, height=72)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    settings = Settings(processed_dir=tmp_path / "processed")
+    monkeypatch.setattr(discover, "get_settings", lambda: settings)
+    monkeypatch.setattr(ocr, "get_settings", lambda: settings)
+    root = tmp_path / "library"
+    root.mkdir()
+    one, two = _pdf(1), _pdf(2)
+    with zipfile.ZipFile(root / "drop.zip", "w") as zf:
+        zf.writestr("reports/deflated.pdf", one, compress_type=zipfile.ZIP_DEFLATED)
+        zf.writestr("stored.pdf", two, compress_type=zipfile.ZIP_STORED)
+        zf.writestr("readme.txt", "not a pdf")
+    with tarfile.open(root / "drop.tar.gz", "w:gz") as tf:
+        info = tarfile.TarInfo("./nested/a.pdf")
+        info.size = len(two)
+        tf.addfile(info, io.BytesIO(two))
+    return root, {"one": one, "two": two}
+
+
+def test_split_member_paths():
+    assert archives.split("/c/drop.zip!/a/b.pdf") == (pathlib.Path("/c/drop.zip"), "a/b.pdf")
+    assert archives.split("/c/plain.pdf") is None
+    assert archives.split("/c/notes!/b.pdf") is None
+
+
+def test_discovery_hashes_archive_members(corpus):
+    root, data = corpus
+    files = discover.walk_collection(CollectionConfig(roots=[str(root)], include=["**/*.pdf"]))
+    by_path = {str(f.path): f for f in files}
+    assert sorted(by_path) == [
+        f"{root}/drop.tar.gz!/nested/a.pdf",
+        f"{root}/drop.zip!/reports/deflated.pdf",
+        f"{root}/drop.zip!/stored.pdf",
+    ]
+    member = by_path[f"{root}/drop.zip!/reports/deflated.pdf"]
+    assert member.sha256 == hashlib.sha256(data["one"]).hexdigest()
+    assert member.size == len(data["one"])
+    assert str(member.relative_path) == "drop.zip!/reports/deflated.pdf"
+
+
+def test_pypdf_reads_members_in_place(corpus):
+    root, data = corpus
+    assert pdf_extract_pypdf.page_count(f"{root}/drop.zip!/stored.pdf") == 2
+    assert pdf_extract_pypdf.page_count(f"{root}/drop.zip!/reports/deflated.pdf") == 1
+    pages = pdf_extract_pypdf.extract_text(f"{root}/drop.tar.gz!/nested/a.pdf")
+    assert [p.page for p in pages] == [1, 2]
+
+
+def test_members_stream_back_byte_for_byte(corpus):
+    root, data = corpus
+    path = f"{root}/drop.tar.gz!/nested/a.pdf"
+    assert archives.exists(path)
+    assert not archives.exists(f"{root}/drop.zip!/missing.pdf")
+    assert b"".join(archives.iter_bytes(path, buffer_size=100)) == data["two"]
+
+
+def test_processed_path_of_member_is_a_plain_file(corpus):
+    root, _ = corpus
+    dest = ocr.processed_path_for(
+        pathlib.Path(f"{root}/drop.zip!/reports/deflated.pdf"), "library", root
+    )
+    assert dest.parts[-3:] == ("drop.zip", "reports", "deflated.pdf")
+    assert not archives.is_member(dest)
+
+
+def test_members_that_escape_the_archive_are_skipped(corpus, caplog):
+    root, data = corpus
+    with zipfile.ZipFile(root / "evil.zip", "w") as zf:
+        zf.writestr("../../../../tmp/evil.pdf", data["one"])
+        zf.writestr("/etc/evil.pdf", data["one"])
+        zf.writestr("ok.pdf", data["one"])
+    with tarfile.open(root / "evil.tar", "w") as tf:
+        info = tarfile.TarInfo("a/../../evil.pdf")
+        info.size = len(data["one"])
+        tf.addfile(info, io.BytesIO(data["one"]))
+    names = [m.name for m in archives.iter_members(root / "evil.zip", 1 << 20)]
+    assert names == ["ok.pdf"]
+    assert list(archives.iter_members(root / "evil.tar", 1 << 20)) == []
+    assert "unsafe name" in caplog.text
+
+
+def test_processed_path_never_leaves_the_processed_directory(corpus):
+    root, _ = corpus
+    with pytest.raises(ocr.OCRError):
+        ocr.processed_path_for(
+            pathlib.Path(f"{root}/drop.zip!/../../../../tmp/evil.pdf"), "library", root
+        )
+
+
+def test_compressed_tar_members_are_copied_out_once(corpus, tmp_path):
+    root, data = corpus
+    path = f"{root}/drop.tar.gz!/nested/a.pdf"
+    assert archives.is_compressed_tar_member(path)
+    assert not archives.is_compressed_tar_member(f"{root}/drop.zip!/stored.pdf")
+    assert not archives.is_compressed_tar_member(f"{root}/drop.tar.gz")
+    copy = tmp_path / "copy.pdf"
+    with copy.open("wb") as dest:
+        archives.copy_member(path, dest)
+    assert copy.read_bytes() == data["two"]
+
+
+@pytest.mark.asyncio
+async def test_ingest_reads_compressed_tar_members_from_one_copy(corpus, monkeypatch):
+    root, data = corpus
+    settings = Settings(processed_dir=root.parent / "processed")
+    monkeypatch.setattr(pipeline, "get_settings", lambda: settings)
+    seen = {}
+
+    async def process_source(file, source, *args):
+        seen[source] = pathlib.Path(source).read_bytes()
+        return "processed"
+
+    monkeypatch.setattr(pipeline, "_process_source", process_source)
+    path = pathlib.Path(f"{root}/drop.tar.gz!/nested/a.pdf")
+    file = discover.DiscoveredFile(path, root, path.relative_to(root), "sha", 0, len(data["two"]))
+    assert await pipeline._process_document(file, "library", None, None, None) == "processed"
+    [(source, content)] = seen.items()
+    assert content == data["two"]
+    assert not pathlib.Path(source).exists()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from nexus.ingest import boilerplate
+from nexus.ingest.pdf_extract_pypdf import PageText
+
+WORDS = "zero one two three four five six seven eight nine ten eleven twelve".split()
+
+
+def _book(pages: int = 10) -> list[PageText]:
+    return [
+        PageText(
+            n,
+            f"A History of Things\nOpening line {WORDS[n]}.\n"
+            f"Middle of page {WORDS[n + 1]}.\nClosing remark {WORDS[n + 2]}.\n{n}",
+        )
+        for n in range(1, pages + 1)
+    ]
+
+
+def test_line_signature_folds_page_numbers():
+    signature = boilerplate.line_signature("Page 12 of 300")
+    assert signature == boilerplate.line_signature("p. 7 / 300") == "page #"
+    assert boilerplate.line_signature("Civil") == "civil"
+
+
+def test_roman_page_numbers_are_bare_lowercase_numerals():
+    assert boilerplate.roman_page_number("xiv") == 14
+    assert boilerplate.roman_page_number("- iv -") == 4
+    assert boilerplate.roman_page_number("I.") is None
+    assert boilerplate.roman_page_number("civil") is None
+    assert boilerplate.roman_page_number("mmmdcccxviii") is None
+
+
+def test_roman_page_numbers_in_sequence_are_stripped():
+    numerals = ["i", "ii", "iii", "iv", "v", "vi", "vii", "viii"]
+    pages = [
+        PageText(n, f"Preface\nFirst {WORDS[n]}.\nSecond {WORDS[n]}.\nThird {WORDS[n]}.\n{num}")
+        for n, num in enumerate(numerals, start=1)
+    ]
+    stripped, report = boilerplate.strip_repeated_lines(pages)
+    assert stripped[3].text == "First four.\nSecond four.\nThird four."
+    assert {p["pattern"]: p["pages"] for p in report.patterns}["#"] == 8
+
+
+def test_words_that_spell_roman_numerals_are_kept():
+    edges = ["I.", "mix", "mi", "di", "cd", "i", "MIX", "lid"]
+    pages = [
+        PageText(n, f"{edge}\nFirst {WORDS[n]}.\nSecond {WORDS[n]}.\nThird {WORDS[n]}.\n{n}")
+        for n, edge in enumerate(edges, start=1)
+    ]
+    stripped, _ = boilerplate.strip_repeated_lines(pages)
+    assert [page.text.split("\n")[0] for page in stripped] == edges
+
+
+def test_strips_running_headers_and_page_numbers():
+    pages, report = boilerplate.strip_repeated_lines(_book())
+    assert pages[2].text == "Opening line three.\nMiddle of page four.\nClosing remark five."
+    patterns = {p["pattern"]: p["pages"] for p in report.patterns}
+    assert patterns == {"a history of things": 10, "#": 10}
+    assert report.lines_removed == 20
+
+
+def test_repeated_lines_in_the_page_body_are_kept():
+    pages = [
+        PageText(n, f"Header\nintro {n}\nb {n}\nRepeated body line\nc {n}\nd {n}\ne {n}")
+        for n in range(1, 9)
+    ]
+    stripped, _ = boilerplate.strip_repeated_lines(pages)
+    assert "Repeated body line" in stripped[0].text
+    assert not stripped[0].text.startswith("Header")
+
+
+def test_short_documents_are_left_alone():
+    pages, report = boilerplate.strip_repeated_lines(_book(2))
+    assert pages == _book(2)
+    assert report.patterns == []
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from nexus.domain import models
+from nexus.ingest import bulk, pipeline
+
+
+def test_vector_literal_matches_pgvector_text_format():
+    assert bulk.vector_literal([1, 0.5, -2.25]) == "[1.0,0.5,-2.25]"
+
+
+@pytest.mark.asyncio
+async def test_insert_chunks_copies_rows_in_bulk_mode():
+    written = []
+    statements = []
+
+    class Copy:
+        async def write_row(self, row):
+            written.append(row)
+
+    @asynccontextmanager
+    async def copy(statement):
+        statements.append(statement)
+        yield Copy()
+
+    cur = MagicMock()
+    cur.execute = AsyncMock()
+    cur.fetchall = AsyncMock(return_value=[{"id": 70, "page": 1}])
+    cur.copy = copy
+    chunk = pipeline.ChunkRecord(
+        page=1,
+        chunk_index=0,
+        content="text",
+        content_hash="h",
+        embedding=[0.1, 0.2],
+        char_start=0,
+        char_end=4,
+    )
+    page = pipeline.pdf_extract_pypdf.PageText(page=1, text="text")
+    await pipeline._insert_chunks(cur, 9, [page], [chunk], copy=True)
+
+    executed = [call.args[0] for call in cur.execute.await_args_list]
+    assert "DELETE FROM chunks" in executed[0]
+    assert "DELETE FROM pages" in executed[1]
+    assert "INSERT INTO pages" in executed[2]
+    assert cur.execute.await_args_list[2].args[1] == (9, [1], ["text"])
+    assert statements[0].startswith("COPY chunks")
+    # The chunk points into the stored page instead of carrying its own text.
+    assert written == [(9, 1, 0, 70, "h", "[0.1,0.2]", 0, 4)]
+
+
+@pytest.mark.asyncio
+async def test_blank_pages_get_no_chunks():
+    contract = models.Collection(
+        id=1, name="library", version=1, embed_model="m", embed_dim=2, chunk_size=50, overlap=0
+    )
+    pages = [
+        pipeline.pdf_extract_pypdf.PageText(page=1, text=""),
+        pipeline.pdf_extract_pypdf.PageText(page=2, text=" \n\t"),
+        pipeline.pdf_extract_pypdf.PageText(page=3, text="text"),
+    ]
+    spans = pipeline._chunk_spans(pages, contract)
+    assert [(page.page, start, end) for page, start, end in spans] == [(3, 0, 4)]
+
+    cur = MagicMock()
+    cur.execute = AsyncMock()
+    cur.fetchall = AsyncMock(return_value=[{"id": 71, "page": 2}, {"id": 72, "page": 3}])
+    chunks = [
+        pipeline.ChunkRecord(
+            page=page.page,
+            chunk_index=0,
+            content=page.text[start:end],
+            content_hash="h",
+            embedding=[0.1, 0.2],
+            char_start=start,
+            char_end=end,
+        )
+        for page, start, end in spans
+    ]
+    await pipeline._insert_chunks(cur, 9, pages, chunks)
+
+    # The empty page has no pages row; no chunk may point at it.
+    assert cur.execute.await_args_list[2].args[1] == (9, [2, 3], [" \n\t", "text"])
+    assert cur.execute.await_args_list[3].args[1][3] == 72
+
+
+@pytest.mark.asyncio
+async def test_bulk_ingest_rebuilds_index_even_when_the_load_fails(monkeypatch):
+    calls = []
+
+    @asynccontextmanager
+    async def connection(row_factory=None):
+        conn = MagicMock()
+        conn.commit = AsyncMock()
+
+        @asynccontextmanager
+        async def cursor():
+            yield AsyncMock()
+
+        conn.cursor = cursor
+        yield conn
+
+    async def run_files(*args):
+        calls.append("load")
+        raise RuntimeError("ollama down")
+
+    monkeypatch.setattr(pipeline, "db_connection", connection)
+    monkeypatch.setattr(pipeline, "collection_config", MagicMock())
+    monkeypatch.setattr(pipeline.discover, "walk_collection", MagicMock(return_value=[]))
+    monkeypatch.setattr(pipeline, "load_collection", AsyncMock(return_value=MagicMock()))
+    monkeypatch.setattr(pipeline, "AdaptiveEmbedder", MagicMock())
+    monkeypatch.setattr(pipeline, "_run_files", run_files)
+    monkeypatch.setattr(
+        bulk, "drop_vector_index", AsyncMock(side_effect=lambda: calls.append("drop"))
+    )
+    monkeypatch.setattr(
+        bulk, "rebuild_vector_index", AsyncMock(side_effect=lambda: calls.append("rebuild"))
+    )
+
+    with pytest.raises(RuntimeError):
+        await pipeline._ingest_collection("test", 1, bulk_load=True)
+    assert calls == ["drop", "load", "rebuild"]
@@ -14,3 +14,9 @@ def test_chunking_longer_text_splits():
     text = "a" * 1000
     chunks = chunk_text(text, page=1)
     assert len(chunks) > 1
+
+
+def test_chunking_uses_explicit_parameters():
+    text = "a" * 1000
+    chunks = chunk_text(text, page=1, chunk_size=300, overlap=0)
+    assert [len(content) for _, content, _ in chunks] == [300, 300, 300, 100]
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from pypdf import PdfWriter
+from pypdf.generic import (
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+    NumberObject,
+)
+
+from nexus.ingest import classify
+
+WIDTH, HEIGHT = 612, 792
+
+
+def _stream(writer: PdfWriter, data: bytes, **entries) -> object:
+    stream = DecodedStreamObject()
+    stream.set_data(data)
+    for key, value in entries.items():
+        stream[NameObject(f"/{key}")] = value
+    return writer._add_object(stream)
+
+
+def _add_text_page(writer: PdfWriter) -> None:
+    page = writer.add_blank_page(width=WIDTH, height=HEIGHT)
+    font = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+        }
+    )
+    page[NameObject("/Resources")] = DictionaryObject(
+        {NameObject("/Font"): DictionaryObject({NameObject("/F1"): writer._add_object(font)})}
+    )
+    page[NameObject("/Contents")] = _stream(
+        writer, b"BT /F1 12 Tf 72 720 Td (Hello world) Tj ET"
+    )
+
+
+def _add_image_page(writer: PdfWriter, scale: float = 1.0) -> None:
+    page = writer.add_blank_page(width=WIDTH, height=HEIGHT)
+    image = _stream(
+        writer,
+        b"\x80",
+        Type=NameObject("/XObject"),
+        Subtype=NameObject("/Image"),
+        Width=NumberObject(1),
+        Height=NumberObject(1),
+        ColorSpace=NameObject("/DeviceGray"),
+        BitsPerComponent=NumberObject(8),
+    )
+    page[NameObject("/Resources")] = DictionaryObject(
+        {NameObject("/XObject"): DictionaryObject({NameObject("/Im0"): image})}
+    )
+    w, h = WIDTH * scale, HEIGHT * scale
+    page[NameObject("/Contents")] = _stream(
+        writer, f"q {w:.0f} 0 0 {h:.0f} 0 0 cm /Im0 Do Q".encode()
+    )
+
+
+def _write(tmp_path, builders) -> str:
+    writer = PdfWriter()
+    for build in builders:
+        build(writer)
+    path = tmp_path / "doc.pdf"
+    with path.open("wb") as handle:
+        writer.write(handle)
+    return str(path)
+
+
+def test_text_document(tmp_path):
+    path = _write(tmp_path, [_add_text_page] * 3)
+    assert classify.classify_pdf(path).kind == "text"
+
+
+def test_scanned_document_goes_straight_to_ocr(tmp_path):
+    path = _write(tmp_path, [_add_image_page] * 4)
+    result = classify.classify_pdf(path)
+    assert result.kind == "image"
+    assert result.page_count == 4
+
+
+def test_mixed_document_lists_image_pages(tmp_path):
+    path = _write(tmp_path, [_add_text_page, _add_image_page, _add_text_page, _add_image_page])
+    result = classify.classify_pdf(path)
+    assert result.kind == "mixed"
+    assert result.image_pages == [2, 4]
+
+
+def test_small_images_do_not_make_a_scan(tmp_path):
+    path = _write(tmp_path, [lambda w: _add_image_page(w, scale=0.2)])
+    profile = classify.classify_pdf(path).sampled[0]
+    assert profile.image_coverage < classify.IMAGE_COVERAGE
+    assert not profile.image_only
+
+
+def test_quote_operators_count_as_text():
+    for data in (b"BT /F1 12 Tf (Hello) ' ET", b'BT /F1 12 Tf 0 0 (Hello)" ET'):
+        assert classify.TEXT_OPERATORS.search(data)
+    assert not classify.TEXT_OPERATORS.search(b"BT /F1 12 Tf ET")
+
+
+def test_unparseable_structure_falls_back_to_unknown(tmp_path, monkeypatch):
+    path = _write(tmp_path, [_add_text_page] * 2)
+
+    def broken(reader):
+        raise ValueError("bad content stream")
+
+    monkeypatch.setattr(classify, "_classify", broken)
+    result = classify.classify_pdf(path)
+    assert (result.kind, result.page_count, result.image_pages) == ("unknown", 2, [])
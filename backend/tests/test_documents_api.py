@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import zipfile
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from nexus.api import deps, routes_docs
+from nexus.api.main import app
+from nexus.config import Settings
+
+HEADERS = {"x-api-key": "test-key-0123456789"}
+
+
+@pytest.fixture
+def cur(monkeypatch, tmp_path):
+    manifest = tmp_path / "corpora.yml"
+    manifest.write_text("collections: {}\n")
+    settings = Settings(
+        api_key=HEADERS["x-api-key"], processed_dir=tmp_path, corpora_manifest=manifest
+    )
+    monkeypatch.setattr(deps, "get_settings", lambda: settings)
+    monkeypatch.setattr(routes_docs, "get_settings", lambda: settings)
+    cur = AsyncMock()
+    cur.rowcount = 0
+    conn = MagicMock()
+    conn.commit = AsyncMock()
+
+    @asynccontextmanager
+    async def cursor():
+        yield cur
+
+    conn.cursor = cursor
+
+    @asynccontextmanager
+    async def fake_db(row_factory=None):
+        yield conn
+
+    monkeypatch.setattr(routes_docs, "db_connection", fake_db)
+    cur.purger = MagicMock()
+    monkeypatch.setattr(routes_docs.purge, "get_purger", lambda: cur.purger)
+    return cur
+
+
+@pytest.mark.parametrize(
+    "name, header",
+    [
+        ("report.pdf", 'attachment; filename="report.pdf"'),
+        ('a";b.pdf', "attachment; filename*=utf-8''a%22%3Bb.pdf"),
+        ("résumé.pdf", "attachment; filename*=utf-8''r%C3%A9sum%C3%A9.pdf"),
+    ],
+)
+def test_archive_members_are_served_with_an_encoded_filename(cur, tmp_path, name, header):
+    archive = tmp_path / "drop.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr(f"docs/{name}", b"%PDF-1.4 member")
+    cur.fetchone.return_value = {"path": f"{archive}!/docs/{name}", "processed_path": None}
+    response = TestClient(app).get("/documents/1/file", headers=HEADERS)
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == header
+    assert response.content == b"%PDF-1.4 member"
+
+
+@pytest.mark.parametrize("body", [{}, {"collection": None}, {"path_prefix": ""}])
+def test_bulk_delete_requires_a_filter(cur, body):
+    response = TestClient(app).post("/documents/bulk-delete", json=body, headers=HEADERS)
+    assert response.status_code == 422
+    cur.execute.assert_not_awaited()
+    cur.purger.wake.assert_not_called()
+
+
+def test_bulk_delete_combines_filters_and_wakes_the_purger(cur):
+    cur.rowcount = 5
+    response = TestClient(app).post(
+        "/documents/bulk-delete",
+        json={"collection": "library", "tag": "old", "path_prefix": "/corpora/library/2019/"},
+        headers=HEADERS,
+    )
+    assert response.status_code == 202
+    assert response.json() == {"status": "deleting", "documents": 5}
+    sql, params = cur.execute.await_args.args
+    assert "UPDATE documents d SET deleted_at = NOW()" in sql
+    assert (
+        "c.active = TRUE AND d.deleted_at IS NULL AND c.name = %s"
+        " AND %s = ANY(d.tags) AND starts_with(d.path, %s)"
+    ) in sql
+    assert params == ["library", "old", "/corpora/library/2019/"]
+    cur.purger.wake.assert_called_once()
+
+
+def test_bulk_delete_by_one_filter(cur):
+    response = TestClient(app).post(
+        "/documents/bulk-delete", json={"tag": "old"}, headers=HEADERS
+    )
+    assert response.json() == {"status": "deleting", "documents": 0}
+    sql, params = cur.execute.await_args.args
+    assert "c.name" not in sql
+    assert "starts_with" not in sql
+    assert params == ["old"]
+    cur.purger.wake.assert_called_once()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from nexus import metrics
+from nexus.embed import adaptive
+from nexus.embed.adaptive import AdaptiveEmbedder, AIMDController
+from nexus.embed.ollama_embed import OllamaEmbedder
+
+
+def _controller(**overrides) -> AIMDController:
+    values = dict(
+        concurrency=1,
+        batch_size=4,
+        max_concurrency=4,
+        max_batch_size=8,
+        target_latency=1.0,
+    )
+    values.update(overrides)
+    return AIMDController(**values)
+
+
+def test_additive_increase_on_fast_responses():
+    controller = _controller()
+    for _ in range(3):
+        controller.on_success(0.1)
+    assert controller.limit == 3
+    assert controller.batch == 7
+    assert metrics.get("nexus_embed_concurrency") == 3
+
+
+def test_multiplicative_decrease_on_overload_and_slow_responses():
+    controller = _controller(concurrency=4, batch_size=8)
+    controller.on_overload(timeout=True)
+    assert (controller.limit, controller.batch) == (2, 4)
+    controller.on_success(5.0)
+    assert (controller.limit, controller.batch) == (1, 2)
+    controller.on_overload()
+    assert (controller.limit, controller.batch) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_adaptive_embedder_retries_overloaded_batches(monkeypatch):
+    real_sleep = asyncio.sleep
+    monkeypatch.setattr(adaptive.asyncio, "sleep", lambda _: real_sleep(0))
+    attempts = {"count": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts["count"] += 1
+        if attempts["count"] == 1:
+            return httpx.Response(503, json={"error": "busy"})
+        inputs = json.loads(request.content)["input"]
+        return httpx.Response(200, json={"embeddings": [[float(len(t))] for t in inputs]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://o")
+    embedder = AdaptiveEmbedder(
+        inner=OllamaEmbedder(client=client), controller=_controller(batch_size=2)
+    )
+    texts = [f"text {i}" * (i + 1) for i in range(7)]
+
+    segments = await embedder.embed_segments(texts)
+
+    assert [s[0].embedding[0] for s in segments] == [float(len(t)) for t in texts]
+    assert metrics.get("nexus_embed_overload_total", reason="503") >= 1
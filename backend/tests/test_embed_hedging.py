@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from nexus import metrics
+from nexus.config import Settings
+from nexus.embed import hedging
+from nexus.embed.ollama_embed import OllamaEmbedder
+from nexus.ollama_pool import OllamaPool
+
+
+def _request(delays: list[float], calls: list[int], cancelled: list[int]):
+    async def request(attempt: int) -> str:
+        calls.append(attempt)
+        try:
+            await asyncio.sleep(delays[attempt])
+        except asyncio.CancelledError:
+            cancelled.append(attempt)
+            raise
+        return f"attempt-{attempt}"
+
+    return request
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    calls: list[int] = []
+    result = await hedging.hedged(
+        _request([0.0], calls, []), delay=0.05, budget=hedging.HedgeBudget(1.0)
+    )
+    assert result == "attempt-0"
+    assert calls == [0]
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_loses_to_hedge_and_is_cancelled():
+    metrics.reset()
+    calls: list[int] = []
+    cancelled: list[int] = []
+    result = await hedging.hedged(
+        _request([1.0, 0.0], calls, cancelled), delay=0.01, budget=hedging.HedgeBudget(1.0)
+    )
+    assert result == "attempt-1"
+    assert calls == [0, 1]
+    await asyncio.sleep(0)
+    assert cancelled == [0]
+    assert metrics.get("nexus_embed_hedge_wins_total", winner="hedge") == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_hedge_falls_back_to_primary():
+    async def request(attempt: int) -> str:
+        if attempt == 1:
+            raise RuntimeError("endpoint down")
+        await asyncio.sleep(0.03)
+        return "primary"
+
+    assert await hedging.hedged(request, 0.01, hedging.HedgeBudget(1.0)) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_budget_caps_extra_requests():
+    budget = hedging.HedgeBudget(ratio=0.1, burst=1.0)
+    calls: list[int] = []
+    for _ in range(5):
+        await hedging.hedged(_request([0.02, 0.0], calls, []), 0.001, budget)
+    # One hedge from the initial token; 0.5 tokens earned since is not enough for another.
+    assert calls.count(1) == 1
+
+
+def test_delay_follows_the_latency_percentile():
+    tracker = hedging.LatencyTracker()
+    assert tracker.delay(95, 0.05) == hedging.COLD_DELAY
+    for i in range(100):
+        tracker.record(i / 100)
+    assert tracker.percentile(95) == pytest.approx(0.94)
+    assert tracker.delay(50, 0.9) == 0.9
+
+
+@pytest.mark.asyncio
+async def test_hedged_query_goes_to_another_endpoint():
+    hits: list[str] = []
+
+    def factory(url: str) -> httpx.AsyncClient:
+        async def handle(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/api/tags":
+                return httpx.Response(200, json={"models": [{"name": "m:latest"}]})
+            hits.append(url)
+            if url == "http://slow":
+                await asyncio.sleep(1.0)
+            return httpx.Response(200, json={"embeddings": [[float(len(hits))]]})
+
+        return httpx.AsyncClient(base_url=url, transport=httpx.MockTransport(handle))
+
+    pool = OllamaPool(["http://slow", "http://fast"], client_factory=factory)
+    embedder = OllamaEmbedder(model="m", pool=pool)
+    embedder.settings = Settings(embed_hedge=True)
+    slow = pool.endpoints[0]
+    # Make the slow endpoint the least busy choice for the primary request.
+    pool.endpoints[1].outstanding = 1
+    hedging.tracker("m").samples.extend([0.01] * hedging.MIN_SAMPLES)
+
+    assert await asyncio.wait_for(embedder.embed_query("q"), timeout=0.5) == [2.0]
+    assert hits == ["http://slow", "http://fast"]
+    await asyncio.sleep(0)
+    assert slow.outstanding == 0
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+
+import httpx
+import pytest
+
+from nexus import metrics
+from nexus.embed.ollama_embed import OllamaEmbedder
+
+MAX_CHARS = 50
+
+
+def _client(calls: list[list[str]]) -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        inputs = json.loads(request.content)["input"]
+        calls.append(inputs)
+        if any(len(text) > MAX_CHARS for text in inputs):
+            return httpx.Response(
+                400, json={"error": "the input length exceeds the context length"}
+            )
+        return httpx.Response(200, json={"embeddings": [[float(len(t))] for t in inputs]})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://ollama")
+
+
+@pytest.mark.asyncio
+async def test_overflowing_input_is_split_without_losing_text():
+    metrics.reset()
+    calls: list[list[str]] = []
+    embedder = OllamaEmbedder(client=_client(calls))
+    long_text = " ".join(["word"] * 40)
+    texts = ["short one", long_text, "short two"]
+
+    segments = await embedder.embed_segments(texts)
+
+    assert [len(s) for s in (segments[0], segments[2])] == [1, 1]
+    assert len(segments[1]) > 1
+    assert "".join(long_text[s.start : s.end] for s in segments[1]) == long_text
+    assert all(s.end - s.start <= MAX_CHARS for s in segments[1])
+    assert metrics.get("nexus_embed_overflow_splits_total") >= 1
+
+
+@pytest.mark.asyncio
+async def test_only_the_overflowing_input_is_split():
+    calls: list[list[str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        inputs = json.loads(request.content)["input"]
+        calls.append(inputs)
+        # Token-dense text overflows at fewer characters than prose.
+        if any("#" in text and len(text) > 10 for text in inputs):
+            return httpx.Response(400, json={"error": "input exceeds the context length"})
+        return httpx.Response(200, json={"embeddings": [[1.0] for _ in inputs]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://ollama")
+    embedder = OllamaEmbedder(client=client)
+    prose = "a " * 20
+    segments = await embedder.embed_segments([prose, "#" * 20, prose])
+    assert [len(s) for s in segments] == [1, 2, 1]
+
+    calls.clear()
+    await embedder.embed_segments([prose, prose])
+    assert calls == [[prose, prose]]
+
+
+@pytest.mark.asyncio
+async def test_non_json_400_is_raised_as_http_error():
+    transport = httpx.MockTransport(lambda request: httpx.Response(400, text="bad gateway"))
+    client = httpx.AsyncClient(transport=transport, base_url="http://ollama")
+    with pytest.raises(httpx.HTTPStatusError):
+        await OllamaEmbedder(client=client).embed_segments(["text"])
+
+
+@pytest.mark.asyncio
+async def test_embed_documents_returns_one_vector_per_input():
+    embedder = OllamaEmbedder(client=_client([]))
+    vectors = await embedder.embed_documents(["a", "y" * 120])
+    assert len(vectors) == 2
+    assert all(len(v) == 1 for v in vectors)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from nexus import metrics
+from nexus.embed import scheduler
+
+
+async def _hold(sched: scheduler.EmbedScheduler, lane, admitted: list, release: asyncio.Event):
+    async with sched.slot(lane):
+        admitted.append(lane)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_bulk_lane_is_capped_while_a_query_waits():
+    sched = scheduler.EmbedScheduler(bulk_max_inflight=8, bulk_inflight_contended=1)
+    admitted: list = []
+    query_done, bulk_done = asyncio.Event(), asyncio.Event()
+    query = asyncio.create_task(_hold(sched, scheduler.INTERACTIVE, admitted, query_done))
+    await asyncio.sleep(0)
+    bulk = [
+        asyncio.create_task(_hold(sched, scheduler.BULK, admitted, bulk_done)) for _ in range(3)
+    ]
+    await asyncio.sleep(0.01)
+    assert admitted.count(scheduler.BULK) == 1
+    assert sched.waiting[scheduler.BULK] == 2
+
+    query_done.set()
+    await query
+    await asyncio.sleep(0.01)
+    assert admitted.count(scheduler.BULK) == 3
+    bulk_done.set()
+    await asyncio.gather(*bulk)
+
+
+@pytest.mark.asyncio
+async def test_queries_are_not_queued_behind_bulk_work():
+    sched = scheduler.EmbedScheduler(bulk_max_inflight=2, bulk_inflight_contended=1)
+    admitted: list = []
+    release = asyncio.Event()
+    bulk = [
+        asyncio.create_task(_hold(sched, scheduler.BULK, admitted, release)) for _ in range(3)
+    ]
+    await asyncio.sleep(0.01)
+    assert admitted == [scheduler.BULK, scheduler.BULK]
+    async with sched.slot(scheduler.INTERACTIVE):
+        pass
+    release.set()
+    await asyncio.gather(*bulk)
+
+
+@pytest.mark.asyncio
+async def test_queue_time_is_recorded_per_lane():
+    metrics.reset()
+    sched = scheduler.EmbedScheduler(bulk_max_inflight=1)
+    admitted: list = []
+    release = asyncio.Event()
+    first = asyncio.create_task(_hold(sched, scheduler.BULK, admitted, release))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(_hold(sched, scheduler.BULK, admitted, release))
+    await asyncio.sleep(0.05)
+    release.set()
+    await asyncio.gather(first, second)
+    assert metrics.get("nexus_embed_lane_requests_total", lane="bulk") == 2
+    assert metrics.get("nexus_embed_lane_queue_seconds_total", lane="bulk") >= 0.04
+    assert metrics.get("nexus_embed_lane_inflight", lane="bulk") == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_is_shared_per_event_loop():
+    assert scheduler.get_scheduler() is scheduler.get_scheduler()
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import pathlib
+from contextlib import asynccontextmanager, nullcontext
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from nexus.ingest import committer, discover, pipeline
+
+
+class FakeConnection:
+    """Records transactions; only the outermost one commits."""
+
+    def __init__(self, fail_commit: bool = False):
+        self.fail_commit = fail_commit
+        self.commits = 0
+        self.savepoints = 0
+        self.pipelines = 0
+        self._depth = 0
+
+    @asynccontextmanager
+    async def transaction(self):
+        self._depth += 1
+        try:
+            if self._depth > 1:
+                self.savepoints += 1
+            yield
+            if self._depth == 1:
+                if self.fail_commit:
+                    raise RuntimeError("commit failed")
+                self.commits += 1
+        finally:
+            self._depth -= 1
+
+    def pipeline(self):
+        self.pipelines += 1
+        return nullcontext()
+
+    @asynccontextmanager
+    async def cursor(self):
+        yield AsyncMock()
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_connection(monkeypatch):
+    conn = FakeConnection()
+    monkeypatch.setattr(
+        committer.psycopg.AsyncConnection, "connect", AsyncMock(return_value=conn)
+    )
+    return conn
+
+
+def _write(result):
+    async def write(cur):
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return write
+
+
+@pytest.mark.asyncio
+async def test_documents_are_committed_in_one_transaction(fake_connection):
+    async with committer.GroupCommitter(max_documents=3, max_latency=10) as group:
+        results = await asyncio.gather(*(group.submit(_write(i)) for i in range(3)))
+    assert results == [0, 1, 2]
+    assert fake_connection.commits == 1
+    assert fake_connection.savepoints == 3
+    assert fake_connection.pipelines == 1
+
+
+@pytest.mark.asyncio
+async def test_failing_document_does_not_roll_back_the_others(fake_connection):
+    async with committer.GroupCommitter(max_documents=3, max_latency=10) as group:
+        results = await asyncio.gather(
+            group.submit(_write("a")),
+            group.submit(_write(ValueError("bad row"))),
+            group.submit(_write("c")),
+            return_exceptions=True,
+        )
+    assert results[0] == "a" and results[2] == "c"
+    assert isinstance(results[1], ValueError)
+    assert fake_connection.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_commits_after_max_latency(fake_connection):
+    async with committer.GroupCommitter(max_documents=100, max_latency=0.01) as group:
+        assert await asyncio.wait_for(group.submit(_write("a")), timeout=1) == "a"
+        assert fake_connection.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_commits_once_every_document_in_flight_waits(fake_connection):
+    async with committer.GroupCommitter(max_documents=100, max_latency=10) as group:
+        with group.document():
+            assert await asyncio.wait_for(group.submit(_write("a")), timeout=1) == "a"
+
+        async def document(value, delay):
+            with group.document():
+                await asyncio.sleep(delay)
+                return await group.submit(_write(value))
+
+        results = await asyncio.wait_for(
+            asyncio.gather(document("b", 0), document("c", 0.01)), timeout=1
+        )
+    assert results == ["b", "c"]
+    assert fake_connection.commits == 2
+
+
+@pytest.mark.asyncio
+async def test_large_documents_commit_early(fake_connection):
+    async with committer.GroupCommitter(max_documents=100, max_rows=50, max_latency=10) as group:
+        assert await asyncio.wait_for(group.submit(_write("a"), 60), timeout=1) == "a"
+
+
+@pytest.mark.asyncio
+async def test_failed_commit_fails_every_document(fake_connection):
+    fake_connection.fail_commit = True
+    async with committer.GroupCommitter(max_documents=2, max_latency=10) as group:
+        results = await asyncio.gather(
+            group.submit(_write("a")), group.submit(_write("b")), return_exceptions=True
+        )
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_known_unchanged_files_are_skipped_without_queries(monkeypatch):
+    process = AsyncMock()
+    monkeypatch.setattr(pipeline, "_ingest_locked_file", process)
+    file = discover.DiscoveredFile(
+        path=pathlib.Path("/corpora/test/a.pdf"),
+        root=pathlib.Path("/corpora/test"),
+        relative_path=pathlib.Path("a.pdf"),
+        sha256="abc",
+        mtime=1,
+        size=10,
+    )
+    advisory = MagicMock()
+    outcome = await pipeline.ingest_file(
+        file,
+        "test",
+        MagicMock(),
+        MagicMock(id=3),
+        MagicMock(),
+        advisory,
+        known={("/corpora/test/a.pdf", "abc", 1)},
+    )
+    assert outcome == "skipped"
+    advisory.hold.assert_not_called()
+    process.assert_not_awaited()
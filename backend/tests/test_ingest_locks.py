@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import pathlib
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from nexus.ingest import discover, locks, pipeline
+
+
+def _conn(locked: bool) -> MagicMock:
+    cur = AsyncMock()
+    cur.fetchone.return_value = (locked,)
+    conn = MagicMock()
+    conn.execute = AsyncMock(return_value=cur)
+    return conn
+
+
+@pytest.mark.asyncio
+async def test_hold_releases_acquired_lock():
+    conn = _conn(True)
+    async with locks.AdvisoryLocks(conn).hold("document:1:/a.pdf") as acquired:
+        assert acquired
+    statements = [call.args[0] for call in conn.execute.await_args_list]
+    assert "pg_try_advisory_lock" in statements[0]
+    assert "pg_advisory_unlock" in statements[1]
+
+
+@pytest.mark.asyncio
+async def test_hold_does_not_release_lock_held_elsewhere():
+    conn = _conn(False)
+    async with locks.AdvisoryLocks(conn).hold("document:1:/a.pdf") as acquired:
+        assert not acquired
+    assert conn.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_ingest_file_skips_documents_locked_by_another_run(monkeypatch):
+    process = AsyncMock()
+    monkeypatch.setattr(pipeline, "_ingest_locked_file", process)
+    file = discover.DiscoveredFile(
+        path=pathlib.Path("/corpora/test/a.pdf"),
+        root=pathlib.Path("/corpora/test"),
+        relative_path=pathlib.Path("a.pdf"),
+        sha256="abc",
+        mtime=1,
+        size=10,
+    )
+    contract = MagicMock(id=3)
+    outcome = await pipeline.ingest_file(
+        file, "test", MagicMock(), contract, MagicMock(), locks.AdvisoryLocks(_conn(False))
+    )
+    assert outcome == "locked"
+    process.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_attach_to_the_running_ingest(monkeypatch):
+    release = asyncio.Event()
+    calls = []
+
+    async def fake_ingest(name, collection_id, *options):
+        calls.append(name)
+        await release.wait()
+        return pipeline.IngestSummary(scanned=1, processed=1, skipped=0, failed=0)
+
+    monkeypatch.setattr(pipeline, "_ingest_collection", fake_ingest)
+    first = asyncio.create_task(pipeline.ingest_collection("test"))
+    second = asyncio.create_task(pipeline.ingest_collection("test"))
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(first, second)
+
+    assert calls == ["test"]
+    assert results[0] is results[1]
+    assert pipeline._running == {}
+
+
+@pytest.mark.asyncio
+async def test_call_with_other_options_does_not_attach_to_the_running_ingest(monkeypatch):
+    release = asyncio.Event()
+
+    async def fake_ingest(name, collection_id, *options):
+        await release.wait()
+        return pipeline.IngestSummary(scanned=1, processed=1, skipped=0, failed=0)
+
+    monkeypatch.setattr(pipeline, "_ingest_collection", fake_ingest)
+    first = asyncio.create_task(pipeline.ingest_collection("test"))
+    await asyncio.sleep(0)
+    with pytest.raises(pipeline.IngestInProgressError):
+        await pipeline.ingest_collection("test", max_files=10)
+    release.set()
+    await first
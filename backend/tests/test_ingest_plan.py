@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import argparse
+import os
+import pathlib
+import time
+import zipfile
+from unittest.mock import AsyncMock
+
+import pytest
+
+from nexus.config import CollectionConfig, Settings
+from nexus.ingest import discover, pipeline, plan, quality
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    settings = Settings(processed_dir=tmp_path / "processed")
+    monkeypatch.setattr(discover, "get_settings", lambda: settings)
+    root = tmp_path / "library"
+    (root / "old").mkdir(parents=True)
+    (root / "new").mkdir()
+    (root / "old" / "a.pdf").write_bytes(b"%PDF-1.4 old" * 100)
+    (root / "new" / "b.pdf").write_bytes(b"%PDF-1.4 new" * 1000)
+    with zipfile.ZipFile(root / "drop.zip", "w") as zf:
+        zf.writestr("c.pdf", b"%PDF-1.4 member")
+    week_ago = time.time() - 7 * 86400
+    os.utime(root / "old" / "a.pdf", (week_ago, week_ago))
+    return root, CollectionConfig(roots=[str(root)], include=["**/*.pdf"])
+
+
+def _names(files):
+    return sorted(f.path.name for f in files)
+
+
+def test_dry_walk_only_stats_files(corpus, monkeypatch):
+    _, cfg = corpus
+
+    def no_hashing(path):
+        raise AssertionError(f"{path} was hashed")
+
+    monkeypatch.setattr(discover, "_hash_file", no_hashing)
+    monkeypatch.setattr(discover.archives, "_hash", no_hashing)
+    files = discover.walk_collection(cfg, hash_files=False)
+    assert _names(files) == ["a.pdf", "b.pdf", "c.pdf"]
+    assert {f.sha256 for f in files} == {""}
+
+
+def test_filter_by_mtime_and_paths(corpus):
+    root, cfg = corpus
+    recent = discover.FileFilter(since=time.time() - 86400)
+    assert _names(discover.walk_collection(cfg, recent)) == ["b.pdf", "c.pdf"]
+
+    chosen = discover.FileFilter(paths=[root / "old", root / "drop.zip"])
+    assert _names(discover.walk_collection(cfg, chosen)) == ["a.pdf", "c.pdf"]
+
+    single = discover.FileFilter(paths=[root / "drop.zip!/c.pdf"])
+    assert _names(discover.walk_collection(cfg, single)) == ["c.pdf"]
+
+
+def test_estimate_takes_largest_files_as_ocr_candidates():
+    files = [
+        discover.DiscoveredFile(
+            pathlib.Path(f"/c/{i}.pdf"), pathlib.Path("/c"), pathlib.Path(f"{i}.pdf"), "", 0, size
+        )
+        for i, size in enumerate([100_000, 1_000_000, 300_000, 50_000])
+    ]
+    rates = plan.Rates(bytes_per_page=100_000, chunks_per_page=2.0, ocr_ratio=0.25)
+    result = plan.estimate("docs", files, rates, unchanged=3)
+    assert result.files == 4
+    assert result.pages == 1 + 10 + 3 + 1
+    assert result.chunks == 30
+    assert (result.ocr_candidates, result.ocr_pages) == (1, 10)
+    assert result.embed_seconds == pytest.approx(30 / plan.EMBED_CHUNKS_PER_SECOND)
+    assert "Unchanged:         3" in result.format()
+
+
+def test_since_accepts_dates_and_ages():
+    assert pipeline._since("2024-05-01") == pytest.approx(
+        time.mktime((2024, 5, 1, 0, 0, 0, 0, 0, -1))
+    )
+    assert pipeline._since("36h") == pytest.approx(time.time() - 36 * 3600, abs=5)
+    with pytest.raises(argparse.ArgumentTypeError):
+        pipeline._since("last tuesday")
+
+
+def test_paths_can_be_read_from_a_list(tmp_path):
+    listing = tmp_path / "paths.txt"
+    listing.write_text("/c/a.pdf\n\n/c/b\n")
+    assert pipeline._read_paths(["/c/x.pdf", f"@{listing}"]) == [
+        pathlib.Path("/c/x.pdf"),
+        pathlib.Path("/c/a.pdf"),
+        pathlib.Path("/c/b"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_history_calibrates_from_the_status_ingest_writes():
+    writes = AsyncMock()
+    writes.fetchone.return_value = {"id": 1}
+    await pipeline._upsert_document(
+        writes, 3, "/c/a.pdf", "sha", 0, 10, [], False, None, quality.QualityReport(10, 0.0)
+    )
+    written_status = writes.execute.await_args.args[1][6]
+
+    cur = AsyncMock()
+    cur.fetchone.side_effect = [
+        {"id": 3},
+        {"documents": 40, "bytes": 4_000_000, "pages": 80, "ocr": 10, "chunks": 240},
+    ]
+    cur.fetchall.return_value = []
+    rates, known = await plan._history(cur, "library")
+
+    stats_query, stats_params = cur.execute.await_args_list[1].args
+    assert written_status in stats_params
+    assert "JOIN live" in stats_query
+    assert rates.bytes_per_page == 50_000
+    assert rates.chunks_per_page == 3.0
+    assert rates.ocr_ratio == 0.25
+    assert known == set()
+
+
+@pytest.mark.asyncio
+async def test_documents_of_an_older_text_version_are_not_unchanged():
+    documents = [
+        {"path": "/c/a.pdf", "mtime": 1, "size": 10, "text_version": pipeline.TEXT_VERSION},
+        {"path": "/c/b.pdf", "mtime": 1, "size": 10, "text_version": pipeline.TEXT_VERSION - 1},
+    ]
+    cur = AsyncMock()
+    cur.fetchone.side_effect = [{"id": 3}, {"documents": 2, "pages": 0}]
+
+    async def fetchall():
+        query, params = cur.execute.await_args.args
+        assert "text_version = %s" in query
+        return [d for d in documents if d["text_version"] == params[1]]
+
+    cur.fetchall.side_effect = fetchall
+    _, known = await plan._history(cur, "library")
+    assert known == {("/c/a.pdf", 1, 10)}
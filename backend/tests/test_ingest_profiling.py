@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from nexus.ingest import profiling
+
+
+def test_tree_rss_reports_resident_memory():
+    assert profiling.tree_rss() > 0
+
+
+def test_stage_is_a_noop_without_profiler():
+    assert not profiling.active()
+    with profiling.stage("extract"):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_profiler_records_stages_per_document(tmp_path):
+    report = tmp_path / "profile.json"
+    profiler = profiling.IngestProfiler(report, sample_seconds=0.01)
+    profiler.start()
+    async with profiler.document("/corpora/test/big.pdf", 1234) as document:
+        assert profiling.active()
+        with profiling.stage("embed"):
+            ballast = [bytearray(1024) for _ in range(2000)]
+            await asyncio.sleep(0.05)
+        document.outcome = "processed"
+    profiler.stop()
+    del ballast
+
+    data = json.loads(report.read_text())
+    assert data["in_progress"] == []
+    [doc] = data["documents"]
+    assert doc["path"] == "/corpora/test/big.pdf"
+    assert doc["outcome"] == "processed"
+    [stage] = doc["stages"]
+    assert stage["stage"] == "embed"
+    assert stage["rss_peak_bytes"] >= stage["rss_start_bytes"] > 0
+    assert stage["python_peak_bytes"] >= 2000 * 1024
+    assert any("test_ingest_profiling.py" in a["site"] for a in stage["top_allocations"])
+
+    summary = profiler.summary()
+    assert summary["report"] == str(report)
+    assert summary["top_documents"][0]["path"] == "/corpora/test/big.pdf"
+    assert set(summary["stage_peak_rss_mib"]) == {"embed"}
+
+
+@pytest.mark.asyncio
+async def test_report_names_the_stage_in_flight(tmp_path):
+    report = tmp_path / "profile.json"
+    profiler = profiling.IngestProfiler(report, sample_seconds=0.01)
+    profiler.start()
+    try:
+        async with profiler.document("/corpora/test/a.pdf", 1):
+            with profiling.stage("ocr"):
+                data = json.loads(report.read_text())
+    finally:
+        profiler.stop()
+    assert data["in_progress"] == [{"path": "/corpora/test/a.pdf", "stages": ["ocr"]}]
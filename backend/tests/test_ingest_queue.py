@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import pathlib
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from nexus import metrics, worker
+from nexus.ingest import queue
+
+
+def _item(item_id: int, path: str = "/corpora/test/a.pdf") -> queue.QueueItem:
+    return queue.QueueItem(
+        id=item_id,
+        collection="test",
+        collection_id=1,
+        path=path,
+        root="/corpora/test",
+        source_sha256="abc",
+        mtime=1,
+        size=10,
+        attempts=1,
+    )
+
+
+def test_queue_item_maps_back_to_discovered_file():
+    file = _item(1, "/corpora/test/sub/a.pdf").to_file()
+    assert file.relative_path == pathlib.Path("sub/a.pdf")
+    assert file.sha256 == "abc"
+
+
+@pytest.mark.asyncio
+async def test_claim_skips_rows_locked_by_other_workers():
+    cur = AsyncMock()
+    cur.fetchall.return_value = [dict(_item(5).__dict__)]
+    items = await queue.claim(cur, "node-a:1", 4, lease_seconds=60)
+    sql, params = cur.execute.await_args.args
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert params == ("node-a:1", 60, 4)
+    assert [item.id for item in items] == [5]
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_only_extends_own_leases():
+    cur = AsyncMock()
+    cur.rowcount = 2
+    assert await queue.heartbeat(cur, "node-a:1", [1, 2], lease_seconds=60) == 2
+    sql, params = cur.execute.await_args.args
+    assert "lease_owner = %s" in sql
+    assert params == (60, [1, 2], "node-a:1")
+    assert await queue.heartbeat(AsyncMock(), "node-a:1", []) == 0
+
+
+@pytest.mark.asyncio
+async def test_requeue_expired_parks_items_out_of_attempts():
+    cur = AsyncMock()
+    cur.rowcount = 3
+    assert await queue.requeue_expired(cur, max_attempts=3) == 3
+    sql, params = cur.execute.await_args.args
+    assert "lease_expires_at < NOW()" in sql
+    assert "'failed'" in sql
+    assert params == (3,)
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    @asynccontextmanager
+    async def connection(row_factory=None):
+        conn = MagicMock()
+        conn.commit = AsyncMock()
+
+        @asynccontextmanager
+        async def cursor():
+            yield AsyncMock()
+
+        conn.cursor = cursor
+        yield conn
+
+    monkeypatch.setattr(worker, "db_connection", connection)
+
+
+@pytest.mark.asyncio
+async def test_worker_drains_queue_and_reports_outcomes(monkeypatch, fake_db):
+    metrics.reset()
+    batches = [[_item(1), _item(2, "/corpora/test/b.pdf")]]
+    monkeypatch.setattr(queue, "requeue_expired", AsyncMock(return_value=0))
+    claim = AsyncMock(side_effect=lambda *a, **k: batches.pop(0) if batches else [])
+    monkeypatch.setattr(queue, "claim", claim)
+    monkeypatch.setattr(queue, "queue_depth", AsyncMock(return_value={}))
+    complete = AsyncMock(return_value=True)
+    fail = AsyncMock()
+    monkeypatch.setattr(queue, "complete", complete)
+    monkeypatch.setattr(queue, "fail", fail)
+    monkeypatch.setattr(worker.pipeline, "load_collection", AsyncMock(return_value=MagicMock()))
+    monkeypatch.setattr(worker.pipeline, "collection_config", MagicMock())
+
+    async def ingest_file(file, name, cfg, contract, embedder):
+        if file.path.name == "b.pdf":
+            raise RuntimeError("corrupt PDF")
+        return "processed"
+
+    monkeypatch.setattr(worker.pipeline, "ingest_file", ingest_file)
+    monkeypatch.setattr(worker, "AdaptiveEmbedder", MagicMock())
+
+    w = worker.IngestWorker(worker_id="node-a:1", concurrency=4)
+    await w.run(once=True)
+
+    assert [c.args[1:] for c in complete.await_args_list] == [("node-a:1", 1)]
+    assert fail.await_args.args[1:] == ("node-a:1", 2, "corrupt PDF")
+    assert metrics.get("nexus_worker_items_total", outcome="processed") == 1
+    assert metrics.get("nexus_worker_items_total", outcome="failed") == 1
+    assert w.active == {}
+
+
+@pytest.mark.asyncio
+async def test_serve_restarts_after_errors_until_stopped(monkeypatch):
+    w = worker.IngestWorker(worker_id="api", concurrency=1)
+    monkeypatch.setattr(w.settings, "queue_poll_seconds", 0)
+    runs = []
+
+    async def run():
+        runs.append(1)
+        if len(runs) == 1:
+            raise OSError("database restarting")
+        w.stop()
+
+    monkeypatch.setattr(w, "run", run)
+    await asyncio.wait_for(w.serve(), timeout=1)
+    assert len(runs) == 2
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from nexus.config import CollectionConfig, JunkThresholds
+from nexus.ingest import junk, pipeline, quality
+from nexus.ingest.pdf_extract_pypdf import PageText
+
+PROSE = "The committee reviewed the proposal and agreed to fund the next phase of research."
+TOC = "Chapter 1 ........................ 15\nChapter 2 .................. 33\nIndex ...... 301"
+
+
+def test_prose_is_kept():
+    assert not junk.is_junk(junk.score_chunk(PROSE), JunkThresholds())
+
+
+def test_dot_leaders_digits_and_garbage_are_junk():
+    thresholds = JunkThresholds()
+    assert junk.is_junk(junk.score_chunk(TOC), thresholds)
+    assert junk.is_junk(junk.score_chunk("12 13 14 15 16 17 18 19 20 21"), thresholds)
+    assert junk.is_junk(junk.score_chunk("l1l |l| ;;;; ~~~ ^^ ll1 ||| ,,, lIl 1l1"), thresholds)
+    assert junk.is_junk(junk.score_chunk("   "), thresholds)
+
+
+def test_non_ascii_words_count_as_words():
+    score = junk.score_chunk("Der schnelle braune Fuchs springt über den faulen Hund.")
+    assert score.word_ratio == 1.0
+
+
+def test_thresholds_are_configurable_per_collection():
+    cfg = CollectionConfig.model_validate(
+        {"roots": ["/corpora"], "include": ["*.pdf"], "junk": {"min_alpha_ratio": 0.1}}
+    )
+    assert cfg.junk.min_alpha_ratio == 0.1
+    assert cfg.junk.min_entropy == JunkThresholds().min_entropy
+
+
+def test_drop_junk_skips_spans_and_reports_counts():
+    page = PageText(1, PROSE + "\n" + TOC)
+    spans = [(page, 0, len(PROSE)), (page, len(PROSE) + 1, len(page.text))]
+    report = quality.QualityReport(extracted_chars=0, empty_page_ratio=0)
+
+    kept = pipeline._drop_junk(spans, JunkThresholds(), report)
+    assert kept == spans[:1]
+    assert report.details["junk"] == {
+        "chunks_skipped": 1,
+        "chars_skipped": len(TOC),
+        "chunks_kept": 1,
+    }
+
+    disabled = quality.QualityReport(extracted_chars=0, empty_page_ratio=0)
+    assert pipeline._drop_junk(spans, JunkThresholds(enabled=False), disabled) == spans
+    assert "junk" not in disabled.details
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from nexus.domain import models
+from nexus.ingest import normalize, pipeline, quality
+from nexus.ingest.pdf_extract_pypdf import PageText
+
+
+def test_dehyphenates_line_breaks_and_keeps_compounds():
+    assert normalize.normalize_text("exam-\nple") == "example"
+    assert normalize.normalize_text("Jean-\nPaul") == "Jean-\nPaul"
+
+
+def test_replaces_ligatures_and_drops_invisible_characters():
+    text = "e\ufb03cient\u00ad \u200bso\x07ft space"
+    assert normalize.normalize_text(text) == "efficient soft space"
+
+
+def test_collapses_whitespace_but_keeps_paragraphs():
+    text = "one  \t two \n  three\r\n\n\n\nfour"
+    assert normalize.normalize_text(text) == "one two\nthree\n\nfour"
+
+
+def test_normalize_pages_keeps_page_boundaries():
+    pages = [PageText(1, "end of page-\n"), PageText(2, "next page \ue000 text")]
+    result = normalize.normalize_pages(pages)
+    assert [p.page for p in result] == [1, 2]
+    assert result[0].text == "end of page-"
+    assert result[1].text == "next page text"
+
+
+def test_prepare_pages_reports_removed_characters_and_chunks():
+    contract = models.Collection(
+        id=1,
+        name="test",
+        version=1,
+        embed_model="m",
+        embed_dim=3,
+        chunk_size=50,
+        overlap=0,
+        active=True,
+    )
+    report = quality.QualityReport(extracted_chars=0, empty_page_ratio=0)
+    pages = [PageText(1, "word   " * 20)]
+    prepared = pipeline._prepare_pages(pages, contract, report)
+    stats = report.details["normalization"]
+    assert prepared[0].text == " ".join(["word"] * 20)
+    assert stats["chars_removed"] == 140 - len(prepared[0].text)
+    assert stats["chunks_removed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_documents_from_older_text_versions_are_reprocessed():
+    cur = AsyncMock()
+    cur.fetchone.return_value = None
+    assert await pipeline._doc_exists(cur, 1, "/a.pdf", "sha", 1) is None
+    sql, params = cur.execute.await_args.args
+    assert "text_version = %s" in sql
+    assert params[-1] == pipeline.TEXT_VERSION
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from nexus.config import CollectionConfig
+from nexus.ingest import ocr
+
+
+def test_fast_profile_skips_expensive_preprocessing():
+    cmd = ocr.ocr_command(Path("in.pdf"), Path("out.pdf"), ocr.get_profile("fast"))
+    assert "--deskew" not in cmd
+    assert "--rotate-pages" not in cmd
+    assert cmd[cmd.index("--optimize") + 1] == "0"
+    assert "--tesseract-downsample-above" in cmd
+    assert cmd[-2:] == ["in.pdf", "out.pdf"]
+
+
+def test_accurate_profile_matches_previous_flags():
+    cmd = ocr.ocr_command(Path("in.pdf"), Path("out.pdf"), ocr.get_profile("accurate"))
+    assert {"--skip-text", "--rotate-pages", "--deskew"} <= set(cmd)
+    assert "--tesseract-downsample-large-images" not in cmd
+
+
+def test_forced_ocr_replaces_skip_text():
+    cmd = ocr.ocr_command(Path("in.pdf"), Path("out.pdf"), ocr.get_profile("fast"), force=True)
+    assert "--force-ocr" in cmd
+    assert "--skip-text" not in cmd
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ocr.OCRError):
+        ocr.get_profile("turbo")
+
+
+def test_collection_can_select_profile():
+    cfg = CollectionConfig(roots=["/corpora/x"], include=["**/*.pdf"], ocr_profile="fast")
+    assert cfg.ocr_profile == "fast"
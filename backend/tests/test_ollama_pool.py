@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import Counter
+
+import httpx
+import pytest
+
+from nexus.embed.ollama_embed import OllamaEmbedder
+from nexus.ollama_pool import NoEndpointAvailableError, OllamaPool
+
+
+class StandIn:
+    """In-process stand-in for one Ollama server."""
+
+    def __init__(self, models: list[str], down: bool = False, delay: float = 0.0):
+        self.models = models
+        self.down = down
+        self.delay = delay
+        self.requests: Counter[str] = Counter()
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if self.down:
+            raise httpx.ConnectError("connection refused", request=request)
+        self.requests[request.url.path] += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if request.url.path == "/api/tags":
+            return httpx.Response(200, json={"models": [{"name": m} for m in self.models]})
+        if request.url.path == "/api/embed":
+            count = len(json.loads(request.content)["input"])
+            return httpx.Response(200, json={"embeddings": [[0.1, 0.2]] * count})
+        return httpx.Response(404)
+
+
+def _pool(servers: dict[str, StandIn], **options) -> OllamaPool:
+    def factory(url: str) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=url, transport=httpx.MockTransport(servers[url].handle)
+        )
+
+    return OllamaPool(list(servers), client_factory=factory, **options)
+
+
+@pytest.mark.asyncio
+async def test_requests_go_to_the_least_busy_endpoint():
+    pool = _pool({"http://a": StandIn(["m"]), "http://b": StandIn(["m"])})
+    async with pool.endpoint("m") as first:
+        async with pool.endpoint("m") as second:
+            assert {first.url, second.url} == {"http://a", "http://b"}
+    assert all(e.outstanding == 0 for e in pool.endpoints)
+
+
+@pytest.mark.asyncio
+async def test_avoided_endpoint_is_used_when_it_is_the_only_one():
+    pool = _pool({"http://a": StandIn(["m"])})
+    async with pool.endpoint("m") as first:
+        async with pool.endpoint("m", avoid={first}) as second:
+            assert second is first
+
+
+@pytest.mark.asyncio
+async def test_requests_only_go_to_endpoints_serving_the_model():
+    pool = _pool({"http://a": StandIn(["llama3:latest"]), "http://b": StandIn(["embed"])})
+    for _ in range(3):
+        async with pool.endpoint("embed:latest") as endpoint:
+            assert endpoint.url == "http://b"
+        async with pool.endpoint("llama3") as endpoint:
+            assert endpoint.url == "http://a"
+
+
+@pytest.mark.asyncio
+async def test_failing_endpoint_is_ejected_and_probed_back_in():
+    servers = {"http://a": StandIn(["m"]), "http://b": StandIn(["m"])}
+    pool = _pool(servers, eject_after=2, eject_seconds=0.01)
+    await pool.acquire("m")  # first probes
+    a = pool.endpoints[0]
+    pool.release(a)
+    servers["http://a"].down = True
+    for _ in range(2):
+        with pytest.raises(httpx.ConnectError):
+            async with pool.endpoint("m", avoid={pool.endpoints[1]}) as endpoint:
+                await endpoint.client.post("/api/embed", json={"input": ["x"]})
+    assert not a.healthy
+    async with pool.endpoint("m") as endpoint:
+        assert endpoint.url == "http://b"
+
+    servers["http://a"].down = False
+    await asyncio.sleep(0.02)
+    async with pool.endpoint("m"):
+        pass
+    await asyncio.sleep(0.01)  # background probe
+    assert a.healthy
+
+
+@pytest.mark.asyncio
+async def test_bulk_batches_are_spread_over_the_pool():
+    servers = {
+        "http://a": StandIn(["mxbai-embed-large"], delay=0.01),
+        "http://b": StandIn(["mxbai-embed-large"], delay=0.01),
+    }
+    embedder = OllamaEmbedder(model="mxbai-embed-large", pool=_pool(servers))
+    await asyncio.gather(*(embedder.embed_documents([f"text {i}"]) for i in range(8)))
+    assert servers["http://a"].requests["/api/embed"] >= 2
+    assert servers["http://b"].requests["/api/embed"] >= 2
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "http://a/api/embed")
+    return httpx.HTTPStatusError(
+        "error", request=request, response=httpx.Response(status, request=request)
+    )
+
+
+@pytest.mark.asyncio
+async def test_overload_answers_do_not_eject_the_endpoint():
+    pool = _pool({"http://a": StandIn(["m"])}, eject_after=2)
+    for _ in range(3):
+        endpoint = await pool.acquire("m")
+        pool.release(endpoint, _status_error(503))
+    assert pool.endpoints[0].healthy
+
+    for _ in range(2):
+        endpoint = await pool.acquire("m")
+        pool.release(endpoint, _status_error(500))
+    assert not pool.endpoints[0].healthy
+
+
+@pytest.mark.asyncio
+async def test_requests_still_go_out_when_every_endpoint_is_ejected():
+    pool = _pool({"http://a": StandIn(["m"])}, eject_after=1, eject_seconds=60)
+    endpoint = await pool.acquire("m")
+    pool.release(endpoint, httpx.ConnectError("refused"))
+    assert not endpoint.healthy
+
+    async with pool.endpoint("m") as panic:
+        assert panic is endpoint
+    assert endpoint.healthy
+
+
+@pytest.mark.asyncio
+async def test_list_models_merges_endpoints():
+    servers = {
+        "http://a": StandIn(["m", "n"]),
+        "http://b": StandIn(["m"]),
+        "http://c": StandIn(["m"], down=True),
+    }
+    models = await _pool(servers).list_models()
+    assert [(m["name"], m["endpoints"]) for m in models] == [
+        ("m", ["http://a", "http://b"]),
+        ("n", ["http://a"]),
+    ]
+
+    with pytest.raises(NoEndpointAvailableError):
+        await _pool({"http://c": StandIn(["m"], down=True)}).list_models()
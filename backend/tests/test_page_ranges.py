@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from pypdf import PdfWriter
+
+from nexus.config import get_settings
+from nexus.ingest import pdf_extract_pypdf, pipeline
+
+
+def test_small_documents_are_a_single_range():
+    assert pipeline._page_ranges(10) == [(1, 10)]
+
+
+def test_large_documents_split_into_contiguous_ranges(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "page_range_min_pages", 100)
+    monkeypatch.setattr(settings, "page_range_size", 40)
+    ranges = pipeline._page_ranges(130)
+    assert ranges == [(1, 40), (41, 80), (81, 120), (121, 130)]
+
+
+def test_extract_range_keeps_absolute_page_numbers(tmp_path):
+    source = tmp_path / "blank.pdf"
+    writer = PdfWriter()
+    for _ in range(5):
+        writer.add_blank_page(width=200, height=200)
+    with source.open("wb") as handle:
+        writer.write(handle)
+
+    pages = pdf_extract_pypdf.extract_text(str(source), 2, 4)
+    assert [p.page for p in pages] == [2, 3, 4]
+
+    part = tmp_path / "part.pdf"
+    pdf_extract_pypdf.write_page_range(str(source), 3, 5, part)
+    assert pdf_extract_pypdf.page_count(str(part)) == 3
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from nexus.retrieve import pgvector
+
+
+@pytest.fixture
+def cursor(monkeypatch):
+    cur = MagicMock()
+    cur.execute = AsyncMock()
+    cur.fetchall = AsyncMock(
+        return_value=[
+            {
+                "chunk_id": 5,
+                "document_id": 2,
+                "path": "/c/a.pdf",
+                "page": 3,
+                "similarity": 0.9,
+                "char_start": 720,
+                "char_end": 1520,
+                "content": "page text slice",
+            }
+        ]
+    )
+
+    @asynccontextmanager
+    async def connection(row_factory=None):
+        conn = MagicMock()
+
+        @asynccontextmanager
+        async def cursor_cm():
+            yield cur
+
+        conn.cursor = cursor_cm
+        yield conn
+
+    monkeypatch.setattr(pgvector, "db_connection", connection)
+    return cur
+
+
+@pytest.mark.asyncio
+async def test_search_reads_text_for_the_top_rows_only(cursor):
+    results = await pgvector.search_chunks([0.1], ["docs"], ["x"], 8, min_score=0.5)
+
+    sql, params = cursor.execute.await_args.args
+    inner, outer = sql.split("SELECT\n        top.chunk_id")
+    assert "pages" not in inner and "content" not in inner
+    assert "substr(p.text" in outer and "top.similarity >= %s" in outer
+    assert params == ["docs", [0.1], pgvector.get_settings().embed_dim, ["x"], 8, 0.5]
+    assert results[0].content == "page text slice"
+    assert (results[0].char_start, results[0].char_end) == (720, 1520)
+
+
+@pytest.mark.asyncio
+async def test_collection_models_groups_active_versions_by_model(cursor):
+    cursor.fetchall.return_value = [
+        {"embed_model": "bge-m3", "names": ["dev"]},
+        {"embed_model": "mxbai-embed-large", "names": ["library", "test"]},
+    ]
+    models = await pgvector.collection_models(["library", "dev", "test"])
+
+    sql, params = cursor.execute.await_args.args
+    assert "active = TRUE" in sql
+    assert params == (["library", "dev", "test"],)
+    assert models == {"bge-m3": ["dev"], "mxbai-embed-large": ["library", "test"]}
+    assert await pgvector.collection_models([]) == {}
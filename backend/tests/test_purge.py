@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from nexus.ingest import purge
+
+
+def _cursor(document, rowcounts):
+    cur = AsyncMock()
+    cur.fetchone.return_value = document
+    counts = iter(rowcounts)
+
+    async def execute(sql, params=None):
+        cur.rowcount = next(counts)
+
+    cur.execute.side_effect = execute
+    return cur
+
+
+def _statements(cur):
+    return [" ".join(call.args[0].split()) for call in cur.execute.await_args_list]
+
+
+@pytest.mark.asyncio
+async def test_purge_batch_removes_chunks_before_pages_and_document():
+    cur = _cursor({"id": 9}, [1, 250])
+    assert await purge.purge_batch(cur, 250) == 250
+    statements = _statements(cur)
+    assert "FOR UPDATE SKIP LOCKED" in statements[0]
+    assert statements[1].startswith("DELETE FROM chunks")
+    assert cur.execute.await_args_list[1].args[1] == (9, 250)
+    assert len(statements) == 2
+
+    cur = _cursor({"id": 9}, [1, 0, 3])
+    assert await purge.purge_batch(cur, 250) == 3
+    assert _statements(cur)[2].startswith("DELETE FROM pages")
+
+    cur = _cursor({"id": 9}, [1, 0, 0, 1])
+    assert await purge.purge_batch(cur, 250) == 1
+    assert _statements(cur)[3] == "DELETE FROM documents WHERE id = %s"
+
+
+@pytest.mark.asyncio
+async def test_purge_batch_removes_empty_deleted_collections_last():
+    cur = _cursor(None, [0, 2])
+    assert await purge.purge_batch(cur, 250) == 2
+    statement = _statements(cur)[1]
+    assert statement.startswith("DELETE FROM collections")
+    assert "NOT EXISTS (SELECT 1 FROM documents" in statement
+
+    cur = _cursor(None, [0, 0])
+    assert await purge.purge_batch(cur, 250) == 0
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from nexus.ingest import pipeline, reindex
+
+
+@pytest.mark.asyncio
+async def test_activate_version_flips_in_single_statement():
+    cur = AsyncMock()
+    await reindex.activate_version(cur, "library", 7)
+    cur.execute.assert_awaited_once()
+    sql, params = cur.execute.await_args.args
+    assert "SET active = (id = %s)" in sql
+    assert params == (7, "library")
+
+
+@pytest.mark.asyncio
+async def test_drop_inactive_versions_noop_without_stale_versions():
+    cur = AsyncMock()
+    cur.fetchall.return_value = []
+    assert await reindex.drop_inactive_versions(cur, "library") == 0
+    assert cur.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_drop_inactive_versions_marks_documents_of_stale_versions_deleted():
+    cur = AsyncMock()
+    cur.fetchall.return_value = [{"id": 3}, {"id": 4}]
+    assert await reindex.drop_inactive_versions(cur, "library") == 2
+    statements = [call.args[0] for call in cur.execute.await_args_list]
+    # Removal itself is left to the throttled purger.
+    assert any("UPDATE documents SET deleted_at = NOW()" in sql for sql in statements)
+    assert not any("DELETE" in sql for sql in statements)
+    assert any("eval_runs" in sql for sql in statements)
+
+
+@pytest.mark.asyncio
+async def test_drop_inactive_versions_skips_versions_already_kept_for_evals():
+    cur = AsyncMock()
+    cur.fetchall.return_value = []
+    assert await reindex.drop_inactive_versions(cur, "library") == 0
+    # A version kept for eval_runs has no live documents left and is not selected again.
+    select = cur.execute.await_args_list[0].args[0]
+    assert "eval_runs" in select
+    assert "d.deleted_at IS NULL" in select
+
+
+@pytest.mark.asyncio
+async def test_ensure_collection_rechecks_after_lock():
+    cur = AsyncMock()
+    # A concurrent first ingest creates the version while this one waits on the lock.
+    cur.fetchone.side_effect = [None, {"id": 11, "embed_dim": pipeline.get_settings().embed_dim}]
+    assert await pipeline.ensure_collection(cur, "library") == 11
+    statements = [call.args[0] for call in cur.execute.await_args_list]
+    assert "pg_advisory_xact_lock" in statements[1]
+    assert not any("INSERT" in sql for sql in statements)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from nexus import resources
+from nexus.config import get_settings
+
+
+def test_reads_cgroup_v2_limits(tmp_path):
+    (tmp_path / "cpu.max").write_text("200000 100000\n")
+    (tmp_path / "memory.max").write_text(str(4 * resources.GIB))
+    assert resources.read_cpu_quota(tmp_path) == 2.0
+    assert resources.read_memory_limit(tmp_path) == 4 * resources.GIB
+
+
+def test_unlimited_cgroup_v2(tmp_path):
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    (tmp_path / "memory.max").write_text("max\n")
+    assert resources.read_cpu_quota(tmp_path) is None
+    assert resources.read_memory_limit(tmp_path) is None
+
+
+def test_reads_cgroup_v1_limits(tmp_path):
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "memory").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("150000")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000")
+    (tmp_path / "memory" / "memory.limit_in_bytes").write_text("9223372036854771712")
+    assert resources.read_cpu_quota(tmp_path) == 1.5
+    assert resources.read_memory_limit(tmp_path) is None
+
+
+def test_budget_scales_with_limits():
+    small = resources.derive_budget(resources.ResourceLimits(2, 2 * resources.GIB, "cgroup"))
+    large = resources.derive_budget(resources.ResourceLimits(64, 256 * resources.GIB, "cgroup"))
+    assert small.extract_workers == 2
+    assert small.inflight_documents == 1
+    assert small.page_range_workers == 1
+    assert large.extract_workers == 64
+    assert large.page_range_workers * large.ocr_jobs <= 64
+    assert large.embed_batch_size > small.embed_batch_size
+
+
+def test_explicit_settings_override_derived_values(monkeypatch):
+    monkeypatch.setattr(get_settings(), "ocr_jobs", 3)
+    budget = resources.derive_budget(resources.ResourceLimits(16, None, "host"))
+    assert budget.ocr_jobs == 3
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import struct
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from nexus.config import Settings
+from nexus.domain import models
+from nexus.ingest import snapshot
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    value = Settings(embed_model="mxbai-embed-large", embed_dim=4)
+    monkeypatch.setattr(snapshot, "get_settings", lambda: value)
+    return value
+
+
+def _snapshot(directory, chunks=2, dim=4):
+    for name in (snapshot.DOCUMENTS, snapshot.PAGES, snapshot.CHUNKS):
+        (directory / name).write_text('{"ref": 1}\n')
+    np.save(directory / snapshot.EMBEDDINGS, np.ones((chunks, dim), dtype=np.float32))
+    manifest = snapshot.Manifest(
+        collection="docs",
+        version=3,
+        embed_model="mxbai-embed-large:latest",
+        embed_dim=dim,
+        chunk_size=800,
+        overlap=80,
+        chunks=chunks,
+        checksums={name: snapshot._sha256(directory / name) for name in snapshot.DATA_FILES},
+    )
+    manifest.write(directory)
+    return manifest
+
+
+def test_vectors_use_pgvector_binary_format():
+    values = np.array([1.0, -0.5, 0.25], dtype=np.float32)
+    encoded = snapshot.encode_vector(values)
+    assert encoded[:4] == struct.pack(">hh", 3, 0)
+    assert encoded[4:8] == struct.pack(">f", 1.0)
+    np.testing.assert_array_equal(snapshot.decode_vector(encoded), values)
+
+
+def test_manifest_round_trip_and_contract(tmp_path, settings):
+    written = _snapshot(tmp_path)
+    manifest = snapshot.Manifest.read(tmp_path)
+    assert manifest == written
+    snapshot.check_contract(manifest)
+    embeddings = snapshot.verify_files(tmp_path, manifest)
+    assert embeddings.shape == (2, 4)
+
+
+@pytest.mark.parametrize(
+    "change, message",
+    [
+        ({"embed_dim": 8}, "8 dimensions"),
+        ({"embed_model": "nomic-embed-text"}, "embedded with nomic-embed-text"),
+        ({"format": 99}, "format 99"),
+    ],
+)
+def test_contract_mismatch_is_refused(tmp_path, settings, change, message):
+    manifest = _snapshot(tmp_path)
+    for key, value in change.items():
+        setattr(manifest, key, value)
+    with pytest.raises(snapshot.SnapshotError, match=message):
+        snapshot.check_contract(manifest)
+
+
+def test_damaged_files_are_refused(tmp_path, settings):
+    manifest = _snapshot(tmp_path)
+    (tmp_path / snapshot.CHUNKS).write_text('{"ref": 2}\n')
+    with pytest.raises(snapshot.SnapshotError, match="Checksum mismatch for chunks.jsonl"):
+        snapshot.verify_files(tmp_path, manifest)
+
+    manifest = _snapshot(tmp_path, chunks=2)
+    manifest.chunks = 3
+    with pytest.raises(snapshot.SnapshotError, match="expected float32"):
+        snapshot.verify_files(tmp_path, manifest)
+
+
+@pytest.mark.asyncio
+async def test_export_skips_deleted_documents(tmp_path, monkeypatch):
+    statements = []
+    document = [1, "/c/a.pdf", "sha", 0, 10, [], "ingested", False, None, 4, 0.0, {}, 1, None]
+    chunk = [1, 1, 0, None, "h", 0, 4, {}, snapshot.encode_vector(np.ones(4, np.float32))]
+    results = {"FROM documents": [document], "FROM pages": [(1, 1, "text")], "chunks": [chunk]}
+
+    class Copy:
+        def __init__(self, statement):
+            self.statement = statement
+
+        def set_types(self, types):
+            pass
+
+        async def rows(self):
+            key = next(k for k in results if k in self.statement)
+            for row in results[key]:
+                yield row
+
+    @asynccontextmanager
+    async def copy(statement):
+        statements.append(statement)
+        yield Copy(statement)
+
+    cur = MagicMock()
+    cur.execute = AsyncMock(side_effect=lambda query, *args: statements.append(query))
+    cur.fetchone = AsyncMock(return_value={"n": 1})
+    cur.copy = copy
+    conn = MagicMock()
+    conn.set_isolation_level = AsyncMock()
+    conn.rollback = AsyncMock()
+
+    @asynccontextmanager
+    async def cursor():
+        yield cur
+
+    conn.cursor = cursor
+
+    @asynccontextmanager
+    async def fake_db(row_factory=None):
+        yield conn
+
+    contract = models.Collection(
+        id=5, name="docs", version=3, embed_model="m", embed_dim=4, chunk_size=800, overlap=80
+    )
+    monkeypatch.setattr(snapshot, "db_connection", fake_db)
+    monkeypatch.setattr(snapshot, "_active_collection", AsyncMock(return_value=contract))
+    manifest = await snapshot.export_collection("docs", tmp_path)
+
+    assert (manifest.documents, manifest.pages, manifest.chunks) == (1, 1, 1)
+    assert len(statements) == 4
+    assert all("deleted_at IS NULL" in statement for statement in statements)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import hashlib
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from nexus.config import Settings
+from nexus.ingest import upload
+
+PDF = b"%PDF-1.4 " + b"x" * 5000
+
+
+async def _stream(data: bytes, size: int = 1000):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def _multipart(filename: str, payload: bytes) -> tuple[str, bytes]:
+    boundary = "testboundary"
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="note"\r\n\r\n'
+        "ignored\r\n"
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + payload + f"\r\n--{boundary}--\r\n".encode()
+    return f"multipart/form-data; boundary={boundary}", body
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    settings = Settings(processed_dir=tmp_path, max_file_size_mb=1)
+    monkeypatch.setattr(upload, "get_settings", lambda: settings)
+    monkeypatch.setattr(upload.discover, "get_settings", lambda: settings)
+    cur = AsyncMock()
+    cur.fetchone.return_value = None
+    conn = MagicMock()
+    conn.commit = AsyncMock()
+
+    @asynccontextmanager
+    async def cursor():
+        yield cur
+
+    conn.cursor = cursor
+
+    @asynccontextmanager
+    async def fake_db(row_factory=None):
+        yield conn
+
+    monkeypatch.setattr(upload, "db_connection", fake_db)
+    monkeypatch.setattr(upload, "ensure_collection", AsyncMock(return_value=7))
+    enqueue = AsyncMock(return_value=1)
+    monkeypatch.setattr(upload.queue, "enqueue", enqueue)
+    return cur, enqueue, tmp_path / "uploads" / "library"
+
+
+@pytest.mark.asyncio
+async def test_multipart_upload_yields_only_the_file_part():
+    content_type, body = _multipart("report.pdf", PDF)
+    source = upload.MultipartUpload(content_type, _stream(body, 37))
+    data = b"".join([chunk async for chunk in source])
+    assert data == PDF
+    assert source.filename == "report.pdf"
+
+
+@pytest.mark.asyncio
+async def test_upload_is_hashed_stored_and_queued(store):
+    cur, enqueue, root = store
+    content_type, body = _multipart("../report.pdf", PDF)
+    source = upload.MultipartUpload(content_type, _stream(body))
+    result = await upload.store_upload("library", source)
+
+    sha = hashlib.sha256(PDF).hexdigest()
+    assert result.status == "queued"
+    assert result.sha256 == sha
+    target = root / sha / "report.pdf"
+    assert target.read_bytes() == PDF
+    queued = enqueue.await_args.args[3]
+    assert [f.path for f in queued] == [target]
+    # A deleted copy of the same content does not make the upload a duplicate.
+    assert "deleted_at IS NULL" in cur.execute.await_args.args[0]
+    assert not list(root.glob("*.part"))
+
+
+@pytest.mark.asyncio
+async def test_duplicate_upload_is_not_stored(store):
+    cur, enqueue, root = store
+    cur.fetchone.return_value = {"id": 3, "path": "/corpora/library/a.pdf"}
+    result = await upload.store_upload("library", upload.RawUpload("a.pdf", _stream(PDF)))
+    assert (result.status, result.document_id) == ("duplicate", 3)
+    enqueue.assert_not_awaited()
+    assert list(root.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_oversized_and_non_pdf_uploads_are_rejected(store):
+    _, enqueue, root = store
+    with pytest.raises(upload.UploadTooLargeError):
+        await upload.store_upload("library", upload.RawUpload("big.pdf", _stream(PDF * 300)))
+    with pytest.raises(upload.UploadError):
+        await upload.store_upload("library", upload.RawUpload("notes.txt", _stream(PDF)))
+    enqueue.assert_not_awaited()
+    assert list(root.iterdir()) == []